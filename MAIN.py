@@ -99,6 +99,13 @@ admin_imports = discover_classes_in_package('components.admin', admin_class_name
 service_class_names = ['BookService', 'CategoryService', 'StatsService', 'AchievementService']
 services_imports = discover_classes_in_package('services', service_class_names)
 
+# shared bus for book/category change events; tabs subscribe to apply targeted updates
+try:
+    from services.events import EventBus
+except Exception as e:
+    print(f"Warning: change events unavailable: {e}")
+    EventBus = None
+
 # Provide a holder in case services package is imported elsewhere.
 # If services package isn't present, create a proper ModuleType with a __path__.
 try:
@@ -161,6 +168,7 @@ class LibraryManagementSystem:
         self.root.title("Libris Core")
         self.root.configure(bg=COLORS["background"])
         self.services = {}
+        self.events = EventBus() if EventBus else None
         self._instantiate_services()
         self._export_services()
         self.content_frame = None
@@ -169,12 +177,49 @@ class LibraryManagementSystem:
         self.tabs = {}
         self._create_login_interface()
 
+    def _service_options(self):
+        """Constructor keyword arguments per service, driven by config storage settings"""
+        try:
+            from config import STORAGE_BACKEND, LIBRARY_DB_FILE, DATABASE_FILE, WRITE_BEHIND_DELAY
+        except Exception:
+            return {}
+        options = {"BookService": {"write_behind": WRITE_BEHIND_DELAY}}
+        try:
+            from config import SESSIONS_FILE
+            options["BookService"]["sessions_file"] = SESSIONS_FILE
+        except Exception:
+            pass
+        try:
+            from config import ACHIEVEMENTS_FILE, STATS_FILE
+            options["StatsService"] = {"achievements_file": ACHIEVEMENTS_FILE, "stats_file": STATS_FILE}
+        except Exception:
+            pass
+        if STORAGE_BACKEND == "journal":
+            options["BookService"]["storage"] = "journal"
+        elif STORAGE_BACKEND == "sqlite":
+            try:
+                from services.storage import SqliteLibraryStore
+                store = SqliteLibraryStore(os.path.join(root_dir, LIBRARY_DB_FILE))
+                # one-time migration of the legacy JSON files
+                store.import_json(os.path.join(root_dir, DATABASE_FILE), os.path.join(root_dir, "categories_data.json"))
+            except Exception as e:
+                print(f"Failed to open SQLite library store, falling back to JSON: {e}")
+                return options
+            options["BookService"].update({"data_file": LIBRARY_DB_FILE, "storage": store})
+            options["CategoryService"] = {"data_file": LIBRARY_DB_FILE, "storage": store}
+        return options
+
     def _instantiate_services(self):
         # Instantiate service classes discovered earlier and store instances in self.services
+        options = self._service_options()
+        if self.events is not None:
+            # books and categories publish their changes on the one app bus
+            for svc_name in ("BookService", "CategoryService"):
+                options.setdefault(svc_name, {})["events"] = self.events
         for svc_name, svc_cls in services_imports.items():
             if svc_cls:
                 try:
-                    inst = svc_cls()
+                    inst = svc_cls(**options.get(svc_name, {}))
                 except Exception as e:
                     print(f"Failed to instantiate {svc_name}: {e}")
                     inst = None
@@ -182,6 +227,23 @@ class LibraryManagementSystem:
             else:
                 self.services[svc_name] = None
 
+        # stats read the book service's running totals instead of rescanning
+        stats_service = self.services.get("StatsService")
+        book_service = self.services.get("BookService")
+        if stats_service is not None and book_service is not None and hasattr(stats_service, "attach"):
+            try:
+                stats_service.attach(book_service)
+            except Exception as e:
+                print(f"Warning: could not attach stats to the book service: {e}")
+        achievement_service = self.services.get("AchievementService")
+        if achievement_service is not None and book_service is not None \
+                and getattr(achievement_service, "book_service", False) is None:
+            achievement_service.book_service = book_service
+        # one set of unlocks, persisted in the stats service's achievements file
+        if achievement_service is not None and getattr(stats_service, "engine", None) is not None \
+                and hasattr(achievement_service, "engine"):
+            achievement_service.engine = stats_service.engine
+
     def _export_services(self):
         # make single instances available as attributes on services package
         try:
@@ -278,7 +340,22 @@ class LibraryManagementSystem:
     def show_search(self):
         self._switch_to_tab('SearchTab')
 
+    def close_services(self):
+        """Flush and close services that hold background work (write-behind, compaction)"""
+        for inst in self.services.values():
+            close_fn = getattr(inst, "close", None)
+            if callable(close_fn):
+                try:
+                    close_fn()
+                except Exception as e:
+                    print(f"Error closing service: {e}")
+
     def refresh_all(self):
+        """Rebuild every view from scratch.
+
+        Individual edits reach the tabs as change events on ``self.events``;
+        this is for when anything at all may have changed.
+        """
         # call refresh on known refreshable components
         for inst in self.tabs.values():
             if hasattr(inst, "refresh"):
@@ -310,4 +387,7 @@ if __name__ == "__main__":
         root.geometry(f"+{x}+{y}")
     except Exception:
         pass
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        app.close_services()
@@ -7,6 +7,11 @@ import os
 from datetime import datetime
 from typing import Optional, cast, Dict
 
+try:
+    from services.events import BookAdded, BookDeleted, BookUpdated, LibraryReloaded
+except ImportError:
+    BookAdded = BookDeleted = BookUpdated = LibraryReloaded = None
+
 class AdminDashboard:
     """
     Main Admin Dashboard component.
@@ -52,6 +57,7 @@ class AdminDashboard:
         self.users_tree: Optional[ttk.Treeview] = None
         self.transactions_tree: Optional[ttk.Treeview] = None
         self.books_context_menu: Optional[tk.Menu] = None
+        self.total_books_label: Optional[tk.Label] = None
 
         # declare policy_entries so type-checker/Pylance knows it's a dict of Entry widgets
         self.policy_entries: Dict[str, tk.Entry] = {}
@@ -60,6 +66,54 @@ class AdminDashboard:
         self._build_ui()
         self.show_admin_dashboard_content()
 
+        # book changes update single table rows instead of reloading the table
+        self._unsubscribers = []
+        self._subscribe_events()
+
+    def _subscribe_events(self):
+        events = getattr(self.app, "events", None) or getattr(self.book_service, "events", None)
+        if events is None or BookUpdated is None:
+            return
+        self._unsubscribers = [
+            events.subscribe(BookAdded, self._on_book_added),
+            events.subscribe(BookUpdated, self._on_book_updated),
+            events.subscribe(BookDeleted, self._on_book_deleted),
+            events.subscribe(LibraryReloaded, lambda event: self._refresh_books_table()),
+        ]
+
+    def _books_table(self) -> Optional[ttk.Treeview]:
+        """The books table, if it is on screen"""
+        if self.books_tree is not None and self.books_tree.winfo_exists():
+            return self.books_tree
+        return None
+
+    def _on_book_added(self, event):
+        tree = self._books_table()
+        if tree is not None and not tree.exists(str(event.book_id)):
+            tree.insert('', tk.END, iid=str(event.book_id), values=self._book_values(event.book))
+        self._update_total_books()
+
+    def _on_book_updated(self, event):
+        tree = self._books_table()
+        if tree is not None and tree.exists(str(event.book_id)):
+            tree.item(str(event.book_id), values=self._book_values(event.book))
+
+    def _on_book_deleted(self, event):
+        tree = self._books_table()
+        if tree is not None and tree.exists(str(event.book_id)):
+            tree.delete(str(event.book_id))
+        self._update_total_books()
+
+    def _after_book_change(self):
+        """Reload the table unless the service's change events already updated it"""
+        if not (self.book_service and self._unsubscribers):
+            self._refresh_books_table()
+
+    def _update_total_books(self):
+        label = self.total_books_label
+        if label is not None and label.winfo_exists() and hasattr(self.book_service, "count_books"):
+            label.config(text=f"Total Books: {self.book_service.count_books()}")
+
     def build_or_refresh(self):
         """Call when parent changed or when you want to rebuild the UI."""
         self._build_ui()
@@ -136,7 +190,8 @@ class AdminDashboard:
 
         sframe = tk.Frame(self.content_frame, bg=self.colors['background'])
         sframe.pack(fill=tk.X, pady=8)
-        tk.Label(sframe, text=f"Total Books: {total_books}", bg=self.colors['background']).pack(side=tk.LEFT, padx=6)
+        self.total_books_label = tk.Label(sframe, text=f"Total Books: {total_books}", bg=self.colors['background'])
+        self.total_books_label.pack(side=tk.LEFT, padx=6)
         tk.Label(sframe, text=f"Total Users: {total_users}", bg=self.colors['background']).pack(side=tk.LEFT, padx=6)
 
     def show_books_management(self):
@@ -179,18 +234,10 @@ class AdminDashboard:
             if self.book_service and hasattr(self.book_service, "list_books"):
                 books = self.book_service.list_books()
                 for b in books:
-                    vals = (
-                        getattr(b, "id", None) or b.get("id", ""),
-                        getattr(b, "title", None) or b.get("title", ""),
-                        getattr(b, "author", None) or b.get("author", ""),
-                        getattr(b, "isbn", None) or b.get("isbn", ""),
-                        getattr(b, "genre", None) or b.get("genre", ""),
-                        getattr(b, "quantity", None) or b.get("quantity", ""),
-                        getattr(b, "available", None) or b.get("available", ""),
-                        getattr(b, "publisher", None) or b.get("publisher", ""),
-                        getattr(b, "publication_year", None) or b.get("publication_year", ""),
-                    )
-                    self.books_tree.insert('', tk.END, values=vals)
+                    vals = self._book_values(b)
+                    # rows are keyed by book id so change events can update them
+                    iid = str(vals[0]) if vals[0] and not self.books_tree.exists(str(vals[0])) else None
+                    self.books_tree.insert('', tk.END, iid=iid, values=vals)
             else:
                 cur = self.conn.cursor()
                 cur.execute('SELECT id, title, author, isbn, genre, quantity, available, publisher, publication_year FROM books')
@@ -199,6 +246,16 @@ class AdminDashboard:
         except Exception:
             pass
 
+    @staticmethod
+    def _book_values(b):
+        def field(name):
+            value = getattr(b, name, None)
+            if value is None and isinstance(b, dict):
+                value = b.get(name)
+            return value or ""
+        return tuple(field(name) for name in ("id", "title", "author", "isbn", "genre", "quantity",
+                                              "available", "publisher", "publication_year"))
+
     def _add_book_handler(self):
         dialog = tk.Toplevel(self.parent); dialog.title("Add Book")
         frame = tk.Frame(dialog, padx=12, pady=12); frame.pack()
@@ -237,7 +294,7 @@ class AdminDashboard:
                 messagebox.showerror("Error", str(e))
             finally:
                 dialog.destroy()
-                self._refresh_books_table()
+                self._after_book_change()
 
         tk.Button(frame, text="Save", command=save).grid(row=len(fields), column=0, pady=8)
         tk.Button(frame, text="Cancel", command=dialog.destroy).grid(row=len(fields), column=1, pady=8)
@@ -274,7 +331,7 @@ class AdminDashboard:
         except Exception as e:
             messagebox.showerror("Error", str(e))
         finally:
-            self._refresh_books_table()
+            self._after_book_change()
 
     def _delete_selected_book(self):
         assert self.books_tree is not None
@@ -294,7 +351,7 @@ class AdminDashboard:
         except Exception as e:
             messagebox.showerror("Error", str(e))
         finally:
-            self._refresh_books_table()
+            self._after_book_change()
 
     # minimal implementations for other menu items to avoid runtime errors
     def show_users_management(self):
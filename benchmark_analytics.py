@@ -0,0 +1,98 @@
+"""
+Benchmark library analytics: per-book getattr loops vs. BookColumns
+(pure Python and, when installed, NumPy), including the cost of keeping
+the columns up to date after one book changes.
+
+Usage: python benchmark_analytics.py [books] [repeats]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import Book
+from services.analytics import HAVE_NUMPY, BookColumns
+
+STATUSES = ["To Read", "Reading", "Completed", "Not Started"]
+GENRES = ["Fantasy", "Science Fiction", "Mystery", "History", "Poetry", "Drama", "Travel", "Horror"]
+
+
+def make_books(count, seed=7):
+    rng = random.Random(seed)
+    books = []
+    for i in range(count):
+        books.append(Book(
+            id=str(i), title=f"Book {i}", author=f"Author {i % 997}", publisher="P",
+            genre=", ".join(rng.sample(GENRES, rng.randint(1, 3))), isbn="",
+            year=rng.randint(1900, 2024), status=rng.choice(STATUSES),
+            progress=rng.randint(0, 100), total_pages=rng.randint(50, 1200),
+            rating=rng.choice([0, 1, 2, 2.5, 3, 3.5, 4, 4.5, 5]),
+        ))
+    return books
+
+
+def loop_summary(books):
+    """The same figures computed the way StatsService scans a book list"""
+    ratings, years, statuses, genres = {stars: 0 for stars in range(6)}, {}, {}, {}
+    pages = progress = 0
+    for book in books:
+        pages += int(getattr(book, 'total_pages', 0) or 0)
+        progress += int(getattr(book, 'progress', 0) or 0)
+        stars = min(max(int(float(getattr(book, 'rating', 0) or 0)), 0), 5)
+        ratings[stars] += 1
+        year = int(getattr(book, 'year', 0) or 0)
+        if year > 0:
+            years[year] = years.get(year, 0) + 1
+        status = getattr(book, 'status', '') or ''
+        statuses[status] = statuses.get(status, 0) + 1
+        for genre in str(getattr(book, 'genre', '')).split(','):
+            genre = genre.strip()
+            if genre:
+                genres[genre] = genres.get(genre, 0) + 1
+    return {
+        "books": len(books),
+        "total_pages": pages,
+        "average_progress": progress / len(books) if books else 0,
+        "ratings": ratings,
+        "years": dict(sorted(years.items())),
+        "statuses": statuses,
+        "genres": genres,
+    }
+
+
+def timed(fn, repeats):
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    books = make_books(count)
+    print(f"Analytics benchmark: {count} books, best of {repeats}")
+
+    elapsed, expected = timed(lambda: loop_summary(books), repeats)
+    print(f"  getattr loops         {elapsed * 1000:9.1f} ms")
+
+    backends = [False] + ([True] if HAVE_NUMPY else [])
+    for use_numpy in backends:
+        name = "numpy" if use_numpy else "python"
+        build, columns = timed(lambda: BookColumns(books, use_numpy=use_numpy), repeats)
+        query, summary = timed(columns.summary, repeats)
+        assert summary == expected, f"{name} columns disagree with the loops"
+        update, _ = timed(lambda: columns.add(count // 2, books[count // 2]), repeats)
+        print(f"  columns ({name:6}) build {build * 1000:9.1f} ms, aggregate {query * 1000:9.1f} ms, "
+              f"update one book {update * 1e6:7.1f} us")
+    if not HAVE_NUMPY:
+        print("  NumPy not installed: only the pure-Python columns were measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@ import tkinter as tk
 from tkinter import ttk
 from config import COLORS
 from components.dialogs.category_editor import CategoryEditorDialog
+from services.events import (BookAdded, BookDeleted, BookUpdated, CategoryAdded, CategoryDeleted,
+                             CategoryRenamed, CategoryUpdated, LibraryReloaded)
 
 
 class CategoriesTab:
@@ -11,8 +13,79 @@ class CategoriesTab:
         self.app = app
         self.frame = tk.Frame(parent, bg=COLORS["background"])
 
+        # category name -> widgets of its card, for targeted updates
+        self.cards = {}
+        self._display_job = None
+        self._unsubscribers = []
+
         self.create_widgets()
         self.refresh()
+        self.subscribe_events()
+
+    def subscribe_events(self):
+        """Follow category and book changes without rebuilding every card"""
+        events = getattr(self.app, 'events', None)
+        if events is None:
+            return
+        self._unsubscribers = [
+            events.subscribe(CategoryAdded, self.schedule_display),
+            events.subscribe(CategoryDeleted, self.schedule_display),
+            events.subscribe(LibraryReloaded, self.schedule_display),
+            events.subscribe(CategoryRenamed, self.on_category_renamed),
+            events.subscribe(CategoryUpdated, self.on_category_updated),
+            events.subscribe(BookAdded, self.on_book_changed),
+            events.subscribe(BookDeleted, self.on_book_changed),
+            events.subscribe(BookUpdated, self.on_book_changed),
+        ]
+        self.frame.bind("<Destroy>", self._on_destroy)
+
+    def _on_destroy(self, event=None):
+        if event is not None and event.widget is not self.frame:
+            return
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+
+    def on_category_renamed(self, event):
+        card = self.cards.pop(event.old_name, None)
+        if card is None:
+            return
+        card["name"].config(text=event.name)
+        self.cards[event.name] = card
+
+    def on_category_updated(self, event):
+        card = self.cards.get(event.name)
+        if card is not None and "color" in event.changed:
+            card["color"].config(bg=event.category.color)
+
+    def on_book_changed(self, event):
+        """Recount only the categories the book left or joined"""
+        names = set(getattr(event.book, 'categories', None) or [])
+        if hasattr(event, 'previous'):
+            # an update only moves counts when the book's categories changed
+            if 'categories' not in event.changed:
+                return
+            names.update(event.previous.get('categories') or [])
+        for name in names:
+            card = self.cards.get(name)
+            if card is None:
+                continue
+            count = self.app.book_service.count_books(category=name)
+            card["category"].book_count = count
+            card["count"].config(text=f"{count} books")
+
+    def schedule_display(self, event=None):
+        """Rebuild the grid once the current batch of changes is over"""
+        if self._display_job is not None:
+            return
+        try:
+            self._display_job = self.frame.after_idle(self._run_display)
+        except Exception:
+            self._run_display()
+
+    def _run_display(self):
+        self._display_job = None
+        self.display_categories()
 
     def create_widgets(self):
         """Create all widgets for categories tab"""
@@ -90,7 +163,7 @@ class CategoriesTab:
         )
 
         # use getattr to avoid attribute-access error if dialog lacks `result`
-        if getattr(dialog, "result", False):
+        if getattr(dialog, "result", False) and not self._unsubscribers:
             self.refresh()
 
     def edit_category(self, category):
@@ -102,7 +175,7 @@ class CategoriesTab:
         )
 
         # use getattr to avoid attribute-access error if dialog lacks `result`
-        if getattr(dialog, "result", False):
+        if getattr(dialog, "result", False) and not self._unsubscribers:
             self.refresh()
 
     def delete_category(self, category):
@@ -116,18 +189,17 @@ class CategoriesTab:
         )
 
         if response:
-            success = self.app.category_service.delete_category(category.name)
+            # delete the category and retag its books in one write
+            with self.app.book_service.batch(self.app.category_service):
+                success = self.app.category_service.delete_category(category.name)
+                if success:
+                    for book in self.app.book_service.get_books_by_category(category.name):
+                        remaining = [name for name in book.categories if name != category.name]
+                        self.app.book_service.update_book(book.id, {"categories": remaining or ["General"]})
             if success:
-                # Update books that had this category
-                books = self.app.book_service.get_all_books()
-                for book in books:
-                    if category.name in book.categories:
-                        book.categories.remove(category.name)
-                        if not book.categories:
-                            book.categories.append("General")
-
-                # Refresh display
-                self.refresh()
+                # Refresh display (the change events already did, if subscribed)
+                if not self._unsubscribers:
+                    self.refresh()
                 messagebox.showinfo(
                     "Success",
                     f"Category '{category.name}' deleted successfully!"
@@ -138,6 +210,7 @@ class CategoriesTab:
         # Clear existing categories
         for widget in self.scrollable_frame.winfo_children():
             widget.destroy()
+        self.cards = {}
 
         # Get categories from service
         categories = self.app.category_service.get_all_categories()
@@ -188,28 +261,32 @@ class CategoriesTab:
             height=120
         )
         color_indicator.pack(side=tk.LEFT)
+        widgets = {"category": category, "color": color_indicator}
+        self.cards[category.name] = widgets
 
         # Category info
         info_frame = tk.Frame(card, bg="white")
         info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=15)
 
         # Category name
-        tk.Label(
+        widgets["name"] = tk.Label(
             info_frame,
             text=category.name,
             font=("Segoe UI", 14, "bold"),
             bg="white",
             fg=COLORS["text"]
-        ).pack(anchor="w", pady=(15, 5))
+        )
+        widgets["name"].pack(anchor="w", pady=(15, 5))
 
         # Book count
-        tk.Label(
+        widgets["count"] = tk.Label(
             info_frame,
             text=f"{category.book_count} books",
             font=("Segoe UI", 10),
             bg="white",
             fg="#666666"
-        ).pack(anchor="w")
+        )
+        widgets["count"].pack(anchor="w")
 
         # Actions frame
         actions_frame = tk.Frame(info_frame, bg="white")
@@ -248,54 +325,54 @@ class CategoriesTab:
         return card
 
     def show_empty_state(self):
-        empty_frame.pack(fill=tk.BOTH, expand=True, pady=100)
+        """Show empty categories message"""
         empty_frame = tk.Frame(self.scrollable_frame, bg=COLORS["background"])
-        tk.Label(me.pack(fill=tk.BOTH, expand=True, pady=100)
+        empty_frame.pack(fill=tk.BOTH, expand=True, pady=100)
+
+        tk.Label(
             empty_frame,
             text="🏷️",
             font=("Segoe UI", 72),
             bg=COLORS["background"],
-            fg=COLORS["light"]72),
-        ).pack()OLORS["background"],
             fg=COLORS["light"]
+        ).pack()
+
         tk.Label(
             empty_frame,
             text="No categories yet",
             font=("Segoe UI", 16),
-            bg=COLORS["background"],,
-            fg=COLORS["text"] 16),
-        ).pack(pady=10)background"],
+            bg=COLORS["background"],
             fg=COLORS["text"]
-        tk.Label(dy=10)
+        ).pack(pady=10)
+
+        tk.Label(
             empty_frame,
             text="Create your first category to organize books!",
             font=("Segoe UI", 12),
-            bg=COLORS["background"],category to organize books!",
-            fg=COLORS["text"] 12),
-        ).pack()OLORS["background"],
+            bg=COLORS["background"],
             fg=COLORS["text"]
+        ).pack()
+
         create_button = tk.Button(
             empty_frame,
             text="➕ Create Category",
             font=("Segoe UI", 11, "bold"),
-            bg=COLORS["primary"],ry",
-            fg="white",e UI", 11, "bold"),
+            bg=COLORS["primary"],
+            fg="white",
             activebackground=COLORS["secondary"],
             activeforeground="white",
-            relief="flat",nd=COLORS["secondary"],
-            padx=20,reground="white",
-            pady=10,flat",
+            relief="flat",
+            padx=20,
+            pady=10,
             cursor="hand2",
             command=self.create_category
-        )   cursor="hand2",
-        create_button.pack(pady=20)egory
         )
-    def refresh(self):pack(pady=20)
+        create_button.pack(pady=20)
+
+    def refresh(self):
         """Refresh categories display"""
         self.display_categories()
-        """Refresh categories display"""
+
     def _on_mousewheel(self, event):
         """Handle mouse wheel scrolling"""
         self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-        """Handle mouse wheel scrolling"""
-        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
\ No newline at end of file
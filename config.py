@@ -41,6 +41,18 @@ STATUS_ICONS = {
 DATABASE_FILE = "books_data.json"
 CATEGORIES_FILE = "data/categories.json"
 STATS_FILE = "data/stats.json"
+# Append-only reading-session log used for streaks (None disables it)
+SESSIONS_FILE = "data/reading_sessions.jsonl"
+# Unlocked achievements (kept once earned)
+ACHIEVEMENTS_FILE = "data/achievements.json"
+
+# Storage backend for books/categories: "json", "journal" or "sqlite"
+STORAGE_BACKEND = "json"
+LIBRARY_DB_FILE = "library_data.db"
+
+# Seconds of quiet after the last edit before books are saved in the background
+# (None saves synchronously on every edit)
+WRITE_BEHIND_DELAY = 0.5
 
 # Application Configuration
 APP_TITLE = "Libris Core"
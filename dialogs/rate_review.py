@@ -174,19 +174,18 @@ class RateReviewDialog:
         try:
             review_text = self.review_text.get("1.0", tk.END).strip()
 
-            # Update book defensively
-            try:
-                setattr(self.book, "rating", self.rating)
-                setattr(self.book, "review", review_text)
-            except Exception:
-                pass
-
-            # Save to service if available
+            # Save to service if available (the write itself happens in the background)
             svc = getattr(self.app, "book_service", None)
-            if svc:
-                fn = getattr(svc, "update_book", None) or getattr(svc, "save_book", None) or getattr(svc, "add_book", None)
-                if callable(fn):
-                    fn(self.book)
+            fn = getattr(svc, "rate_book", None) if svc else None
+            if callable(fn) and getattr(self.book, "id", None):
+                fn(self.book.id, self.rating, review_text)
+            else:
+                # Update book defensively
+                try:
+                    setattr(self.book, "rating", self.rating)
+                    setattr(self.book, "review", review_text)
+                except Exception:
+                    pass
 
             messagebox.showinfo("Success", "Review saved successfully!")
             self.dialog.destroy()
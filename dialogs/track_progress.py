@@ -141,31 +141,25 @@ class TrackProgressDialog:
                 messagebox.showerror("Error", "Page cannot be negative.")
                 return
 
-            # update book object defensively
-            try:
-                setattr(self.book, "current_page", page)
-            except Exception:
-                pass
-
-            if total > 0:
-                prog = int((page / total) * 100)
-                prog = max(0, min(100, prog))
+            # Persist via service if available; the service updates the book and
+            # queues the write so the dialog doesn't wait on disk I/O
+            svc = getattr(self.app, "book_service", None)
+            fn = getattr(svc, "update_book", None) if svc else None
+            if callable(fn) and getattr(self.book, "id", None):
                 try:
-                    setattr(self.book, "progress", prog)
+                    fn(self.book.id, {"current_page": page})
+                except Exception as e:
+                    # non-fatal, but inform user
+                    messagebox.showwarning("Warning", f"Failed to persist progress to service: {e}")
+            else:
+                # update book object defensively
+                try:
+                    setattr(self.book, "current_page", page)
+                    if total > 0:
+                        setattr(self.book, "progress", max(0, min(100, int((page / total) * 100))))
                 except Exception:
                     pass
 
-            # Persist via service if available
-            svc = getattr(self.app, "book_service", None)
-            if svc:
-                fn = getattr(svc, "update_book", None) or getattr(svc, "save_book", None) or getattr(svc, "add_book", None)
-                if callable(fn):
-                    try:
-                        fn(self.book)
-                    except Exception as e:
-                        # non-fatal, but inform user
-                        messagebox.showwarning("Warning", f"Saved locally but failed to persist to service: {e}")
-
             messagebox.showinfo("Success", "Progress updated.")
             self.dialog.destroy()
 
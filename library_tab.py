@@ -7,6 +7,11 @@ import platform  # For cross-platform mouse wheel handling
 # Adjust path for imports (retains original logic)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+try:
+    from config import ITEMS_PER_PAGE
+except ImportError:
+    ITEMS_PER_PAGE = 20
+
 try:
     from config import COLORS, STATUS_COLORS
 except ImportError as e:
@@ -31,7 +36,23 @@ except ImportError as e:
     print(f"Error importing BookCard: {e}. Book display will be disabled.")
     BookCard = None  # Fallback to disable book cards
 
+try:
+    from services.events import BookAdded, BookDeleted, BookUpdated, LibraryReloaded
+    from services.query_parser import matched_fields
+except ImportError as e:
+    print(f"Error importing change events: {e}. Library will not follow edits.")
+    BookAdded = BookDeleted = BookUpdated = LibraryReloaded = None
+
 class LibraryTab:
+    # sort combobox label -> (BookService sort key, descending)
+    SORT_ORDERS = {
+        "Title": ("title", False),
+        "Author": ("author", False),
+        "Progress": ("progress", True),
+        "Rating": ("rating", True),
+        "Recently Added": ("added", True),
+    }
+
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
@@ -46,8 +67,69 @@ class LibraryTab:
 
         # Current books display
         self.current_books = []
+        # cursor of the next page (None when everything is shown)
+        self.next_cursor = None
+        self.total_books = 0
+        self.more_button = None
+        self.page_request = {}
+        # book id -> card on screen, for edits that only touch one card
+        self.cards = {}
+        self._reload_job = None
+        self._unsubscribers = []
 
         self.create_widgets()
+        self.subscribe_events()
+
+    def subscribe_events(self):
+        """Follow book changes: edits update their card, anything else reloads the view"""
+        events = getattr(self.app, 'events', None)
+        if events is None or BookUpdated is None:
+            return
+        self._unsubscribers = [
+            events.subscribe(BookUpdated, self.on_book_updated),
+            events.subscribe(BookAdded, self.schedule_reload),
+            events.subscribe(BookDeleted, self.schedule_reload),
+            events.subscribe(LibraryReloaded, self.schedule_reload),
+        ]
+        self.frame.bind("<Destroy>", self._on_destroy)
+
+    def _on_destroy(self, event=None):
+        if event is not None and event.widget is not self.frame:
+            return
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+
+    def on_book_updated(self, event):
+        """Update the one card showing the book, unless the edit moves it in or out of view"""
+        if self._changes_view(event):
+            self.schedule_reload()
+            return
+        card = self.cards.get(event.book_id)
+        if card is not None and hasattr(card, 'update'):
+            card.update(event.book, event.changed)
+
+    def _changes_view(self, event):
+        """Whether an edit can change which books are shown or their order"""
+        sort_key = self.SORT_ORDERS.get(self.sort_by.get(), ("added", False))[0]
+        if sort_key in event.changed:
+            return True
+        if self.status_filter.get() != "All" and 'status' in event.changed:
+            return True
+        return event.touches(*matched_fields(self.search_query.get().strip()))
+
+    def schedule_reload(self, event=None):
+        """Reload the view once the current batch of changes is over"""
+        if self._reload_job is not None:
+            return
+        try:
+            self._reload_job = self.frame.after_idle(self._reload)
+        except Exception:
+            self._reload()
+
+    def _reload(self):
+        self._reload_job = None
+        self.filter_books()
 
     def create_widgets(self):
         """Create all widgets for library tab"""
@@ -189,54 +271,66 @@ class LibraryTab:
         """Filter books based on current criteria"""
         query = self.search_query.get().lower().strip()
         status = self.status_filter.get()
+        service = getattr(self.app, 'book_service', None)
+
+        # Fetch the first page in the chosen order straight from the
+        # service's sorted indexes; nothing is sorted here
+        if hasattr(service, 'query_page'):
+            sort_key, descending = self.SORT_ORDERS.get(self.sort_by.get(), ("added", False))
+            self.page_request = {
+                'sort': sort_key,
+                'descending': descending,
+                'query': query,
+                'filters': {'status': status},
+                'page_size': ITEMS_PER_PAGE,
+            }
+            try:
+                books, self.next_cursor, self.total_books = service.query_page(**self.page_request)
+            except Exception as e:
+                print(f"Error fetching books: {e}")
+                books, self.next_cursor, self.total_books = [], None, 0
+            self.current_books = books
+            self.display_books()
+            return
 
         try:
-            # Get all books (safe call)
-            if not hasattr(self.app, 'book_service') or not hasattr(self.app.book_service, 'get_all_books'):
-                raise AttributeError("book_service or get_all_books method not found.")
-            all_books = self.app.book_service.get_all_books()
+            if service is None or not hasattr(service, 'search_books'):
+                raise AttributeError("book_service or search_books method not found.")
+            filtered_books = service.search_books(query, {'status': status})
         except Exception as e:
             print(f"Error fetching books: {e}")
-            all_books = []
-
-        # Apply filters
-        filtered_books = []
-        for book in all_books:
-            try:
-                # Status filter (safe access)
-                book_status = getattr(book, 'status', 'Unknown')
-                if status != "All" and book_status != status:
-                    continue
-
-                # Search query filter (safe access)
-                if query:
-                    search_fields = [
-                        getattr(book, 'title', '').lower(),
-                        getattr(book, 'author', '').lower(),
-                        getattr(book, 'genre', '').lower(),
-                        getattr(book, 'isbn', '')
-                    ]
-                    if not any(query in field for field in search_fields):
-                        continue
-
-                filtered_books.append(book)
-            except Exception as e:
-                print(f"Error filtering book {book}: {e}")
-                continue
+            filtered_books = []
 
         # Sort books
         self.current_books = self.sort_books_list(filtered_books)
+        self.next_cursor = None
+        self.total_books = len(self.current_books)
 
         # Display books
         self.display_books()
 
     def sort_books(self):
-        """Sort current books"""
-        self.current_books = self.sort_books_list(self.current_books)
-        self.display_books()
+        """Show the current filter in the newly selected order"""
+        self.filter_books()
+
+    def load_more_books(self):
+        """Append the next page of the current view"""
+        if not self.next_cursor:
+            return
+        start = len(self.current_books)
+        try:
+            books, self.next_cursor, self.total_books = self.app.book_service.query_page(
+                cursor=self.next_cursor, **self.page_request
+            )
+        except ValueError:
+            # the sort changed under the cursor; start over
+            self.filter_books()
+            return
+        self.current_books.extend(books)
+        self.display_books(start)
 
     def sort_books_list(self, books):
-        """Sort books based on current sort criteria"""
+        """Sort books based on current sort criteria (for services without query_page)"""
         sort_criteria = self.sort_by.get()
 
         try:
@@ -256,18 +350,23 @@ class LibraryTab:
             print(f"Error sorting books: {e}")
             return books
 
-    def display_books(self):
-        """Display books in grid layout"""
-        # Clear existing books
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+    def display_books(self, start=0):
+        """Display books in grid layout (from ``start`` when appending a page)"""
+        if start == 0:
+            # Clear existing books
+            for widget in self.scrollable_frame.winfo_children():
+                widget.destroy()
+            self.cards = {}
+        elif self.more_button is not None:
+            self.more_button.destroy()
+        self.more_button = None
 
         if not self.current_books:
             self.show_empty_state()
             return
 
         # Display books in grid (4 columns)
-        for i, book in enumerate(self.current_books):
+        for i, book in enumerate(self.current_books[start:], start):
             try:
                 row = i // 4
                 col = i % 4
@@ -275,6 +374,7 @@ class LibraryTab:
                 # Create book card (only if BookCard is available)
                 if BookCard:
                     book_card = BookCard(self.scrollable_frame, book, self.app)
+                    self.cards[getattr(book, 'id', None)] = book_card
                     book_card.frame.grid(
                         row=row,
                         column=col,
@@ -293,6 +393,22 @@ class LibraryTab:
                 print(f"Error displaying book {book}: {e}")
                 continue
 
+        if self.next_cursor:
+            remaining = self.total_books - len(self.current_books)
+            self.more_button = tk.Button(
+                self.scrollable_frame,
+                text=f"Load more ({remaining} remaining)",
+                font=("Segoe UI", 10),
+                bg=COLORS["light"],
+                fg=COLORS["text"],
+                relief="flat",
+                padx=15,
+                pady=6,
+                cursor="hand2",
+                command=self.load_more_books
+            )
+            self.more_button.grid(row=(len(self.current_books) + 3) // 4, column=0, columnspan=4, pady=15)
+
     def show_empty_state(self):
         """Show empty library message"""
         empty_frame = tk.Frame(self.scrollable_frame, bg=COLORS["background"])
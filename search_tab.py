@@ -4,9 +4,24 @@ from tkinter import ttk, messagebox
 from config import COLORS, STATUS_COLORS
 from components.dialogs.book_details import BookDetailsDialog
 from utils.helpers import get_star_rating, truncate_text
+from utils.text import fold
+from services.events import BookAdded, BookDeleted, BookUpdated, LibraryReloaded
+from services.query_parser import matched_fields
+
+# book attribute each filter looks at
+FILTER_FIELDS = {"status": "status", "category": "categories", "min_rating": "rating"}
+# fields the facet counts are made of
+FACET_FIELDS = ("status", "categories", "genre", "rating", "year")
 
 
 class SearchTab:
+    # result rows built per page; more are added with "Show more"
+    PAGE_SIZE = 50
+    # the full search waits this long after the last key press (ms)
+    SEARCH_DELAY = 250
+    # completions shown under the search entry
+    COMPLETION_LIMIT = 8
+
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
@@ -18,7 +33,83 @@ class SearchTab:
         self.category_filter = tk.StringVar(value="All")
         self.rating_filter = tk.StringVar(value="0")
 
+        self.status_buttons = {}
+        self.facet_label = None
+
+        # paging state of the current search
+        self.current_query = ""
+        self.current_filters = {}
+        self.current_page = 0
+        self.total_results = 0
+        self.shown_results = 0
+        self.more_button = None
+        # book id -> result row on screen, for edits that only touch one row
+        self.result_rows = {}
+        self.searched = False
+        self._research_job = None
+        self._unsubscribers = []
+
+        # autocomplete dropdown state
+        self.search_entry = None
+        self.suggestion_box = None
+        self.completions = []
+        self._search_job = None
+
         self.create_widgets()
+        self.subscribe_events()
+
+    def subscribe_events(self):
+        """Follow book changes: edits redraw their row, anything else re-runs the search"""
+        events = getattr(self.app, 'events', None)
+        if events is None:
+            return
+        self._unsubscribers = [
+            events.subscribe(BookUpdated, self.on_book_updated),
+            events.subscribe(BookAdded, self.schedule_search),
+            events.subscribe(BookDeleted, self.schedule_search),
+            events.subscribe(LibraryReloaded, self.schedule_search),
+        ]
+        self.frame.bind("<Destroy>", self._on_destroy)
+
+    def _on_destroy(self, event=None):
+        if event is not None and event.widget is not self.frame:
+            return
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+
+    def on_book_updated(self, event):
+        """Redraw the one row showing the book, unless the edit can change the results"""
+        if not self.searched:
+            return
+        fields = matched_fields(self.current_query)
+        fields.update(FILTER_FIELDS[name] for name in self.current_filters if name in FILTER_FIELDS)
+        if event.touches(*fields):
+            self.schedule_search()
+            return
+        if event.touches(*FACET_FIELDS):
+            self.update_facets(self.current_query, self.current_filters)
+        entry = self.result_rows.get(event.book_id)
+        if entry is None:
+            return
+        old_row, index = entry
+        row = self.create_result_row(event.book, index)
+        row.pack(fill=tk.X, pady=2, before=old_row)
+        old_row.destroy()
+        self.result_rows[event.book_id] = (row, index)
+
+    def schedule_search(self, event=None):
+        """Re-run the current search once the current batch of changes is over"""
+        if not self.searched or self._research_job is not None:
+            return
+        try:
+            self._research_job = self.frame.after_idle(self._research)
+        except Exception:
+            self._research()
+
+    def _research(self):
+        self._research_job = None
+        self.perform_search()
 
     def create_widgets(self):
         """Create all widgets for search tab"""
@@ -68,7 +159,24 @@ class SearchTab:
             width=40
         )
         search_entry.pack(side=tk.LEFT, padx=(0, 10))
-        search_entry.bind("<KeyRelease>", lambda e: self.perform_search())
+        search_entry.bind("<KeyRelease>", self.on_search_key)
+        search_entry.bind("<Down>", self.focus_completions)
+        search_entry.bind("<Escape>", lambda e: self.hide_completions())
+        search_entry.bind("<Return>", lambda e: self.run_search_now())
+        self.search_entry = search_entry
+
+        # Autocomplete dropdown, placed under the entry while there are completions
+        self.suggestion_box = tk.Listbox(
+            self.frame,
+            font=("Segoe UI", 11),
+            height=self.COMPLETION_LIMIT,
+            activestyle="dotbox",
+            relief="solid",
+            bd=1
+        )
+        self.suggestion_box.bind("<ButtonRelease-1>", self.accept_completion)
+        self.suggestion_box.bind("<Return>", self.accept_completion)
+        self.suggestion_box.bind("<Escape>", lambda e: (self.hide_completions(), self.search_entry.focus_set()))
 
         # Clear button
         clear_button = tk.Button(
@@ -87,6 +195,14 @@ class SearchTab:
         )
         clear_button.pack(side=tk.LEFT)
 
+        tk.Label(
+            search_frame,
+            text="Tip: author:tolkien  status:reading  rating>=4  year:1930..1960  cat:Favorites  -genre:romance",
+            font=("Segoe UI", 9),
+            bg=COLORS["background"],
+            fg=COLORS["text"]
+        ).pack(anchor="w", pady=(6, 0))
+
     def create_filters(self, parent):
         """Create search filters"""
         filters_frame = tk.Frame(parent, bg=COLORS["background"])
@@ -117,8 +233,9 @@ class SearchTab:
         ).pack(anchor="w")
 
         statuses = ["All", "Reading", "Completed", "On Hold", "Not Started"]
+        self.status_buttons = {}
         for status in statuses:
-            tk.Radiobutton(
+            button = tk.Radiobutton(
                 status_frame,
                 text=status,
                 variable=self.status_filter,
@@ -126,7 +243,9 @@ class SearchTab:
                 bg=COLORS["background"],
                 fg=COLORS["text"],
                 command=self.perform_search
-            ).pack(anchor="w")
+            )
+            button.pack(anchor="w")
+            self.status_buttons[status] = button
 
         # Category filter
         category_frame = tk.Frame(filter_grid, bg=COLORS["background"])
@@ -189,6 +308,19 @@ class SearchTab:
         rating_menu.pack(anchor="w")
         rating_menu.bind("<<ComboboxSelected>>", lambda e: self.perform_search())
 
+        # Facet counts for the current search (what each option would match)
+        self.facet_label = tk.Label(
+            filters_frame,
+            text="",
+            font=("Segoe UI", 9),
+            bg=COLORS["background"],
+            fg=COLORS["text"],
+            justify=tk.LEFT,
+            anchor="w",
+            wraplength=900
+        )
+        self.facet_label.pack(fill=tk.X, pady=(8, 0))
+
     def create_results_display(self, parent):
         """Create results display area"""
         # Results container
@@ -233,6 +365,79 @@ class SearchTab:
         # Bind mouse wheel
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
 
+    def on_search_key(self, event=None):
+        """Update completions right away; run the full search once typing pauses"""
+        if event is not None and event.keysym in ("Down", "Up", "Escape", "Return"):
+            return
+        self.update_completions()
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+        self._search_job = self.frame.after(self.SEARCH_DELAY, self.run_search_now)
+
+    def run_search_now(self):
+        """Run the pending search immediately"""
+        if self._search_job is not None:
+            self.frame.after_cancel(self._search_job)
+            self._search_job = None
+        self.hide_completions()
+        self.perform_search()
+
+    def update_completions(self):
+        """Fill the dropdown with titles, authors, genres and categories for the typed prefix"""
+        prefix = self.search_query.get().strip()
+        completions = []
+        if prefix and hasattr(self.app.book_service, 'complete'):
+            try:
+                completions = self.app.book_service.complete(prefix, self.COMPLETION_LIMIT)
+            except Exception as e:
+                print(f"Error building completions: {e}")
+            # categories without books yet still complete, after the used ones
+            category_service = getattr(self.app, 'category_service', None)
+            if category_service is not None and len(completions) < self.COMPLETION_LIMIT:
+                known = {(c["kind"], c["text"]) for c in completions}
+                folded = fold(prefix)
+                for category in category_service.get_all_categories():
+                    name = category.name
+                    if ("category", name) not in known and fold(name).startswith(folded):
+                        completions.append({"text": name, "kind": "category", "count": 0})
+                        if len(completions) >= self.COMPLETION_LIMIT:
+                            break
+
+        self.completions = completions
+        if not completions:
+            self.hide_completions()
+            return
+        self.suggestion_box.delete(0, tk.END)
+        for item in completions:
+            self.suggestion_box.insert(tk.END, f"{item['text']}  ·  {item['kind']}")
+        self.suggestion_box.config(height=len(completions))
+        self.suggestion_box.place(in_=self.search_entry, x=0, rely=1.0, relwidth=1.0)
+        self.suggestion_box.lift()
+
+    def focus_completions(self, event=None):
+        """Move keyboard focus from the entry into the dropdown"""
+        if self.completions:
+            self.suggestion_box.focus_set()
+            self.suggestion_box.selection_clear(0, tk.END)
+            self.suggestion_box.selection_set(0)
+            self.suggestion_box.activate(0)
+        return "break"
+
+    def accept_completion(self, event=None):
+        """Search for the chosen completion"""
+        selection = self.suggestion_box.curselection()
+        if not selection:
+            return
+        self.search_query.set(self.completions[selection[0]]["text"])
+        self.search_entry.focus_set()
+        self.search_entry.icursor(tk.END)
+        self.run_search_now()
+
+    def hide_completions(self):
+        self.completions = []
+        if self.suggestion_box is not None:
+            self.suggestion_box.place_forget()
+
     def perform_search(self, event=None):
         """Perform search with current filters"""
         query = self.search_query.get().strip()
@@ -249,29 +454,107 @@ class SearchTab:
         if min_rating > 0:
             filters['min_rating'] = min_rating
 
-        # Perform search
-        results = self.app.book_service.search_books(query, filters)
+        # Perform search: first page, ranked by relevance
+        self.searched = True
+        self.current_query = query
+        self.current_filters = filters
+        self.current_page = 0
+        if hasattr(self.app.book_service, 'search_ranked'):
+            results, total = self.app.book_service.search_ranked(query, filters, page=0, page_size=self.PAGE_SIZE)
+        else:
+            results = self.app.book_service.search_books(query, filters)
+            total = len(results)
 
         # Update results count
-        self.results_count_label.config(text=f"Results: {len(results)}")
+        self.results_count_label.config(text=f"Results: {total}")
+        self.update_facets(query, filters)
 
         # Display results
-        self.display_results(results)
+        self.display_results(results, total)
+
+    def update_facets(self, query, filters):
+        """Show per-option match counts next to the filters"""
+        if not hasattr(self.app.book_service, 'search_facets'):
+            return
+        try:
+            facets = self.app.book_service.search_facets(query, filters)
+        except Exception as e:
+            print(f"Error computing facets: {e}")
+            return
 
-    def display_results(self, books):
+        status_counts = facets["status"]
+        for status, button in self.status_buttons.items():
+            if status == "All":
+                count = sum(status_counts.values())
+            else:
+                count = status_counts.get(status, 0)
+            button.config(text=f"{status} ({count})")
+
+        lines = []
+        if facets["category"]:
+            lines.append("Categories: " + "  ·  ".join(f"{name} {count}" for name, count in facets["category"].items()))
+        ratings = [f"{t}+ {c}" for t, c in facets["rating"].items() if t > 0]
+        lines.append("Min rating: " + "  ·  ".join(ratings))
+        if facets["genre"]:
+            top = list(facets["genre"].items())[:8]
+            lines.append("Genres: " + "  ·  ".join(f"{name.title()} {count}" for name, count in top))
+        if facets["decade"]:
+            lines.append("Decades: " + "  ·  ".join(f"{decade}s {count}" for decade, count in facets["decade"].items()))
+        self.facet_label.config(text="\n".join(lines))
+
+    def display_results(self, books, total=None):
         """Display search results"""
         # Clear previous results
         for widget in self.results_frame.winfo_children():
             widget.destroy()
+        self.more_button = None
+        self.shown_results = 0
+        self.result_rows = {}
+        self.total_results = len(books) if total is None else total
 
         if not books:
             self.show_empty_results()
             return
 
+        self.append_results(books)
+
+    def append_results(self, books):
+        """Add result rows below the ones already shown"""
+        if self.more_button is not None:
+            self.more_button.destroy()
+            self.more_button = None
+
         # Display books in list view
-        for i, book in enumerate(books):
-            result_row = self.create_result_row(book, i)
+        for book in books:
+            result_row = self.create_result_row(book, self.shown_results)
             result_row.pack(fill=tk.X, pady=2)
+            self.result_rows[getattr(book, 'id', None)] = (result_row, self.shown_results)
+            self.shown_results += 1
+
+        remaining = self.total_results - self.shown_results
+        if remaining > 0:
+            self.more_button = tk.Button(
+                self.results_frame,
+                text=f"Show more ({remaining} remaining)",
+                font=("Segoe UI", 10),
+                bg=COLORS["light"],
+                fg=COLORS["text"],
+                relief="flat",
+                padx=15,
+                pady=6,
+                cursor="hand2",
+                command=self.load_more_results
+            )
+            self.more_button.pack(pady=10)
+
+    def load_more_results(self):
+        """Fetch and show the next page of the current search"""
+        self.current_page += 1
+        books, self.total_results = self.app.book_service.search_ranked(
+            self.current_query, self.current_filters,
+            page=self.current_page, page_size=self.PAGE_SIZE
+        )
+        self.append_results(books)
 
     def create_result_row(self, book, index):
         """Create a search result row"""
@@ -430,6 +713,38 @@ class SearchTab:
             fg=COLORS["text"]
         ).pack()
 
+        # "Did you mean" suggestions from the title/author vocabulary
+        suggestions = []
+        query = self.search_query.get().strip()
+        if query and hasattr(self.app.book_service, 'suggest_queries'):
+            try:
+                suggestions = self.app.book_service.suggest_queries(query)
+            except Exception as e:
+                print(f"Error building suggestions: {e}")
+        if suggestions:
+            suggest_frame = tk.Frame(empty_frame, bg=COLORS["background"])
+            suggest_frame.pack(pady=(15, 0))
+            tk.Label(
+                suggest_frame,
+                text="Did you mean:",
+                font=("Segoe UI", 11),
+                bg=COLORS["background"],
+                fg=COLORS["text"]
+            ).pack(side=tk.LEFT, padx=(0, 5))
+            for suggestion in suggestions:
+                tk.Button(
+                    suggest_frame,
+                    text=suggestion,
+                    font=("Segoe UI", 11, "underline"),
+                    bg=COLORS["background"],
+                    fg=COLORS["primary"],
+                    activebackground=COLORS["background"],
+                    relief="flat",
+                    bd=0,
+                    cursor="hand2",
+                    command=lambda s=suggestion: self.apply_suggestion(s)
+                ).pack(side=tk.LEFT, padx=4)
+
         # Clear filters button
         clear_button = tk.Button(
             empty_frame,
@@ -447,12 +762,18 @@ class SearchTab:
         )
         clear_button.pack(pady=20)
 
+    def apply_suggestion(self, suggestion):
+        """Search again with a suggested spelling"""
+        self.search_query.set(suggestion)
+        self.perform_search()
+
     def clear_search(self):
         """Clear all search filters"""
         self.search_query.set("")
         self.status_filter.set("All")
         self.category_filter.set("All")
         self.rating_filter.set("0")
+        self.hide_completions()
 
         # Perform empty search to show all books
         self.perform_search()
@@ -0,0 +1,170 @@
+# services/achievement_rules.py
+"""Declarative achievement rules, re-checked only when their inputs change."""
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import json
+import os
+
+from services.stats_aggregator import completion_days
+from services.storage import _atomic_write_json
+
+# the aggregates rules may depend on
+INPUTS = (
+    "total_books",
+    "completed_books",
+    "completed_genres",
+    "concurrent_reading",
+    "fastest_completion",
+    "longest_streak",
+)
+
+
+class Rule:
+    """Unlocks ``achievement_id`` once ``test(*values of inputs)`` holds"""
+
+    def __init__(self, achievement_id: str, inputs: Tuple[str, ...], test: Callable[..., bool]):
+        unknown = set(inputs) - set(INPUTS)
+        if unknown:
+            raise ValueError(f"unknown achievement inputs: {sorted(unknown)}")
+        self.achievement_id = achievement_id
+        self.inputs = tuple(inputs)
+        self.test = test
+
+    def holds(self, values: Dict[str, Any]) -> bool:
+        try:
+            return bool(self.test(*(values.get(name) for name in self.inputs)))
+        except TypeError:
+            # an input without a value yet (e.g. no finished book for speed-reader)
+            return False
+
+
+def _at_least(n: int) -> Callable[[Any], bool]:
+    return lambda value: value is not None and value >= n
+
+
+RULES = (
+    Rule("first-book", ("total_books",), _at_least(1)),
+    Rule("five-books", ("total_books",), _at_least(5)),
+    Rule("ten-books", ("total_books",), _at_least(10)),
+    Rule("week-streak", ("longest_streak",), _at_least(7)),
+    Rule("multitasker", ("concurrent_reading",), _at_least(3)),
+    Rule("dedicated-reader", ("completed_books",), _at_least(5)),
+    Rule("speed-reader", ("fastest_completion",), lambda days: days is not None and days <= 3),
+    # five different genres read to the end, not merely shelved
+    Rule("genre-master", ("completed_genres",), _at_least(5)),
+)
+
+
+def library_inputs(book_service) -> Dict[str, Any]:
+    """Rule inputs from a BookService's running statistics (no book is scanned)"""
+    stats = book_service.indexes.stats
+    sessions = getattr(book_service, "sessions", None)
+    return {
+        "total_books": stats.total,
+        "completed_books": stats.count("Completed"),
+        "completed_genres": stats.distinct_completed_genres,
+        "concurrent_reading": stats.count("Reading"),
+        "fastest_completion": stats.fastest_completion(),
+        "longest_streak": sessions.longest_streak() if sessions is not None else 0,
+    }
+
+
+def inputs_of(books: Iterable, longest_streak: int = 0) -> Dict[str, Any]:
+    """Rule inputs computed by scanning ``books``"""
+    books = list(books)
+    genres = set()
+    durations = []
+    for book in books:
+        if getattr(book, "status", "") == "Completed":
+            for genre in str(getattr(book, "genre", "") or "").split(","):
+                if genre.strip():
+                    genres.add(genre.strip())
+        days = completion_days(getattr(book, "start_date", None), getattr(book, "finish_date", None))
+        if days is not None:
+            durations.append(days)
+    return {
+        "total_books": len(books),
+        "completed_books": sum(1 for b in books if getattr(b, "status", "") == "Completed"),
+        "completed_genres": len(genres),
+        "concurrent_reading": sum(1 for b in books if getattr(b, "status", "") == "Reading"),
+        "fastest_completion": min(durations) if durations else None,
+        "longest_streak": longest_streak,
+    }
+
+
+class AchievementEngine:
+    """Evaluates RULES against aggregate values and remembers unlocks.
+
+    ``evaluate(values)`` compares each input with the value seen last time
+    and re-checks only the still-locked rules that depend on an input that
+    changed.  Unlocks are sticky: once earned, an achievement stays
+    unlocked (with the date it was earned) and, given ``state_file``, is
+    saved there so it survives restarts.
+    """
+
+    STATE_VERSION = 1
+
+    def __init__(self, rules: Iterable[Rule] = RULES, state_file: Optional[str] = None):
+        self.rules = list(rules)
+        self.state_file = state_file
+        self._by_input: Dict[str, List[Rule]] = {}
+        for rule in self.rules:
+            for name in rule.inputs:
+                self._by_input.setdefault(name, []).append(rule)
+        self._last: Dict[str, Any] = {}
+        # achievement id -> ISO date it was unlocked
+        self.unlocked: Dict[str, str] = {}
+        # rule checks performed, for tests and profiling
+        self.evaluations = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("version") == self.STATE_VERSION:
+                self.unlocked = {str(k): str(v) for k, v in state.get("unlocked", {}).items()}
+        except Exception as e:
+            print(f"Warning: ignoring achievement state: {e}")
+
+    def _save(self) -> None:
+        if not self.state_file:
+            return
+        try:
+            _atomic_write_json(self.state_file, {"version": self.STATE_VERSION, "unlocked": self.unlocked})
+        except Exception as e:
+            print(f"Warning: failed to save achievements: {e}")
+
+    def evaluate(self, values: Dict[str, Any]) -> List[str]:
+        """Re-check the rules affected by changed inputs; returns newly unlocked ids"""
+        changed = [name for name in INPUTS if name not in self._last or values.get(name) != self._last[name]]
+        self._last.update({name: values.get(name) for name in changed})
+        candidates = {}
+        for name in changed:
+            for rule in self._by_input.get(name, ()):
+                if rule.achievement_id not in self.unlocked:
+                    candidates[id(rule)] = rule
+        newly = []
+        for rule in candidates.values():
+            self.evaluations += 1
+            if rule.holds(values):
+                self.unlocked[rule.achievement_id] = date.today().isoformat()
+                newly.append(rule.achievement_id)
+        if newly:
+            self._save()
+        return newly
+
+    def apply(self, achievements: Iterable) -> None:
+        """Set ``unlocked`` on achievement objects or dicts"""
+        for a in achievements:
+            aid = a.get('id') if isinstance(a, dict) else getattr(a, 'id', None)
+            unlocked = aid in self.unlocked
+            if isinstance(a, dict):
+                a['unlocked'] = unlocked
+            else:
+                try:
+                    setattr(a, 'unlocked', unlocked)
+                except Exception:
+                    pass
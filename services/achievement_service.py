@@ -1,5 +1,7 @@
 """Achievement service: small helper to compute earned achievements."""
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from services.achievement_rules import AchievementEngine, library_inputs
 try:
 	from utils.sample_data import generate_sample_achievements
 except Exception:
@@ -11,17 +13,16 @@ except Exception:
 
 
 class AchievementService:
-	def __init__(self, book_service=None):
+	def __init__(self, book_service=None, state_file: Optional[str] = None, engine: Optional[AchievementEngine] = None):
 		self.book_service = book_service
 		self.achievements = generate_sample_achievements()
+		# rules and sticky unlocks live in services/achievement_rules.py; pass
+		# StatsService.engine to share its unlocks instead of keeping separate ones
+		self.engine = engine if engine is not None else AchievementEngine(state_file=state_file)
 
 	def get_achievements(self) -> List[Dict[str, Any]]:
 		if not self.book_service:
 			return self.achievements
-		total = len(self.book_service.get_all_books())
-		for a in self.achievements:
-			if a.get("id") == "first-book":
-				a["unlocked"] = total >= 1
-			if a.get("id") == "five-books":
-				a["unlocked"] = total >= 5
+		self.engine.evaluate(library_inputs(self.book_service))
+		self.engine.apply(self.achievements)
 		return self.achievements
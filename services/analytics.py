@@ -0,0 +1,269 @@
+# services/analytics.py
+"""Columnar library analytics, vectorized with NumPy when it is installed."""
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # optional: the pure-Python columns give the same results
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# whole stars a rating is counted under in rating_histogram()
+STARS = 6
+
+
+def _int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _stars(rating) -> int:
+    try:
+        stars = int(float(rating or 0))
+    except (TypeError, ValueError):
+        return 0
+    return min(max(stars, 0), STARS - 1)
+
+
+class Categories:
+    """name <-> small integer code, in order of first appearance"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def get(self, name: str) -> Optional[int]:
+        return self._codes.get(name)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class BookColumns:
+    """Numeric and categorical book attributes stored column by column.
+
+    Row ``i`` of every column describes the book in BookService slot ``i``
+    (``live`` is 1 where a row holds a book): integer ``pages``,
+    ``progress``, ``year`` and ``stars`` (the rating's whole stars) plus
+    ``status`` codes.  Genres are multi-valued, so they are exploded into
+    ``genre`` codes with the ``genre_row`` each came from (-1 marks a free
+    entry).  BookIndexes keeps one instance up to date through add() and
+    discard(), so the library is never rescanned to answer a query.
+
+    Every aggregation works on whole columns -- NumPy arrays when NumPy is
+    available (``use_numpy=None``), plain lists otherwise.  Both backends
+    sum integers only, so they return identical results.
+
+    ``status`` arguments restrict an aggregation to books with that status.
+    """
+
+    ROW_COLUMNS = ("live", "pages", "progress", "year", "stars", "status")
+
+    def __init__(self, books: Iterable = (), use_numpy: Optional[bool] = None):
+        if use_numpy is None:
+            use_numpy = HAVE_NUMPY
+        if use_numpy and not HAVE_NUMPY:
+            raise RuntimeError("NumPy is not installed")
+        self.backend = "numpy" if use_numpy else "python"
+        self.clear()
+        self.add_many(enumerate(books))
+
+    def clear(self) -> None:
+        self.statuses = Categories()
+        self.genres = Categories()
+        # live books; the first _size rows are in use, _capacity are allocated
+        self.rows = 0
+        self._size = self._capacity = 0
+        for name in self.ROW_COLUMNS:
+            setattr(self, name, self._column([]))
+        self._genre_size = self._genre_capacity = 0
+        self.genre = self._column([])
+        self.genre_row = self._column([])
+        # genre entries of each row, and entries free for reuse
+        self._genre_entries: Dict[int, List[int]] = {}
+        self._free_genres: List[int] = []
+
+    def _column(self, values: List[int]):
+        if self.backend == "numpy":
+            return np.asarray(values, dtype=np.int64)
+        return values
+
+    def _grown(self, column, capacity: int, fill: int = 0):
+        if self.backend == "numpy":
+            grown = np.full(capacity, fill, dtype=np.int64)
+            grown[:len(column)] = column
+            return grown
+        return column + [fill] * (capacity - len(column))
+
+    def _reserve(self, size: int) -> None:
+        if size > self._capacity:
+            self._capacity = max(size, 2 * self._capacity, 64)
+            for name in self.ROW_COLUMNS:
+                setattr(self, name, self._grown(getattr(self, name), self._capacity))
+        self._size = max(self._size, size)
+
+    def _values(self, book) -> tuple:
+        """The row ``book`` is stored as, in ROW_COLUMNS order"""
+        return (1, _int(getattr(book, "total_pages", 0)), _int(getattr(book, "progress", 0)),
+                _int(getattr(book, "year", 0)), _stars(getattr(book, "rating", 0)),
+                self.statuses.code(getattr(book, "status", "") or ""))
+
+    def _file_genres(self, row: int, book) -> None:
+        entries = []
+        for genre in str(getattr(book, "genre", "") or "").split(","):
+            genre = genre.strip()
+            if not genre:
+                continue
+            if self._free_genres:
+                entry = self._free_genres.pop()
+            else:
+                entry = self._genre_size
+                self._genre_size += 1
+                if entry >= self._genre_capacity:
+                    self._genre_capacity = max(entry + 1, 2 * self._genre_capacity, 64)
+                    self.genre = self._grown(self.genre, self._genre_capacity)
+                    self.genre_row = self._grown(self.genre_row, self._genre_capacity, -1)
+            self.genre[entry] = self.genres.code(genre)
+            self.genre_row[entry] = row
+            entries.append(entry)
+        if entries:
+            self._genre_entries[row] = entries
+
+    def add(self, row: int, book) -> None:
+        """Store ``book`` in ``row``, replacing whatever the row held"""
+        self.discard(row)
+        self._reserve(row + 1)
+        for name, value in zip(self.ROW_COLUMNS, self._values(book)):
+            getattr(self, name)[row] = value
+        self._file_genres(row, book)
+        self.rows += 1
+
+    def add_many(self, items: Iterable) -> None:
+        """add() for many ``(row, book)`` pairs, writing each column in one go"""
+        items = list(items)
+        if not items:
+            return
+        for row, _ in items:
+            self.discard(row)
+        rows = [row for row, _ in items]
+        self._reserve(max(rows) + 1)
+        columns = zip(*(self._values(book) for _, book in items))
+        for name, values in zip(self.ROW_COLUMNS, columns):
+            column = getattr(self, name)
+            if self.backend == "numpy":
+                column[rows] = values
+            else:
+                for row, value in zip(rows, values):
+                    column[row] = value
+        for row, book in items:
+            self._file_genres(row, book)
+        self.rows += len(items)
+
+    def discard(self, row: int) -> None:
+        if row >= self._size or not self.live[row]:
+            return
+        self.live[row] = 0
+        self.rows -= 1
+        for entry in self._genre_entries.pop(row, ()):
+            self.genre_row[entry] = -1
+            self._free_genres.append(entry)
+
+    def _rows(self, status: Optional[str] = None):
+        """Rows holding a book (with ``status``): a mask or a list of rows"""
+        live = self.live[:self._size]
+        code = None if status is None else self.statuses.get(status)
+        if self.backend == "numpy":
+            rows = live == 1
+            if status is not None:
+                rows &= self.status[:self._size] == (-1 if code is None else code)
+            return rows
+        status_of = self.status
+        return [row for row, value in enumerate(live)
+                if value and (status is None or status_of[row] == code)]
+
+    def _select(self, column, rows):
+        if self.backend == "numpy":
+            return column[:self._size][rows]
+        return [column[row] for row in rows]
+
+    def _bincount(self, codes, size: int) -> List[int]:
+        if self.backend == "numpy":
+            return np.bincount(codes, minlength=size).tolist()
+        counts = [0] * size
+        for code in codes:
+            counts[code] += 1
+        return counts
+
+    # --- aggregations -----------------------------------------------------
+
+    def count(self, status: Optional[str] = None) -> int:
+        if status is None:
+            return self.rows
+        rows = self._rows(status)
+        return int(rows.sum()) if self.backend == "numpy" else len(rows)
+
+    def total_pages(self, status: Optional[str] = None) -> int:
+        pages = self._select(self.pages, self._rows(status))
+        return int(pages.sum()) if self.backend == "numpy" else sum(pages)
+
+    def average_progress(self, status: Optional[str] = None) -> float:
+        books = self.count(status)
+        if not books:
+            return 0
+        progress = self._select(self.progress, self._rows(status))
+        total = int(progress.sum()) if self.backend == "numpy" else sum(progress)
+        return total / books
+
+    def rating_histogram(self, status: Optional[str] = None) -> Dict[int, int]:
+        """whole stars (0-5) -> books rated that (ratings are floored)"""
+        counts = self._bincount(self._select(self.stars, self._rows(status)), STARS)
+        return dict(enumerate(counts))
+
+    def per_year(self, status: Optional[str] = None) -> Dict[int, int]:
+        """publication year -> books, ascending (books without a year are left out)"""
+        years = self._select(self.year, self._rows(status))
+        if self.backend == "numpy":
+            values, counts = np.unique(years[years > 0], return_counts=True)
+            return dict(zip(values.tolist(), counts.tolist()))
+        return dict(sorted(Counter(year for year in years if year > 0).items()))
+
+    def status_counts(self) -> Dict[str, int]:
+        counts = self._bincount(self._select(self.status, self._rows()), len(self.statuses))
+        return {name: count for name, count in zip(self.statuses.names, counts) if count}
+
+    def genre_counts(self, status: Optional[str] = None) -> Dict[str, int]:
+        """genre -> occurrences, like StatsService.get_genre_distribution"""
+        codes, rows = self.genre[:self._genre_size], self.genre_row[:self._genre_size]
+        code = None if status is None else self.statuses.get(status)
+        if self.backend == "numpy":
+            codes, rows = codes[rows >= 0], rows[rows >= 0]
+            if status is not None:
+                codes = codes[self.status[rows] == (-1 if code is None else code)]
+        else:
+            status_of = self.status
+            codes = [g for g, row in zip(codes, rows) if row >= 0 and (status is None or status_of[row] == code)]
+        counts = self._bincount(codes, len(self.genres))
+        return {name: count for name, count in zip(self.genres.names, counts) if count}
+
+    def summary(self) -> Dict[str, object]:
+        """The library-wide figures in one dict"""
+        return {
+            "books": self.rows,
+            "total_pages": self.total_pages(),
+            "average_progress": self.average_progress(),
+            "ratings": self.rating_histogram(),
+            "years": self.per_year(),
+            "statuses": self.status_counts(),
+            "genres": self.genre_counts(),
+        }
@@ -0,0 +1,180 @@
+# services/autocomplete.py
+"""Prefix completions for the search entry (sorted array + bisect)."""
+import heapq
+import re
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from utils.text import fold
+
+_WORD_START_RE = re.compile(r"\w+")
+
+
+def book_phrases(book) -> List[Tuple[str, str]]:
+    """(kind, text) phrases a book contributes to the completions"""
+    phrases = []
+    for kind, name in (("title", "title"), ("author", "author")):
+        text = str(getattr(book, name, "") or "").strip()
+        if text:
+            phrases.append((kind, text))
+    genre = str(getattr(book, "genre", "") or "")
+    seen = set()
+    for part in genre.split(","):
+        part = part.strip()
+        if part and fold(part) not in seen:
+            seen.add(fold(part))
+            phrases.append(("genre", part))
+    for category in dict.fromkeys(getattr(book, "categories", None) or []):
+        phrases.append(("category", category))
+    return phrases
+
+
+class CompletionIndex:
+    """Reference-counted phrases, findable by a prefix of any of their words.
+
+    Every phrase ("The Lord of the Rings") is filed under the folded text
+    starting at each word ("the lord...", "lord of...", "rings"), in one
+    sorted array so a prefix is a contiguous ``bisect`` range.  Completions
+    are ranked by how many books use the phrase.
+
+    The top ``TOP_K`` phrases of a looked-up prefix are kept and updated in
+    place as counts change, so a short prefix is scanned once, not after
+    every edit.  An edit only touches the prefixes of the words it changes;
+    a phrase falling out of a kept top list drops just that list.
+    """
+
+    # prefixes whose top phrases are kept
+    CACHE_SIZE = 512
+    # phrases kept per prefix; larger limits scan the prefix range
+    TOP_K = 16
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str, str]] = []
+        # (kind, folded phrase) -> [display text, count]
+        self._phrases: Dict[Tuple[str, str], list] = {}
+        # folded prefix -> its top (kind, folded phrase) keys, best first
+        self._memo: "OrderedDict[str, List[Tuple[str, str]]]" = OrderedDict()
+        self._phrases_of: Dict[int, List[Tuple[str, str]]] = {}
+
+    def __len__(self):
+        return len(self._phrases)
+
+    @staticmethod
+    def _suffixes(folded: str) -> List[str]:
+        return [folded[m.start():] for m in _WORD_START_RE.finditer(folded)] or [folded]
+
+    def add_phrase(self, kind: str, text: str, count: int = 1) -> None:
+        for key in self._count_phrase(kind, text, count):
+            insort(self._keys, key)
+        self._rerank(kind, fold(text).strip(), grew=True)
+
+    def _count_phrase(self, kind: str, text: str, count: int) -> List[Tuple[str, str, str]]:
+        """Count a phrase in; returns the keys to file if it is new"""
+        folded = fold(text).strip()
+        if not folded:
+            return []
+        entry = self._phrases.get((kind, folded))
+        if entry is not None:
+            entry[1] += count
+            return []
+        self._phrases[(kind, folded)] = [text, count]
+        return [(suffix, kind, folded) for suffix in self._suffixes(folded)]
+
+    def remove_phrase(self, kind: str, text: str, count: int = 1) -> None:
+        folded = fold(text).strip()
+        entry = self._phrases.get((kind, folded))
+        if entry is None:
+            return
+        entry[1] -= count
+        if entry[1] <= 0:
+            del self._phrases[(kind, folded)]
+            for suffix in self._suffixes(folded):
+                i = bisect_left(self._keys, (suffix, kind, folded))
+                if i < len(self._keys) and self._keys[i] == (suffix, kind, folded):
+                    del self._keys[i]
+        self._rerank(kind, folded, grew=False)
+
+    def _rank(self, prefix: str, phrase: Tuple[str, str]) -> tuple:
+        # most used first, then phrases that start with the prefix, then A-Z
+        return -self._phrases[phrase][1], not phrase[1].startswith(prefix), phrase[1], phrase[0]
+
+    def _rerank(self, kind: str, folded: str, grew: bool) -> None:
+        """Bring the kept top lists of the prefixes ``folded`` matches up to date"""
+        if not folded or not self._memo:
+            return
+        phrase = (kind, folded)
+        prefixes = {suffix[:n] for suffix in self._suffixes(folded) for n in range(1, len(suffix) + 1)}
+        for prefix in prefixes & self._memo.keys():
+            top = self._memo[prefix]
+            if phrase in top:
+                if not grew:
+                    # something outside the list may now rank higher
+                    del self._memo[prefix]
+                    continue
+                top.remove(phrase)
+            elif not grew or (len(top) >= self.TOP_K and self._rank(prefix, phrase) > self._rank(prefix, top[-1])):
+                continue
+            # a list shorter than TOP_K holds every match, so the phrase belongs in it
+            ranks = [self._rank(prefix, item) for item in top]
+            top.insert(bisect_left(ranks, self._rank(prefix, phrase)), phrase)
+            del top[self.TOP_K:]
+
+    def add(self, ordinal: int, book) -> None:
+        phrases = book_phrases(book)
+        self._phrases_of[ordinal] = phrases
+        for kind, text in phrases:
+            self.add_phrase(kind, text)
+
+    def add_many(self, items) -> None:
+        """add() for many ``(ordinal, book)`` pairs, sorting the new keys in once"""
+        new_keys = []
+        for ordinal, book in items:
+            phrases = book_phrases(book)
+            self._phrases_of[ordinal] = phrases
+            for kind, text in phrases:
+                new_keys.extend(self._count_phrase(kind, text, 1))
+        if new_keys:
+            self._keys.extend(new_keys)
+            self._keys.sort()
+        self._memo.clear()
+
+    def discard(self, ordinal: int) -> None:
+        for kind, text in self._phrases_of.pop(ordinal, ()):
+            self.remove_phrase(kind, text)
+
+    def clear(self) -> None:
+        self._keys = []
+        self._phrases.clear()
+        self._phrases_of.clear()
+        self._memo.clear()
+
+    def complete(self, prefix: str, limit: int = 8) -> List[Dict[str, object]]:
+        """Top ``limit`` phrases with a word starting with ``prefix``, most used first.
+
+        Each result is ``{"text", "kind", "count"}``.
+        """
+        folded = fold(prefix).strip()
+        if not folded:
+            return []
+        top = self._memo.get(folded)
+        if top is not None:
+            self._memo.move_to_end(folded)
+        elif limit <= self.TOP_K:
+            top = self._memo[folded] = self._top(folded, self.TOP_K)
+            if len(self._memo) > self.CACHE_SIZE:
+                self._memo.popitem(last=False)
+        if top is None or limit > self.TOP_K:
+            top = self._top(folded, limit)
+        return [{"text": self._phrases[phrase][0], "kind": phrase[0], "count": self._phrases[phrase][1]}
+                for phrase in top[:limit]]
+
+    def _top(self, prefix: str, limit: int) -> List[Tuple[str, str]]:
+        """The best ``limit`` phrases under ``prefix``, scanning its key range"""
+        keys = self._keys
+        i = bisect_left(keys, (prefix,))
+        matches = set()
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            matches.add(keys[i][1:])
+            i += 1
+        return heapq.nsmallest(limit, matches, key=lambda phrase: self._rank(prefix, phrase))
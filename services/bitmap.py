@@ -0,0 +1,167 @@
+# services/bitmap.py
+"""Compressed ordinal bitmaps for combining filters with bitwise operations."""
+from typing import Dict, Iterable, Iterator, Optional
+
+# ordinals are grouped in chunks of 2**CHUNK_BITS; each chunk is one Python
+# int, so setting a bit copies at most a few hundred bytes and empty chunks
+# take no space at all (the same split roaring bitmaps use, with ints as
+# containers)
+CHUNK_BITS = 12
+_LOW_MASK = (1 << CHUNK_BITS) - 1
+
+try:
+    _popcount = int.bit_count  # Python 3.10+
+except AttributeError:  # pragma: no cover - older interpreters
+    def _popcount(value: int) -> int:
+        return bin(value).count("1")
+
+
+class Bitmap:
+    """Set of non-negative ints (slot ordinals) stored as chunked bit strings.
+
+    ``&``, ``|`` and ``-`` (AND, OR, ANDNOT) work chunk by chunk and never
+    look at individual ordinals; ``len()`` is a popcount.  Ordinals are only
+    produced when the bitmap is iterated, in ascending order, so a filter
+    result can be combined further, counted or tested with ``in`` without
+    ever being turned into a list.  Plain sets and other iterables are
+    accepted on either side of ``&``, ``|`` and ``-``.
+    """
+
+    __slots__ = ("_chunks", "_len")
+
+    def __init__(self, ordinals: Optional[Iterable[int]] = None):
+        self._chunks: Dict[int, int] = {}
+        self._len: Optional[int] = 0
+        if ordinals is not None:
+            for ordinal in ordinals:
+                self.add(ordinal)
+
+    @classmethod
+    def _from_chunks(cls, chunks: Dict[int, int]) -> "Bitmap":
+        bitmap = cls()
+        bitmap._chunks = chunks
+        bitmap._len = None
+        return bitmap
+
+    @classmethod
+    def of(cls, ordinals) -> "Bitmap":
+        """``ordinals`` as a bitmap (bitmaps are returned as they are)"""
+        return ordinals if isinstance(ordinals, Bitmap) else cls(ordinals)
+
+    def add(self, ordinal: int) -> None:
+        high, bit = ordinal >> CHUNK_BITS, 1 << (ordinal & _LOW_MASK)
+        chunk = self._chunks.get(high, 0)
+        if not chunk & bit:
+            self._chunks[high] = chunk | bit
+            if self._len is not None:
+                self._len += 1
+
+    def discard(self, ordinal: int) -> None:
+        high, bit = ordinal >> CHUNK_BITS, 1 << (ordinal & _LOW_MASK)
+        chunk = self._chunks.get(high, 0)
+        if chunk & bit:
+            chunk ^= bit
+            if chunk:
+                self._chunks[high] = chunk
+            else:
+                del self._chunks[high]
+            if self._len is not None:
+                self._len -= 1
+
+    def copy(self) -> "Bitmap":
+        bitmap = Bitmap._from_chunks(dict(self._chunks))
+        bitmap._len = self._len
+        return bitmap
+
+    def __contains__(self, ordinal) -> bool:
+        try:
+            return bool(self._chunks.get(ordinal >> CHUNK_BITS, 0) >> (ordinal & _LOW_MASK) & 1)
+        except TypeError:
+            return False
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = sum(_popcount(chunk) for chunk in self._chunks.values())
+        return self._len
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def __iter__(self) -> Iterator[int]:
+        chunks = self._chunks
+        for high in sorted(chunks):
+            base = high << CHUNK_BITS
+            chunk = chunks[high]
+            while chunk:
+                low = chunk & -chunk
+                yield base + low.bit_length() - 1
+                chunk ^= low
+
+    def __repr__(self):
+        return f"Bitmap({len(self)} ordinals)"
+
+    def __eq__(self, other):
+        if isinstance(other, Bitmap):
+            return self._chunks == other._chunks
+        if isinstance(other, (set, frozenset)):
+            return len(self) == len(other) and all(o in self for o in other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __and__(self, other) -> "Bitmap":
+        if not isinstance(other, Bitmap):
+            return Bitmap(o for o in other if o in self)
+        small, large = (self._chunks, other._chunks) if len(self._chunks) <= len(other._chunks) \
+            else (other._chunks, self._chunks)
+        chunks = {}
+        for high, chunk in small.items():
+            chunk &= large.get(high, 0)
+            if chunk:
+                chunks[high] = chunk
+        return Bitmap._from_chunks(chunks)
+
+    __rand__ = __and__
+
+    def __or__(self, other) -> "Bitmap":
+        other = Bitmap.of(other)
+        chunks = dict(self._chunks)
+        for high, chunk in other._chunks.items():
+            chunks[high] = chunks.get(high, 0) | chunk
+        return Bitmap._from_chunks(chunks)
+
+    __ror__ = __or__
+
+    def __sub__(self, other) -> "Bitmap":
+        """AND NOT"""
+        other = Bitmap.of(other)
+        chunks = {}
+        for high, chunk in self._chunks.items():
+            chunk &= ~other._chunks.get(high, 0)
+            if chunk:
+                chunks[high] = chunk
+        return Bitmap._from_chunks(chunks)
+
+    def __rsub__(self, other) -> "Bitmap":
+        return Bitmap(other) - self
+
+    @staticmethod
+    def union(bitmaps: Iterable["Bitmap"]) -> "Bitmap":
+        chunks: Dict[int, int] = {}
+        for bitmap in bitmaps:
+            for high, chunk in bitmap._chunks.items():
+                chunks[high] = chunks.get(high, 0) | chunk
+        return Bitmap._from_chunks(chunks)
+
+    @staticmethod
+    def intersection(bitmaps: Iterable["Bitmap"]) -> Optional["Bitmap"]:
+        """AND of ``bitmaps``, smallest first; None when there are none"""
+        bitmaps = sorted(bitmaps, key=lambda b: len(b._chunks))
+        if not bitmaps:
+            return None
+        result = bitmaps[0].copy()
+        for other in bitmaps[1:]:
+            if not result:
+                break
+            result = result & other
+        return result
@@ -0,0 +1,288 @@
+# services/book_indexes.py
+"""Secondary indexes over BookService slots.
+
+Indexes map attribute values to a bitmap of the slot ordinals holding
+matching books, so filters combine with bitwise AND/OR/ANDNOT.  Each
+index also remembers which keys it filed every ordinal under, so removing
+a book never needs the book's old attribute values -- callers can mutate
+a Book and simply re-add it.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from utils.text import collation_key, fold, split_genres
+from services.search_index import InvertedIndex, TrigramIndex
+from services.fuzzy_index import FuzzyIndex
+from services.autocomplete import CompletionIndex
+from services.analytics import BookColumns
+from services.bitmap import Bitmap
+from services.stats_aggregator import StatsAggregator
+from services.rollups import CompletionRollups
+from services.sorted_index import SortedIndex
+
+# Book fields the running statistics and rollups are computed from
+AGGREGATE_FIELDS = ("status", "progress", "total_pages", "genre", "start_date", "finish_date")
+
+
+class AttributeIndex:
+    """key -> bitmap of ordinals for one (possibly multi-valued) attribute."""
+
+    def __init__(self, name: str, keys_fn: Callable[[Any], Iterable]):
+        self.name = name
+        self.keys_fn = keys_fn
+        self._postings: Dict[Any, Bitmap] = {}
+        self._keys_of: Dict[int, tuple] = {}
+
+    def add(self, ordinal: int, book) -> None:
+        keys = tuple(self.keys_fn(book))
+        self._keys_of[ordinal] = keys
+        for key in keys:
+            self._postings.setdefault(key, Bitmap()).add(ordinal)
+
+    def discard(self, ordinal: int) -> None:
+        for key in self._keys_of.pop(ordinal, ()):
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.discard(ordinal)
+                if not postings:
+                    del self._postings[key]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._keys_of.clear()
+
+    def get(self, key) -> Bitmap:
+        """Ordinals filed under ``key`` (do not mutate the returned bitmap)"""
+        return self._postings.get(key) or Bitmap()
+
+    def any_of(self, keys: Iterable) -> Bitmap:
+        """Ordinals filed under at least one of ``keys`` (OR)"""
+        postings = self._postings
+        return Bitmap.union(postings[key] for key in keys if key in postings)
+
+    def keys_of(self, ordinal: int) -> tuple:
+        """Keys an ordinal is filed under"""
+        return self._keys_of.get(ordinal, ())
+
+    def count(self, key) -> int:
+        return len(self._postings.get(key, ()))
+
+    def keys(self) -> List[Any]:
+        return list(self._postings)
+
+
+def _status_keys(book):
+    return (book.status,)
+
+
+def _category_keys(book):
+    return tuple(dict.fromkeys(book.categories or []))
+
+
+def _genre_keys(book):
+    return split_genres(book.genre)
+
+
+def _author_keys(book):
+    author = fold(book.author).strip()
+    return (author,) if author else ()
+
+
+def _year_keys(book):
+    return (book.year,) if book.year else ()
+
+
+def _number_or_zero(value, kind=int):
+    try:
+        return kind(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _rating_keys(book):
+    return (_number_or_zero(book.rating, float),)
+
+
+class BookIndexes:
+    """The secondary indexes BookService maintains on every mutation.
+
+    Besides the attribute indexes this holds the search indexes: ``text``
+    (inverted word index), ``substring`` (trigram index), ``fuzzy``
+    (edit-distance index over title/author words) and ``completions``
+    (prefix autocomplete), plus ``sorted``: ordered indexes per sort key,
+    ``stats``: running statistics for the stats views, ``rollups``:
+    finished books per day, month and year and ``columns``: per-slot
+    attribute columns for vectorized analytics.
+
+    After add_many() the statistics and rollups are computed on first use,
+    so a saved copy can be restored with resume_aggregates() instead.
+
+    ``normalize(name, value)`` turns a user-facing value (e.g. "Tolkien, J.")
+    into the key used by that index, so callers never fold text themselves.
+    """
+
+    def __init__(self):
+        self.by_name: Dict[str, AttributeIndex] = {
+            "status": AttributeIndex("status", _status_keys),
+            "category": AttributeIndex("category", _category_keys),
+            "genre": AttributeIndex("genre", _genre_keys),
+            "author": AttributeIndex("author", _author_keys),
+            "year": AttributeIndex("year", _year_keys),
+            # exact ratings; "at least N" is the OR of the few keys >= N
+            "rating": AttributeIndex("rating", _rating_keys),
+        }
+        self.live = Bitmap()
+        self._stats = StatsAggregator()
+        self._rollups = CompletionRollups()
+        # (ordinal, book) pairs loaded but not yet counted by _stats/_rollups
+        self._unaggregated: Optional[List[tuple]] = None
+        self.columns = BookColumns()
+        self.text = InvertedIndex()
+        self.substring = TrigramIndex()
+        self.fuzzy = FuzzyIndex()
+        self.completions = CompletionIndex()
+        # keys are computed once per change, not on every sort
+        self.sorted: Dict[str, SortedIndex] = {
+            "title": SortedIndex("title", lambda book: collation_key(book.title)),
+            "author": SortedIndex("author", lambda book: collation_key(book.author)),
+            "year": SortedIndex("year", lambda book: _number_or_zero(book.year)),
+            "progress": SortedIndex("progress", lambda book: _number_or_zero(book.progress, float)),
+            "rating": SortedIndex("rating", lambda book: _number_or_zero(book.rating, float)),
+        }
+
+    def __getitem__(self, name: str) -> AttributeIndex:
+        return self.by_name[name]
+
+    @property
+    def stats(self) -> StatsAggregator:
+        self._aggregate()
+        return self._stats
+
+    @property
+    def rollups(self) -> CompletionRollups:
+        self._aggregate()
+        return self._rollups
+
+    def _aggregate(self) -> None:
+        items, self._unaggregated = self._unaggregated, None
+        for ordinal, book in items or ():
+            self._stats.add(ordinal, book)
+            self._rollups.add(ordinal, book)
+
+    def resume_aggregates(self, stats: Iterable, rollups: Iterable, changed: Iterable = ()) -> bool:
+        """Take the statistics and rollups of the books loaded by add_many()
+        from exported contributions (``(ordinal, contribution)`` pairs),
+        counting only the ``changed`` ``(ordinal, book)`` pairs afresh.
+
+        Only possible while they have not been computed yet; returns True
+        if the contributions were used.
+        """
+        if self._unaggregated is None:
+            return False
+        restored_stats, restored_rollups = StatsAggregator(), CompletionRollups()
+        restored_stats.restore(stats)
+        restored_rollups.restore(rollups)
+        for ordinal, book in changed:
+            restored_stats.add(ordinal, book)
+            restored_rollups.add(ordinal, book)
+        self._stats, self._rollups = restored_stats, restored_rollups
+        self._unaggregated = None
+        return True
+
+    def add(self, ordinal: int, book) -> None:
+        self.live.add(ordinal)
+        for index in self.by_name.values():
+            index.add(ordinal, book)
+        self.text.add(ordinal, book)
+        self.substring.add(ordinal, book)
+        self.fuzzy.add(ordinal, book)
+        self.completions.add(ordinal, book)
+        self.stats.add(ordinal, book)
+        self.rollups.add(ordinal, book)
+        self.columns.add(ordinal, book)
+        for index in self.sorted.values():
+            index.add(ordinal, book)
+
+    def add_many(self, items: Iterable) -> None:
+        """add() for many ``(ordinal, book)`` pairs, as when a library loads.
+
+        The indexes kept in sorted arrays (vocabulary, completions, sort
+        orders) append their entries and sort once instead of inserting
+        each one in place.  Statistics and rollups wait for their first use.
+        """
+        items = list(items)
+        for ordinal, book in items:
+            self.live.add(ordinal)
+            for index in self.by_name.values():
+                index.add(ordinal, book)
+            self.substring.add(ordinal, book)
+            self.fuzzy.add(ordinal, book)
+        if self._unaggregated is None and self._stats.total == 0:
+            self._unaggregated = items
+        else:
+            self._aggregate()
+            for ordinal, book in items:
+                self._stats.add(ordinal, book)
+                self._rollups.add(ordinal, book)
+        self.text.add_many(items)
+        self.completions.add_many(items)
+        self.columns.add_many(items)
+        for index in self.sorted.values():
+            index.add_many(items)
+
+    def discard(self, ordinal: int) -> None:
+        self.live.discard(ordinal)
+        for index in self.by_name.values():
+            index.discard(ordinal)
+        self.text.discard(ordinal)
+        self.substring.discard(ordinal)
+        self.fuzzy.discard(ordinal)
+        self.completions.discard(ordinal)
+        self.stats.discard(ordinal)
+        self.rollups.discard(ordinal)
+        self.columns.discard(ordinal)
+        for index in self.sorted.values():
+            index.discard(ordinal)
+
+    def clear(self) -> None:
+        self.live = Bitmap()
+        for index in self.by_name.values():
+            index.clear()
+        self.text.clear()
+        self.substring.clear()
+        self.fuzzy.clear()
+        self.completions.clear()
+        self._stats.clear()
+        self._rollups.clear()
+        self._unaggregated = None
+        self.columns.clear()
+        for index in self.sorted.values():
+            index.clear()
+
+    @staticmethod
+    def normalize(name: str, value):
+        if name in ("genre", "author"):
+            return fold(str(value)).strip()
+        if name == "year":
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+        return value
+
+    def at_least(self, name: str, threshold) -> Bitmap:
+        """Ordinals whose (numeric) ``name`` key is >= ``threshold``"""
+        index = self.by_name[name]
+        return index.any_of(key for key in index.keys() if key >= threshold)
+
+    def lookup(self, criteria: Dict[str, Any], min_rating: float = 0) -> Optional[Bitmap]:
+        """AND of the postings for every criterion, smallest first.
+
+        ``min_rating`` adds the OR of the ratings at or above it.  Returns
+        None when there is nothing to restrict by ("every book").  The
+        result is a fresh bitmap; ordinals are produced only when it is
+        iterated.
+        """
+        postings = [self.by_name[name].get(self.normalize(name, value)) for name, value in criteria.items()]
+        if min_rating and min_rating > 0:
+            postings.append(self.at_least("rating", min_rating))
+        return Bitmap.intersection(postings)
@@ -3,60 +3,421 @@ from typing import List, Optional, Dict, Any
 from models import Book
 from utils.sample_data import generate_sample_books
 from utils.helpers import generate_id, calculate_progress
-import json
+from services.storage import ChangeSet, create_book_store
+from services.transaction import batch
+from services.persistence import WriteBehindPersister
+from services.book_indexes import AGGREGATE_FIELDS, BookIndexes
+from services.ranking import BM25FRanker
+from services.query_cache import NarrowingHistory, QueryCache, freeze
+from services.search_index import narrows_text
+from services.sorted_index import decode_cursor, encode_cursor
+from services.query_parser import CandidateSet, SubstringPredicate, parse_query
+from services.bitmap import Bitmap
+from services.facets import FACET_FILTERS, count_facets
+from services.reading_sessions import ReadingSessionLog
+from services.events import BookAdded, BookDeleted, BookUpdated, EventBus, LibraryReloaded
+import copy
 import os
+import threading
+from bisect import bisect_left, bisect_right
+
+
+def _page_count(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
 
 
 class BookService:
-    def __init__(self, data_file: str = "books_data.json"):
+    def __init__(self, data_file: str = "books_data.json", storage="json", write_behind: Optional[float] = None,
+                 sessions_file: Optional[str] = None, events: Optional[EventBus] = None):
         # ensure the data file path is inside project root (next to MAIN.py)
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         if not os.path.isabs(data_file):
             data_file = os.path.join(base_dir, data_file)
         self.data_file = os.path.abspath(data_file)
 
-        self.books: List[Book] = []
+        # "json" rewrites the whole file per edit, "journal" appends change records,
+        # "sqlite" (or a SqliteLibraryStore instance) updates single rows
+        self.store = create_book_store(storage, self.data_file)
+
+        # Primary-key index: books live in insertion-ordered slots, deletes
+        # leave a tombstone (None) and id -> slot gives O(1) lookups
+        self._slots: List[Optional[Book]] = []
+        self._ordinals: Dict[str, int] = {}
+        self._tombstones = 0
+        self._books_cache: Optional[List[Book]] = []
+        # insertion sequence number per slot; unlike ordinals it survives
+        # compaction, so page cursors stay valid
+        self._seqs: List[int] = []
+        self._next_seq = 0
+        # secondary indexes (status, category, genre, author, year) -> slot ordinals
+        self.indexes = BookIndexes()
+
+        # bumped on every change; cached query results are keyed on it
+        self.generation = 0
+        self.query_cache = QueryCache()
+        # recent search results, so a longer query only filters the last ones
+        self._narrowing = NarrowingHistory()
+
+        # batch state: nesting depth, queued changes and in-memory undo log
+        self._batch_depth = 0
+        self._pending: Optional[ChangeSet] = None
+        self._undo: List[tuple] = []
+
+        # write-behind: changes queue in _deferred and a worker thread flushes
+        # them once edits have been quiet for `write_behind` seconds.  _lock
+        # guards _deferred, the slots and every change to a stored Book, so
+        # the worker can copy the books it writes without seeing half an edit
+        self._lock = threading.RLock()
+        # serializes store writes between the UI thread and the persister thread;
+        # always taken before the store's own lock (see write_lock)
+        self._write_lock = threading.Lock()
+        self._deferred = ChangeSet()
+        # write-behind changes a batch commit wrote; requeued if it rolls back
+        self._committed_deferred: Optional[ChangeSet] = None
+        self.persister: Optional[WriteBehindPersister] = None
+        if write_behind is not None:
+            self.persister = WriteBehindPersister(self._flush_deferred, delay=write_behind, name="book-write-behind")
+
+        # optional reading-session log (page progress per day, for streaks);
+        # sessions made inside a batch are held back until it is released
+        self.sessions: Optional[ReadingSessionLog] = None
+        self._pending_sessions: List[tuple] = []
+        if sessions_file:
+            if not os.path.isabs(sessions_file):
+                sessions_file = os.path.join(base_dir, sessions_file)
+            try:
+                self.sessions = ReadingSessionLog(sessions_file)
+            except Exception as e:
+                print(f"Warning: reading sessions unavailable: {e}")
+
+        # change events (BookAdded/BookUpdated/BookDeleted) for the UI;
+        # events of a batch are held back until it is released
+        self.events = events if events is not None else EventBus()
+        self._pending_events: List[Any] = []
+
         self.load_data()
 
+    @property
+    def books(self) -> List[Book]:
+        """Live books in insertion order (rebuilt lazily after deletes)"""
+        if self._books_cache is None:
+            self._books_cache = [book for book in self._slots if book is not None]
+        return self._books_cache
+
+    @books.setter
+    def books(self, books: List[Book]):
+        self._reset(books)
+        self._publish(LibraryReloaded())
+
+    def _reset(self, books: List[Book], seqs: Optional[List[int]] = None):
+        """Rebuild slots and the id index from a list of books"""
+        with self._lock:
+            self._slots = []
+            self._seqs = []
+            self._ordinals = {}
+            self._tombstones = 0
+            self.generation += 1
+            self.indexes.clear()
+            for i, book in enumerate(books):
+                if book.id in self._ordinals:
+                    # duplicate id: keep the first copy, as lookups always did
+                    continue
+                self._ordinals[book.id] = len(self._slots)
+                self._slots.append(book)
+                if seqs is not None:
+                    self._seqs.append(seqs[i])
+                else:
+                    self._seqs.append(self._next_seq)
+                    self._next_seq += 1
+            # index the whole library at once (sorted structures are sorted once)
+            self.indexes.add_many(enumerate(self._slots))
+            self._books_cache = list(self._slots)
+
+    def _insert(self, book: Book) -> int:
+        with self._lock:
+            ordinal = len(self._slots)
+            self._slots.append(book)
+            self._seqs.append(self._next_seq)
+            self._next_seq += 1
+            self._ordinals[book.id] = ordinal
+            self.indexes.add(ordinal, book)
+            self.generation += 1
+            if self._books_cache is not None:
+                self._books_cache.append(book)
+        return ordinal
+
+    def _remove(self, book_id: str) -> Optional[int]:
+        with self._lock:
+            ordinal = self._ordinals.pop(book_id, None)
+            if ordinal is None:
+                return None
+            self._slots[ordinal] = None
+            self.indexes.discard(ordinal)
+            self.generation += 1
+            self._tombstones += 1
+            self._books_cache = None
+        return ordinal
+
+    def _restore(self, ordinal: int, book: Book):
+        """Put a removed book back into its old slot (used by rollback)"""
+        with self._lock:
+            self._slots[ordinal] = book
+            self._ordinals[book.id] = ordinal
+            self.indexes.add(ordinal, book)
+            self.generation += 1
+            self._tombstones -= 1
+            self._books_cache = None
+
+    def _reindex(self, book: Book):
+        """Refresh the secondary index entries of a book changed in place"""
+        with self._lock:
+            self.generation += 1
+            ordinal = self._ordinals.get(book.id)
+            if ordinal is not None and self._slots[ordinal] is book:
+                self.indexes.discard(ordinal)
+                self.indexes.add(ordinal, book)
+
+    def _maybe_compact(self):
+        """Drop tombstones once they outnumber live books"""
+        if self._pending is None and self._tombstones > 64 and self._tombstones > len(self._ordinals):
+            live = [(book, seq) for book, seq in zip(self._slots, self._seqs) if book is not None]
+            self._reset([book for book, _ in live], [seq for _, seq in live])
+
     def load_data(self):
-        """Load books from file or generate sample data"""
+        """Load books from the store or generate sample data"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                loaded = []
-                # Accept either list of dicts or list of serialized book dicts
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict):
-                            try:
-                                loaded.append(Book(**item))
-                            except Exception:
-                                # fallback: if keys mismatch, skip item
-                                continue
-                if not loaded:
-                    # fallback to generating sample books
-                    self.books = generate_sample_books(10)
-                else:
-                    self.books = loaded
-            else:
-                self.books = generate_sample_books(10)
+            loaded = self.store.load()
         except Exception:
             # On any error, fall back to sample data
-            self.books = generate_sample_books(10)
+            loaded = None
+        self.books = loaded if loaded else generate_sample_books(10)
 
     def save_data(self):
-        """Save books to file"""
+        """Write the full library to the store"""
         try:
-            folder = os.path.dirname(self.data_file)
-            if folder and not os.path.exists(folder):
-                os.makedirs(folder, exist_ok=True)
-            data = [book.to_dict() for book in self.books]
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with self._write_lock:
+                with self._lock:
+                    self._deferred.clear()
+                    books = list(self.books)
+                self.store.write(books)
         except Exception as e:
             print(f"Warning: failed to save books data: {e}")
 
+    def _persist(self, changes: ChangeSet):
+        """Persist just the given changes (the JSON store still rewrites the file)"""
+        if self._pending is not None:
+            # inside a batch: queue until commit
+            self._pending.merge(changes)
+            return
+        if self.persister is not None:
+            with self._lock:
+                self._deferred.merge(changes)
+            self.persister.mark_dirty()
+            return
+        try:
+            with self._write_lock:
+                self.store.write(self.books, changes)
+        except Exception as e:
+            print(f"Warning: failed to save books data: {e}")
+
+    def _flush_deferred(self):
+        """Write queued write-behind changes (runs on the persister thread).
+
+        Stores that rewrite everything get a copy of the books taken under
+        _lock, which every mutation holds, so the write sees each book either
+        before or after an edit, never halfway; the UI thread is not held up
+        while the store writes.  The others only need the change records.
+        """
+        with self._write_lock:
+            with self._lock:
+                changes, self._deferred = self._deferred, ChangeSet()
+                if not changes:
+                    return
+                books = None
+                if self.store.needs_books(changes):
+                    books = [copy.copy(book) for book in self.books]
+            try:
+                self.store.write(books, changes)
+            except Exception:
+                with self._lock:
+                    # keep the changes queued, ahead of anything added meanwhile
+                    changes.merge(self._deferred)
+                    self._deferred = changes
+                raise
+
+    def flush(self):
+        """Write any changes still waiting in the write-behind queue"""
+        if self.persister is not None:
+            self.persister.flush()
+
+    @property
+    def write_lock(self):
+        """Lock serializing store writes.  batch() holds it around commit();
+        take it before any store transaction, never inside one."""
+        return self._write_lock
+
+    def store_stamp(self):
+        """Token for the library as stored on disk; it changes whenever a write
+        lands, so saved aggregates can tell whether they are still current"""
+        stamp_fn = getattr(self.store, "stamp", None)
+        return stamp_fn() if callable(stamp_fn) else None
+
+    @staticmethod
+    def _aggregate_source(book) -> list:
+        """The fields of ``book`` its statistics contribution is computed from"""
+        return [getattr(book, name, None) for name in AGGREGATE_FIELDS]
+
+    def aggregate_state(self) -> Dict[str, Any]:
+        """The running statistics and rollups, keyed by book id, for saving
+        next to store_stamp() (see resume_aggregates).  ``sources`` holds the
+        fields each contribution was computed from."""
+        id_of = lambda ordinal: self._slots[ordinal].id
+        return {
+            "stats": self.indexes.stats.export(id_of),
+            "rollups": self.indexes.rollups.export(id_of),
+            "sources": {book.id: self._aggregate_source(book) for book in self.books},
+        }
+
+    def resume_aggregates(self, state: Dict[str, Any]) -> bool:
+        """Restore the running statistics and rollups from a saved
+        aggregate_state() instead of computing them from the books.
+
+        Only done right after a load, before anything asked for them.  The
+        saved contributions of books that are unchanged since are reused;
+        books added or edited since are counted afresh and deleted ones
+        left out.  Returns True if the state was used.
+        """
+        stats, rollups, sources = state.get("stats"), state.get("rollups"), state.get("sources")
+        if not isinstance(stats, dict) or not isinstance(rollups, dict) or not isinstance(sources, dict):
+            return False
+        saved, changed = [], []
+        for book_id, ordinal in self._ordinals.items():
+            book = self._slots[ordinal]
+            if book_id in stats and sources.get(book_id) == self._aggregate_source(book):
+                saved.append((book_id, ordinal))
+            else:
+                changed.append((ordinal, book))
+        return self.indexes.resume_aggregates(
+            ((ordinal, stats[book_id]) for book_id, ordinal in saved),
+            ((ordinal, rollups[book_id]) for book_id, ordinal in saved if book_id in rollups),
+            changed,
+        )
+
+    def persistence_stats(self) -> Dict[str, Any]:
+        """Write-behind counters (flushes, coalesced writes, flush latency)"""
+        return self.persister.stats() if self.persister is not None else {}
+
+    # --- batches -------------------------------------------------------
+
+    def batch(self, *others):
+        """Context manager grouping mutations into one all-or-nothing write.
+
+        Pass other services (e.g. the CategoryService) to commit their
+        changes together with the books.
+        """
+        return batch(self, *others)
+
+    def begin(self):
+        """Start (or nest) a batch; persistence is deferred until commit()"""
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            self._pending = ChangeSet()
+            self._undo = []
+            self._pending_sessions = []
+            self._pending_events = []
+
+    def commit(self, release: bool = True):
+        """Close a batch level; the outermost level writes all queued changes.
+
+        The caller holds write_lock.  Write errors propagate so callers can
+        roll back.  With ``release=False`` the undo log, the queued reading
+        sessions and the queued events are kept until release().
+        """
+        if self._batch_depth == 0:
+            return
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return
+        pending, self._pending = self._pending, None
+        with self._lock:
+            # batch() flushed the write-behind queue first; whatever a failed
+            # flush left behind is older than the batch, so it is written ahead
+            deferred, self._deferred = self._deferred, ChangeSet()
+        if deferred:
+            self._committed_deferred = deferred
+            combined = ChangeSet()
+            combined.merge(deferred)
+            combined.merge(pending)
+            pending = combined
+        if pending:
+            self.store.write(self.books, pending)
+        if release:
+            self.release()
+
+    def release(self):
+        """Forget the undo log once every service in the batch has committed.
+
+        This is where the batch's side effects happen: queued reading
+        sessions are logged and queued events published.
+        """
+        self._undo = []
+        self._committed_deferred = None
+        self._maybe_compact()
+        sessions, self._pending_sessions = self._pending_sessions, []
+        for session in sessions:
+            self._log_session(*session)
+        events, self._pending_events = self._pending_events, []
+        for event in events:
+            self.events.publish(event)
+
+    def rollback(self):
+        """Undo every in-memory change made since begin(); nothing is written"""
+        for entry in reversed(self._undo):
+            action = entry[0]
+            if action == "add":
+                self._remove(entry[1].id)
+            elif action == "update":
+                with self._lock:
+                    for key, value in entry[2].items():
+                        setattr(entry[1], key, value)
+                    self._reindex(entry[1])
+            elif action == "delete":
+                self._restore(entry[1], entry[2])
+        self._undo = []
+        deferred, self._committed_deferred = self._committed_deferred, None
+        if deferred:
+            # the rolled-back transaction took these with it; queue them again
+            with self._lock:
+                deferred.merge(self._deferred)
+                self._deferred = deferred
+            self.persister.mark_dirty()
+        self._pending = None
+        self._pending_sessions = []
+        self._pending_events = []
+        self._batch_depth = 0
+        self._maybe_compact()
+
+    def _publish(self, event):
+        if self._pending is not None:
+            self._pending_events.append(event)
+        else:
+            self.events.publish(event)
+
+    def _record_undo(self, *entry):
+        if self._pending is not None:
+            self._undo.append(entry)
+
+    def close(self):
+        """Flush pending writes and wait for background store work to finish"""
+        if self.persister is not None:
+            self.persister.close()
+        self.store.close()
+        if self.sessions is not None:
+            self.sessions.close()
+
     def get_all_books(self) -> List[Book]:
         """Get all books"""
         return self.books
@@ -70,82 +431,380 @@ class BookService:
 
     def get_book_by_id(self, book_id: str) -> Optional[Book]:
         """Get a book by its ID"""
-        for book in self.books:
-            if book.id == book_id:
-                return book
-        return None
+        ordinal = self._ordinals.get(book_id)
+        return self._slots[ordinal] if ordinal is not None else None
 
     def add_book(self, book_data: Dict[str, Any]) -> Book:
         """Add a new book"""
+        book_id = generate_id()
+        while book_id in self._ordinals:
+            # ids are second-resolution timestamps; bulk adds can collide
+            book_id = generate_id()
         book = Book(
-            id=generate_id(),
+            id=book_id,
             **book_data
         )
-        self.books.append(book)
-        self.save_data()
+        self._insert(book)
+        self._record_undo("add", book)
+        changes = ChangeSet()
+        changes.put(book.to_dict())
+        self._persist(changes)
+        self._publish(BookAdded(book))
         return book
 
     def update_book(self, book_id: str, updates: Dict[str, Any]) -> Optional[Book]:
         """Update an existing book"""
-        for i, book in enumerate(self.books):
-            if book.id == book_id:
-                for key, value in updates.items():
-                    if hasattr(book, key):
-                        setattr(self.books[i], key, value)
-
-                # Auto-calculate progress if pages are updated
-                if 'current_page' in updates or 'total_pages' in updates:
-                    self.books[i].progress = calculate_progress(
-                        self.books[i].current_page,
-                        self.books[i].total_pages
-                    )
-
-                self.save_data()
-                return self.books[i]
-        return None
+        book = self.get_book_by_id(book_id)
+        if book is None:
+            return None
+
+        changed = {}
+        previous = {}
+        with self._lock:
+            for key, value in updates.items():
+                if hasattr(book, key):
+                    previous.setdefault(key, getattr(book, key))
+                    setattr(book, key, value)
+                    changed[key] = value
+
+            # Auto-calculate progress if pages are updated
+            if 'current_page' in updates or 'total_pages' in updates:
+                previous.setdefault('progress', book.progress)
+                book.progress = calculate_progress(book.current_page, book.total_pages)
+                changed['progress'] = book.progress
+
+            self._reindex(book)
+        self._record_undo("update", book, previous)
+        changes = ChangeSet()
+        changes.patch(book_id, changed)
+        self._persist(changes)
+
+        # a page advance or finishing the book counts as a reading session
+        pages_read = _page_count(book.current_page) - _page_count(previous.get('current_page', book.current_page))
+        if pages_read > 0 or (changed.get('status') == 'Completed' and previous.get('status') != 'Completed'):
+            self._log_session(book_id, max(pages_read, 0))
+
+        differs = {key: value for key, value in previous.items() if getattr(book, key) != value}
+        if differs:
+            self._publish(BookUpdated(book, frozenset(differs), differs))
+        return book
+
+    def _log_session(self, book_id: str, pages: int):
+        if self.sessions is None:
+            return
+        if self._pending is not None:
+            self._pending_sessions.append((book_id, pages))
+            return
+        try:
+            self.sessions.record(book_id, pages)
+        except Exception as e:
+            print(f"Warning: failed to log reading session: {e}")
 
     def delete_book(self, book_id: str) -> bool:
         """Delete a book"""
-        initial_length = len(self.books)
-        self.books = [book for book in self.books if book.id != book_id]
-        if len(self.books) < initial_length:
-            self.save_data()
-            return True
-        return False
-
-    def search_books(self, query: str, filters: Dict[str, Any] = None) -> List[Book]:
-        """Search books with optional filters"""
-        query = query.lower().strip()
-        filtered_books = self.books
-
+        book = self.get_book_by_id(book_id)
+        ordinal = self._remove(book_id)
+        if ordinal is None:
+            return False
+        self._record_undo("delete", ordinal, book)
+        changes = ChangeSet()
+        changes.delete(book_id)
+        self._persist(changes)
+        self._maybe_compact()
+        self._publish(BookDeleted(book))
+        return True
+
+    def _books_at(self, ordinals) -> List[Book]:
+        """Books for a set of slot ordinals, in insertion order"""
+        slots = self._slots
+        return [slots[o] for o in sorted(ordinals) if slots[o] is not None]
+
+    def find_books(self, status: str = None, category: str = None, genre: str = None,
+                   author: str = None, year: int = None) -> List[Book]:
+        """Books matching every given attribute, answered from the secondary indexes.
+
+        Genre matches one comma-separated genre token and author the whole
+        author name, both case- and accent-insensitively.
+        """
+        ordinals = self.indexes.lookup(self._criteria(status=status, category=category, genre=genre,
+                                                      author=author, year=year))
+        if ordinals is None:
+            return list(self.books)
+        return self._books_at(ordinals)
+
+    @staticmethod
+    def _criteria(**values) -> Dict[str, Any]:
+        """Drop unset filters ("All" and empty values mean no restriction)"""
+        return {name: value for name, value in values.items() if value not in (None, "", "All")}
+
+    def _cached(self, *key, compute):
+        """Result of ``compute()``, reused until the data generation changes"""
+        return self.query_cache.get_or_compute(key, compute, generation=self.generation)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Query cache counters plus the current data generation"""
+        stats = self.query_cache.stats()
+        stats["generation"] = self.generation
+        stats["narrowed_searches"] = self._narrowing.narrowed
+        stats["reused_searches"] = self._narrowing.reused
+        return stats
+
+    def count_books(self, **criteria) -> int:
+        """Number of books find_books(**criteria) would return"""
+        ordinals = self.indexes.lookup(self._criteria(**criteria))
+        return len(self._ordinals) if ordinals is None else len(ordinals)
+
+    def search_books(self, query: str, filters: Dict[str, Any] = None, mode: str = "substring") -> List[Book]:
+        """Search books with optional filters.
+
+        mode "substring" (default): ``query`` appears anywhere in the title,
+        author, genre or ISBN, ignoring case ("ikin" finds "Tolkien").
+        mode "text": every word of ``query`` starts a word in the title,
+        author, genre, ISBN, publisher, description, review or notes
+        (case and accents are ignored).
+        mode "fuzzy": every word of ``query`` is within one or two typos of
+        a title or author word ("Tolkein" finds "Tolkien").
+        """
+        def compute():
+            ordinals = self._search_ordinals(query, filters, mode)
+            return list(self.books) if ordinals is None else self._books_at(ordinals)
+        # callers may sort or trim the list they get; hand out copies
+        return list(self._cached("search", query, freeze(filters), mode, compute=compute))
+
+    def search_ranked(self, query: str, filters: Dict[str, Any] = None, page: int = 0,
+                      page_size: int = 20, mode: str = "substring"):
+        """One page of search_books() results, most relevant first.
+
+        Returns ``(books, total)``.  Matches are ranked with BM25F over the
+        full-text index (title > author > genre > description); an empty
+        query keeps insertion order.  Only the books on the requested page
+        are materialized.  The search itself is shared with search_facets()
+        (see _search_base), so a keystroke runs it once.
+        """
+        filters = filters or {}
+        ordinals = self._search_base(query, filters, mode)
+        narrowed = self._facet_bitmap(filters)
+        if narrowed is not None:
+            ordinals = ordinals & narrowed
+        total = len(ordinals)
+        start = max(page, 0) * page_size
+        try:
+            # field terms such as status:reading filter but do not rank
+            ranking_text = parse_query(query).text if query else ""
+        except ValueError:
+            ranking_text = query
+        if ranking_text.strip():
+            ranker = BM25FRanker(self.indexes.text, ranking_text)
+            window = [o for _, o in ranker.top(ordinals, start + page_size)[start:]]
+        else:
+            window = sorted(ordinals)[start:start + page_size]
+        return [self._slots[o] for o in window], total
+
+    def search_facets(self, query: str, filters: Dict[str, Any] = None, mode: str = "substring") -> Dict[str, Any]:
+        """Facet counts for a search: per status, category, min-rating
+        threshold, genre and decade (see services/facets.py).
+
+        Status, category and rating counts show what picking that option
+        would return with the other filters kept; ``total`` equals
+        ``len(search_books(query, filters, mode))``.
+        """
+        filters = filters or {}
+
+        def compute():
+            criteria = self._criteria(status=filters.get('status'), category=filters.get('category'))
+            return count_facets(self.indexes, self._search_base(query, filters, mode), criteria.get('status'),
+                                criteria.get('category'), filters.get('min_rating', 0) or 0)
+        return copy.deepcopy(self._cached("facets", query, freeze(filters), mode, compute=compute))
+
+    def _search_base(self, query: str, filters: Dict[str, Any], mode: str) -> Bitmap:
+        """Bitmap of the books matching ``query`` and the filters other than
+        the facet filters (status, category, min_rating).
+
+        search_ranked() narrows it with the facet filters and search_facets()
+        counts over it, so both are answered from one search; it is cached
+        until the data changes.  Do not mutate the returned bitmap.
+        """
+        base_filters = {k: v for k, v in filters.items() if k not in FACET_FILTERS}
+
+        def compute():
+            ordinals = self._search_ordinals(query, base_filters, mode)
+            return self.indexes.live.copy() if ordinals is None else Bitmap.of(ordinals)
+        return self._cached("search_base", query, freeze(base_filters), mode, compute=compute)
+
+    def _facet_bitmap(self, filters: Dict[str, Any]) -> Optional[Bitmap]:
+        """The facet filters as one bitmap, or None when none is set"""
+        return self.indexes.lookup(self._criteria(status=filters.get('status'), category=filters.get('category')),
+                                   min_rating=filters.get('min_rating', 0) or 0)
+
+    def query_page(self, sort: str = "added", descending: bool = False, filters: Dict[str, Any] = None,
+                   query: str = "", cursor: Optional[str] = None, page_size: int = 20,
+                   mode: str = "substring"):
+        """One page of books in ``sort`` order, for views that show a page at a time.
+
+        ``sort`` is "added" (insertion order) or a key of ``indexes.sorted``
+        ("title", "author", "year", "progress", "rating"); ``query``, ``filters``
+        and ``mode`` are as for search_books.  Returns
+        ``(books, next_cursor, total)``; pass ``next_cursor`` back to get the
+        following page (it is None on the last page).  Pages are read from
+        ordered indexes, so nothing is re-sorted and a page stays cheap
+        however deep it is.  Cursors stay valid across edits: the next page
+        resumes after the last row shown.
+        """
+        if sort != "added" and sort not in self.indexes.sorted:
+            raise ValueError(f"unknown sort key: {sort}")
+        matched = self._search_ordinals(query, filters, mode)
+        total = len(self._ordinals) if matched is None else len(matched)
+        after = decode_cursor(cursor, sort, descending) if cursor else None
+
+        if sort == "added":
+            rows = self._walk_added(after, descending)
+        else:
+            rows = self._walk_sorted(self.indexes.sorted[sort], matched, after, descending)
+
+        page = []
+        slots = self._slots
+        has_more = False
+        for ordinal in rows:
+            if slots[ordinal] is None or (matched is not None and ordinal not in matched):
+                continue
+            if len(page) == page_size:
+                has_more = True
+                break
+            page.append(ordinal)
+
+        next_cursor = None
+        if has_more and page:
+            last = page[-1]
+            key = self._seqs[last] if sort == "added" else self.indexes.sorted[sort].key_of(last)
+            next_cursor = encode_cursor(sort, descending, key, self._seqs[last])
+        return [slots[o] for o in page], next_cursor, total
+
+    def _ordinal_bound(self, seq: int, descending: bool) -> int:
+        """First ordinal after (ascending) or at/after (descending) a cursor's row"""
+        return bisect_left(self._seqs, seq) if descending else bisect_right(self._seqs, seq)
+
+    def _walk_added(self, after, descending: bool):
+        if descending:
+            start = len(self._slots) if after is None else self._ordinal_bound(after[1], True)
+            return range(start - 1, -1, -1)
+        start = 0 if after is None else self._ordinal_bound(after[1], False)
+        return range(start, len(self._slots))
+
+    def _walk_sorted(self, index, matched, after, descending: bool):
+        position = None if after is None else (after[0], self._ordinal_bound(after[1], descending))
+        if matched is not None and len(matched) * 8 < len(index):
+            # few matches: ordering them is cheaper than walking the index
+            rows = sorted((index.key_of(o), o) for o in matched)
+            if descending:
+                end = len(rows) if position is None else bisect_left(rows, position)
+                return (rows[i][1] for i in range(end - 1, -1, -1))
+            start = 0 if position is None else bisect_left(rows, position)
+            return (row[1] for row in rows[start:])
+        return index.walk(position, descending)
+
+    def _search_ordinals(self, query: str, filters: Dict[str, Any], mode: str):
+        """Ordinals matching a search, or None when every book matches"""
+        query = (query or "").strip()
+        filters = filters or {}
         if query:
-            filtered_books = [
-                book for book in filtered_books
-                if (query in book.title.lower() or
-                    query in book.author.lower() or
-                    query in book.genre.lower() or
-                    query in book.isbn)
-            ]
-
-        if filters:
-            if filters.get('status') and filters['status'] != 'All':
-                filtered_books = [b for b in filtered_books if b.status == filters['status']]
+            try:
+                plan = parse_query(query)
+            except ValueError:
+                # half-typed field terms ("rating:>", "year:19..x") are searched as plain text
+                plan = None
+            if plan is not None and plan.structured:
+                return self._planned_search(plan, filters, mode)
+        if query and mode in ("substring", "text"):
+            return self._narrowed_search(query, filters, mode)
+        return self._full_search(query, filters, mode)
+
+    def _filter_bitmap(self, filters: Dict[str, Any]):
+        """The search filters as one bitmap (AND of the attribute postings and
+        the OR of the ratings >= min_rating), or None when nothing is filtered"""
+        return self.indexes.lookup(self._criteria(
+            status=filters.get('status'),
+            category=filters.get('category'),
+            genre=filters.get('genre'),
+            author=filters.get('author'),
+            year=filters.get('year'),
+        ), min_rating=filters.get('min_rating', 0) or 0)
+
+    def _planned_search(self, plan, filters: Dict[str, Any], mode: str):
+        """Run a structured query (see services/query_parser.py)"""
+        extra = []
+        criteria = self._filter_bitmap(filters)
+        if criteria is not None:
+            extra.append(CandidateSet(criteria))
+        for word, negate in plan.free_text:
+            if negate or mode == "substring":
+                extra.append(SubstringPredicate(None, word, negate))
+        ordinals = plan.execute(self.indexes, self.indexes.live, extra)
+        if plan.text and mode == "text":
+            ordinals = self.indexes.text.search(plan.text, ordinals)
+        elif plan.text and mode == "fuzzy":
+            ordinals = self.indexes.fuzzy.search(plan.text, ordinals)
+        return ordinals
+
+    def explain_query(self, query: str) -> List[str]:
+        """The order search_books evaluates a structured query's terms in"""
+        plan = parse_query(query)
+        extra = [SubstringPredicate(None, word, negate) for word, negate in plan.free_text if plan.structured]
+        return plan.explain(self.indexes, extra)
+
+    def _narrowed_search(self, query: str, filters: Dict[str, Any], mode: str):
+        """As-you-type search: filter the results of a remembered broader query.
+
+        Typing more letters (or words) can only shrink the result, so when an
+        earlier query with the same filters is known to cover this one, only
+        its matches are checked.  Backspacing lands on a remembered query.
+        """
+        if mode == "substring":
+            key, narrows, index = query.lower(), (lambda old, new: old in new), self.indexes.substring
+        else:
+            key, narrows, index = query, narrows_text, self.indexes.text
+        context = (mode, freeze(filters))
+        found = self._narrowing.ancestor(context, self.generation, key, narrows)
+        if found is None:
+            ordinals = self._full_search(query, filters, mode)
+        elif found[0] == key:
+            return set(found[1])
+        else:
+            ordinals = index.filter(found[1], key)
+        self._narrowing.remember(context, self.generation, key, ordinals)
+        return ordinals
+
+    def _full_search(self, query: str, filters: Dict[str, Any], mode: str):
+        ordinals = self._filter_bitmap(filters)
+        if query:
+            if mode == "text":
+                ordinals = self.indexes.text.search(query, ordinals)
+            elif mode == "fuzzy":
+                ordinals = self.indexes.fuzzy.search(query, ordinals)
+            else:
+                ordinals = self.indexes.substring.search(query.lower(), ordinals)
+        return ordinals
 
-            if filters.get('category') and filters['category'] != 'All':
-                filtered_books = [b for b in filtered_books if filters['category'] in b.categories]
+    def suggest_queries(self, query: str, limit: int = 5) -> List[str]:
+        """"Did you mean" corrections for ``query`` built from title/author words"""
+        return self.indexes.fuzzy.suggest(query, limit)
 
-            if filters.get('min_rating', 0) > 0:
-                filtered_books = [b for b in filtered_books if b.rating >= filters['min_rating']]
+    def complete(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Autocomplete titles, authors, genres and categories for a typed prefix.
 
-        return filtered_books
+        Returns up to ``limit`` ``{"text", "kind", "count"}`` dicts, the
+        phrases used by most books first.
+        """
+        return self.indexes.completions.complete(prefix, limit)
 
     def get_books_by_status(self, status: str) -> List[Book]:
         """Get books by reading status"""
-        return [book for book in self.books if book.status == status]
+        return list(self._cached("status", status,
+                                 compute=lambda: self._books_at(self.indexes["status"].get(status))))
 
     def get_books_by_category(self, category_name: str) -> List[Book]:
         """Get books by category"""
-        return [book for book in self.books if category_name in book.categories]
+        return list(self._cached("category", category_name,
+                                 compute=lambda: self._books_at(self.indexes["category"].get(category_name))))
 
     def update_book_status(self, book_id: str, status: str, current_page: int = None) -> Optional[Book]:
         """Update book reading status"""
@@ -177,8 +836,13 @@ class BookService:
         return self.update_book(book_id, {'rating': rating, 'review': review})
 
     def get_statistics(self) -> Dict[str, Any]:
-        """Calculate book statistics"""
-        if not self.books:
+        """Calculate book statistics (cached until the next change)"""
+        return copy.deepcopy(self._cached("statistics", compute=self._compute_statistics))
+
+    def _compute_statistics(self) -> Dict[str, Any]:
+        # running totals kept by the indexes (see services/stats_aggregator.py)
+        stats = self.indexes.stats
+        if not stats.total:
             return {
                 'total_books': 0,
                 'completed_books': 0,
@@ -188,27 +852,12 @@ class BookService:
                 'genres': {}
             }
 
-        total_books = len(self.books)
-        completed_books = len([b for b in self.books if b.status == 'Completed'])
-        reading_books = len([b for b in self.books if b.status == 'Reading'])
-        average_progress = sum(b.progress for b in self.books) / total_books
-        total_pages = sum(b.total_pages for b in self.books)
-
-        # Count genres
-        genres = {}
-        for book in self.books:
-            for genre in book.genre.split(','):
-                genre = genre.strip()
-                genres[genre] = genres.get(genre, 0) + 1
-
-        favorite_genre = max(genres.items(), key=lambda x: x[1])[0] if genres else "None"
-
         return {
-            'total_books': total_books,
-            'completed_books': completed_books,
-            'reading_books': reading_books,
-            'average_progress': round(average_progress, 1),
-            'total_pages': total_pages,
-            'favorite_genre': favorite_genre,
-            'genres': genres
+            'total_books': stats.total,
+            'completed_books': stats.count('Completed'),
+            'reading_books': stats.count('Reading'),
+            'average_progress': round(stats.average_progress, 1),
+            'total_pages': stats.pages_sum,
+            'favorite_genre': stats.favorite_genre(),
+            'genres': dict(stats.genres)
         }
\ No newline at end of file
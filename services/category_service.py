@@ -1,6 +1,5 @@
 # services/category_service.py
 from typing import List, Optional, Dict, Any
-import json
 import os
 import datetime
 
@@ -22,6 +21,10 @@ except Exception:
         def from_dict(d):
             return Category(d.get("name", ""), d.get("color", "#dddddd"), d.get("book_count", 0), d.get("created_at"))
 
+from services.storage import ChangeSet, create_category_store
+from services.transaction import batch
+from services.events import CategoryAdded, CategoryDeleted, CategoryRenamed, CategoryUpdated, EventBus
+
 try:
     from utils.sample_data import generate_sample_categories
 except Exception:
@@ -30,49 +33,102 @@ except Exception:
 
 
 class CategoryService:
-    def __init__(self, data_file: str = "categories_data.json"):
+    def __init__(self, data_file: str = "categories_data.json", storage="json", events: Optional[EventBus] = None):
         base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         if not os.path.isabs(data_file):
             data_file = os.path.join(base_dir, data_file)
         self.data_file = os.path.abspath(data_file)
+        # "json" rewrites the file, "sqlite" (or a SqliteLibraryStore) updates single rows
+        self.store = create_category_store(storage, self.data_file)
         self.categories: List[Category] = []
+
+        # batch state: nesting depth, queued changes and the pre-batch snapshot
+        self._batch_depth = 0
+        self._pending: Optional[ChangeSet] = None
+        self._snapshot: Optional[List[tuple]] = None
+
+        # change events for the UI, held back until a batch commits
+        self.events = events if events is not None else EventBus()
+        self._pending_events: List[Any] = []
+
         self.load_data()
 
     def load_data(self):
-        """Load categories from file or generate sample data"""
+        """Load categories from the store or generate sample data"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                self.categories = []
-                if isinstance(data, list):
-                    for item in data:
-                        try:
-                            if isinstance(item, dict) and hasattr(Category, 'from_dict'):
-                                self.categories.append(Category.from_dict(item))
-                            elif isinstance(item, dict):
-                                self.categories.append(Category(**item))
-                        except Exception:
-                            continue
-                if not self.categories:
-                    self.categories = generate_sample_categories()
-            else:
-                self.categories = generate_sample_categories()
+            loaded = self.store.load()
         except Exception:
-            self.categories = generate_sample_categories()
+            loaded = None
+        self.categories = loaded if loaded else generate_sample_categories()
 
     def save_data(self):
-        """Save categories to file"""
+        """Write all categories to the store"""
+        try:
+            self.store.write(self.categories)
+        except Exception as e:
+            print(f"Warning: could not save categories data: {e}")
+
+    def _persist(self, changes: ChangeSet):
+        """Persist just the given changes (the JSON store still rewrites the file)"""
+        if self._pending is not None:
+            self._pending.merge(changes)
+            return
         try:
-            folder = os.path.dirname(self.data_file)
-            if folder and not os.path.exists(folder):
-                os.makedirs(folder, exist_ok=True)
-            data = [c.to_dict() if hasattr(c, 'to_dict') else {'name': c.name, 'color': c.color, 'book_count': getattr(c, 'book_count', 0)} for c in self.categories]
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.store.write(self.categories, changes)
         except Exception as e:
             print(f"Warning: could not save categories data: {e}")
 
+    def batch(self, *others):
+        """Context manager grouping mutations into one all-or-nothing write"""
+        return batch(self, *others)
+
+    def begin(self):
+        """Start (or nest) a batch; persistence is deferred until commit()"""
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            self._pending = ChangeSet(key="name")
+            self._pending_events = []
+            # the category list is small, so a snapshot is the simplest undo log
+            self._snapshot = [(c, c.name, c.color, c.book_count) for c in self.categories]
+
+    def commit(self, release: bool = True):
+        """Close a batch level; the outermost level writes all queued changes"""
+        if self._batch_depth == 0:
+            return
+        self._batch_depth -= 1
+        if self._batch_depth > 0:
+            return
+        pending, self._pending = self._pending, None
+        if pending:
+            self.store.write(self.categories, pending)
+        if release:
+            self.release()
+
+    def release(self):
+        """Forget the snapshot of a committed batch and publish its events"""
+        self._snapshot = None
+        events, self._pending_events = self._pending_events, []
+        for event in events:
+            self.events.publish(event)
+
+    def rollback(self):
+        """Restore the categories as they were at begin(); nothing is written"""
+        if self._snapshot is not None:
+            self.categories = []
+            for category, name, color, book_count in self._snapshot:
+                category.name, category.color, category.book_count = name, color, book_count
+                self.categories.append(category)
+        self._snapshot = None
+        self._pending = None
+        self._pending_events = []
+        self._batch_depth = 0
+
+    def _publish(self, event):
+        if self._pending is not None:
+            self._pending_events.append(event)
+        else:
+            self.events.publish(event)
+
     def get_all_categories(self) -> List[Category]:
         """Get all categories"""
         return self.categories
@@ -92,7 +148,10 @@ class CategoryService:
 
         category = Category(name=name, color=color)
         self.categories.append(category)
-        self.save_data()
+        changes = ChangeSet(key="name")
+        changes.put(category.to_dict())
+        self._persist(changes)
+        self._publish(CategoryAdded(category))
         return category
 
     def update_category(self, old_name: str, new_name: str, color: str) -> Optional[Category]:
@@ -103,18 +162,28 @@ class CategoryService:
                 if new_name != old_name and any(cat.name.lower() == new_name.lower() for cat in self.categories):
                     return None
 
-                self.categories[i].name = new_name
-                self.categories[i].color = color
-                self.save_data()
-                return self.categories[i]
+                old_color = category.color
+                category.name = new_name
+                category.color = color
+                changes = ChangeSet(key="name")
+                changes.patch(old_name, {"name": new_name, "color": color})
+                self._persist(changes)
+                if new_name != old_name:
+                    self._publish(CategoryRenamed(category, old_name))
+                if color != old_color:
+                    self._publish(CategoryUpdated(category, frozenset(["color"])))
+                return category
         return None
 
     def delete_category(self, name: str) -> bool:
         """Delete a category"""
-        initial_length = len(self.categories)
+        deleted = [cat for cat in self.categories if cat.name == name]
         self.categories = [cat for cat in self.categories if cat.name != name]
-        if len(self.categories) < initial_length:
-            self.save_data()
+        if deleted:
+            changes = ChangeSet(key="name")
+            changes.delete(name)
+            self._persist(changes)
+            self._publish(CategoryDeleted(deleted[0]))
             return True
         return False
 
@@ -0,0 +1,117 @@
+# services/events.py
+"""Typed change events published by the services, and the bus carrying them."""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Type
+
+
+@dataclass(frozen=True)
+class Event:
+    """Base class; subscribing to it receives every event"""
+
+
+# --- books ---------------------------------------------------------------
+
+@dataclass(frozen=True)
+class BookEvent(Event):
+    book: Any
+
+    @property
+    def book_id(self) -> str:
+        return self.book.id
+
+
+@dataclass(frozen=True)
+class BookAdded(BookEvent):
+    pass
+
+
+@dataclass(frozen=True)
+class BookUpdated(BookEvent):
+    """``changed`` names the fields whose value changed; ``previous`` holds their old values"""
+    changed: FrozenSet[str] = frozenset()
+    previous: Dict[str, Any] = field(default_factory=dict)
+
+    def touches(self, *fields: str) -> bool:
+        return not self.changed.isdisjoint(fields)
+
+
+@dataclass(frozen=True)
+class BookDeleted(BookEvent):
+    pass
+
+
+@dataclass(frozen=True)
+class LibraryReloaded(Event):
+    """The whole book list was replaced; views should rebuild"""
+
+
+# --- categories ----------------------------------------------------------
+
+@dataclass(frozen=True)
+class CategoryEvent(Event):
+    category: Any
+
+    @property
+    def name(self) -> str:
+        return self.category.name
+
+
+@dataclass(frozen=True)
+class CategoryAdded(CategoryEvent):
+    pass
+
+
+@dataclass(frozen=True)
+class CategoryUpdated(CategoryEvent):
+    """A change other than the name (e.g. the color)"""
+    changed: FrozenSet[str] = frozenset()
+
+
+@dataclass(frozen=True)
+class CategoryRenamed(CategoryEvent):
+    old_name: str = ""
+
+
+@dataclass(frozen=True)
+class CategoryDeleted(CategoryEvent):
+    pass
+
+
+class EventBus:
+    """Synchronous publish/subscribe keyed on event type.
+
+    A handler subscribed to a class also receives its subclasses
+    (``BookEvent`` covers added, updated and deleted books).  A failing
+    handler is reported and skipped, so one broken view cannot stop the
+    others from updating.  Services queue the events of a batch and
+    publish them once every service in it has committed; a rolled-back
+    batch publishes nothing.
+
+    Handlers are filed under class names rather than classes: MAIN's
+    component discovery reloads the service modules, which would otherwise
+    leave publishers and subscribers holding different copies of a class.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[Event], None]]] = {}
+        # events delivered so far, for tests and profiling
+        self.published = 0
+
+    def subscribe(self, event_type: Type[Event], handler: Callable[[Event], None]) -> Callable[[], None]:
+        """Call ``handler(event)`` for every ``event_type`` event; returns an unsubscribe function"""
+        self._handlers.setdefault(event_type.__name__, []).append(handler)
+        return lambda: self.unsubscribe(event_type, handler)
+
+    def unsubscribe(self, event_type: Type[Event], handler: Callable[[Event], None]) -> None:
+        handlers = self._handlers.get(event_type.__name__, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, event: Event) -> None:
+        self.published += 1
+        for cls in type(event).__mro__:
+            for handler in list(self._handlers.get(cls.__name__, ())):
+                try:
+                    handler(event)
+                except Exception as e:
+                    print(f"Warning: {type(event).__name__} handler failed: {e}")
@@ -0,0 +1,83 @@
+# services/facets.py
+"""Facet counts (status, category, rating, genre, decade) for a result set."""
+from typing import Any, Dict, Iterable, Optional
+
+from services.bitmap import Bitmap
+
+# "min rating" choices offered by the search filters
+RATING_THRESHOLDS = (0, 1, 2, 3, 4, 5)
+
+# search filters that count_facets() applies itself
+FACET_FILTERS = ("status", "category", "min_rating")
+
+
+def decade_of(year) -> Optional[int]:
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        return None
+    return year // 10 * 10 if year else None
+
+
+def _count_each(index, keys, within: Bitmap) -> Dict[Any, int]:
+    counts = {}
+    for key in keys:
+        n = len(within & index.get(key))
+        if n:
+            counts[key] = n
+    return counts
+
+
+def count_facets(indexes, ordinals: Iterable[int], status: Optional[str] = None,
+                 category: Optional[str] = None, min_rating: float = 0) -> Dict[str, Dict[Any, int]]:
+    """Count facets over ``ordinals`` with bitmap ANDs and popcounts.
+
+    ``ordinals`` is the result of the query *without* the status, category
+    and rating filters; those are applied here so that each facet counts
+    what choosing one of its options would return with the other filters
+    kept (e.g. the status counts honour the category filter but not the
+    status filter).  Genre and decade counts describe the current result.
+
+    ``rating`` maps each threshold in RATING_THRESHOLDS to the number of
+    books rated at least that much.
+    """
+    base = Bitmap.of(ordinals)
+    status_index = indexes["status"]
+    category_index = indexes["category"]
+    genre_index = indexes["genre"]
+    year_index = indexes["year"]
+
+    status_ok = status_index.get(status) if status is not None else None
+    category_ok = category_index.get(category) if category is not None else None
+    rating_ok = indexes.at_least("rating", min_rating) if min_rating and min_rating > 0 else None
+
+    def within(*bitmaps) -> Bitmap:
+        return Bitmap.intersection([base] + [b for b in bitmaps if b is not None])
+
+    rating_base = within(status_ok, category_ok)
+    result = within(status_ok, category_ok, rating_ok)
+
+    # years are grouped into decades before counting
+    decade_years: Dict[int, list] = {}
+    for year in year_index.keys():
+        decade = decade_of(year)
+        if decade is not None:
+            decade_years.setdefault(decade, []).append(year)
+    decades = {}
+    for decade, years in decade_years.items():
+        n = len(result & year_index.any_of(years))
+        if n:
+            decades[decade] = n
+
+    rating_counts = {threshold: len(rating_base & indexes.at_least("rating", threshold)) if threshold > 0
+                     else len(rating_base) for threshold in RATING_THRESHOLDS}
+    genres = _count_each(genre_index, genre_index.keys(), result)
+
+    return {
+        "total": len(result),
+        "status": _count_each(status_index, status_index.keys(), within(category_ok, rating_ok)),
+        "category": _count_each(category_index, category_index.keys(), within(status_ok, rating_ok)),
+        "rating": rating_counts,
+        "genre": dict(sorted(genres.items(), key=lambda item: (-item[1], item[0]))),
+        "decade": dict(sorted(decades.items())),
+    }
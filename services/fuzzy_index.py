@@ -0,0 +1,184 @@
+# services/fuzzy_index.py
+"""Typo-tolerant lookups over the title/author vocabulary (BK-tree)."""
+from itertools import product
+from typing import Dict, List, Optional, Set, Tuple
+
+from services.search_index import tokenize
+
+# fields whose words take part in fuzzy matching and suggestions
+FUZZY_FIELDS = ("title", "author")
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance (insertions, deletions, substitutions) between two words"""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def max_typos(term: str) -> int:
+    """Edits tolerated for a query term: none for very short words"""
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 4 else 2
+
+
+class BKTree:
+    """Burkhard-Keller tree: each child edge is labelled with its edit
+    distance to the parent, so a radius query only visits edges within
+    ``distance +/- radius`` (triangle inequality)."""
+
+    def __init__(self):
+        self._root: Optional[Tuple[str, Dict[int, tuple]]] = None
+        self.size = 0
+
+    def add(self, word: str) -> None:
+        if self._root is None:
+            self._root = (word, {})
+            self.size = 1
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (word, {})
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word: str, radius: int) -> List[Tuple[int, str]]:
+        """(distance, word) pairs within ``radius`` of ``word``"""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= radius:
+                found.append((distance, node_word))
+            for edge, child in children.items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+class FuzzyIndex:
+    """Word -> ordinals postings for titles and authors plus a BK-tree over
+    the words.
+
+    Words are reference counted; a word whose count drops to zero stays in
+    the tree (BK-trees do not support removal) but is skipped, and the tree
+    is dropped once such dead words outnumber the live ones.
+
+    The tree is built on the first fuzzy lookup, not while books load:
+    until then only the postings are kept, and a dropped tree is rebuilt
+    the same way.  Once built, new words are added to it one at a time.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._words_of: Dict[int, frozenset] = {}
+        # None until the first lookup needs it
+        self._tree: Optional[BKTree] = None
+
+    def add(self, ordinal: int, book) -> None:
+        words = set()
+        for name in FUZZY_FIELDS:
+            words.update(tokenize(getattr(book, name, "")))
+        self._words_of[ordinal] = frozenset(words)
+        for word in words:
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = set()
+                if self._tree is not None:
+                    self._tree.add(word)
+            postings.add(ordinal)
+
+    def discard(self, ordinal: int) -> None:
+        for word in self._words_of.pop(ordinal, ()):
+            postings = self._postings.get(word)
+            if postings is not None:
+                postings.discard(ordinal)
+                if not postings:
+                    del self._postings[word]
+        tree = self._tree
+        if tree is not None and tree.size > 64 and tree.size > 2 * len(self._postings):
+            self._tree = None
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._words_of.clear()
+        self._tree = None
+
+    @property
+    def tree(self) -> BKTree:
+        """The BK-tree over the live words, built on first use"""
+        if self._tree is None:
+            tree = BKTree()
+            for word in self._postings:
+                tree.add(word)
+            self._tree = tree
+        return self._tree
+
+    def similar(self, term: str, radius: Optional[int] = None) -> List[Tuple[int, str]]:
+        """Live vocabulary words near ``term``, closest and most common first"""
+        if radius is None:
+            radius = max_typos(term)
+        found = [(d, w) for d, w in self.tree.search(term, radius) if w in self._postings]
+        found.sort(key=lambda item: (item[0], -len(self._postings[item[1]]), item[1]))
+        return found
+
+    def search(self, query: str, candidates: Optional[Set[int]] = None) -> Set[int]:
+        """Ordinals where every query word is within a few typos of a title/author word"""
+        result = None if candidates is None else set(candidates)
+        for term in set(tokenize(query)):
+            matches = set()
+            for _, word in self.similar(term):
+                matches |= self._postings[word]
+            result = matches if result is None else result & matches
+            if not result:
+                return set()
+        if result is None:
+            return set(self._words_of)
+        return result
+
+    def suggest(self, query: str, limit: int = 5) -> List[str]:
+        """Spelling corrections for ``query``, best first.
+
+        Each word is replaced by close vocabulary words (allowing one more
+        typo than search does); combinations that match at least one book
+        are ranked by total edits, then by how many books they match.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        options = []
+        for term in terms:
+            near = self.similar(term, max_typos(term) + 1)[:3]
+            if not near:
+                return []
+            options.append(near)
+        ranked = []
+        for combo in product(*options):
+            edits = sum(d for d, _ in combo)
+            if edits == 0:
+                continue
+            hits = set.intersection(*(self._postings[w] for _, w in combo))
+            if hits:
+                ranked.append((edits, -len(hits), " ".join(w for _, w in combo)))
+        ranked.sort()
+        suggestions = []
+        for _, _, text in ranked:
+            if text not in suggestions:
+                suggestions.append(text)
+        return suggestions[:limit]
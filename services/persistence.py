@@ -0,0 +1,121 @@
+# services/persistence.py
+"""Write-behind persistence: debounce saves and run them off the UI thread."""
+from typing import Any, Callable, Dict, Optional
+import atexit
+import threading
+import time
+
+
+class WriteBehindPersister:
+    """Coalesce bursts of changes into one background flush.
+
+    Call ``mark_dirty()`` after each change.  Once no new change has arrived
+    for ``delay`` seconds, ``flush_fn`` runs on a worker thread.  ``flush()``
+    runs it immediately (for tests and shutdown) and ``close()`` performs a
+    final flush; ``close`` is also registered with ``atexit``.
+    """
+
+    def __init__(self, flush_fn: Callable[[], Any], delay: float = 0.5, name: str = "write-behind"):
+        self.flush_fn = flush_fn
+        self.delay = delay
+        self.name = name
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._last_mark = 0.0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.counters: Dict[str, float] = {
+            "marks": 0,
+            "coalesced_writes": 0,
+            "flushes": 0,
+            "errors": 0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+            "total_flush_ms": 0.0,
+        }
+        atexit.register(self.close)
+
+    def mark_dirty(self) -> None:
+        """Record that there is something to write and (re)start the quiet period."""
+        with self._cond:
+            self.counters["marks"] += 1
+            if self._dirty:
+                # this change rides along with a flush that is already due
+                self.counters["coalesced_writes"] += 1
+            self._dirty = True
+            self._last_mark = time.monotonic()
+            if self._closed:
+                return
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self) -> None:
+        """Write pending changes now, on the calling thread."""
+        with self._cond:
+            self._dirty = False
+        self._do_flush()
+
+    def close(self) -> None:
+        """Stop the worker and flush whatever is still pending."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, float]:
+        """Counter snapshot, including the average flush latency."""
+        with self._cond:
+            data = dict(self.counters)
+            data["pending"] = self._dirty
+        data["avg_flush_ms"] = data["total_flush_ms"] / data["flushes"] if data["flushes"] else 0.0
+        return data
+
+    def _run(self) -> None:
+        with self._cond:
+            while not self._closed:
+                if not self._dirty:
+                    self._cond.wait()
+                    continue
+                remaining = self._last_mark + self.delay - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                self._dirty = False
+                self._cond.release()
+                try:
+                    self._do_flush()
+                finally:
+                    self._cond.acquire()
+            self._thread = None
+
+    def _do_flush(self) -> None:
+        with self._flush_lock:
+            started = time.perf_counter()
+            try:
+                self.flush_fn()
+            except Exception as e:
+                print(f"Warning: {self.name} flush failed: {e}")
+                with self._cond:
+                    self.counters["errors"] += 1
+                    # retry after another quiet period
+                    self._dirty = True
+                    self._last_mark = time.monotonic()
+                return
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            with self._cond:
+                self.counters["flushes"] += 1
+                self.counters["last_flush_ms"] = elapsed_ms
+                self.counters["total_flush_ms"] += elapsed_ms
+                self.counters["max_flush_ms"] = max(self.counters["max_flush_ms"], elapsed_ms)
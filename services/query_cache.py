@@ -0,0 +1,118 @@
+# services/query_cache.py
+"""Bounded LRU cache for query results."""
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+
+def freeze(value) -> Hashable:
+    """Turn filter dicts/lists into something usable in a cache key"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class QueryCache:
+    """LRU mapping of query keys to results, with hit/miss counters.
+
+    Callers pass the data generation with every lookup.  Entries computed
+    before a change can never be asked for again, so the first lookup with
+    a new generation drops them all instead of letting them age out.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.generation = None
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], generation: Hashable = None) -> Any:
+        if generation != self.generation:
+            self._entries.clear()
+            self.generation = generation
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return value
+        value = compute()
+        self._entries[key] = value
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class NarrowingHistory:
+    """Recent search results per (mode, filters) for as-you-type narrowing.
+
+    ``ancestor(query)`` returns the most specific remembered result that is
+    guaranteed to contain every match of ``query`` (as decided by
+    ``narrows(old, new)``), so the new search only has to filter that set.
+    Everything is forgotten when the data generation changes.
+    """
+
+    def __init__(self, max_queries: int = 32, max_contexts: int = 8):
+        self.max_queries = max_queries
+        self.max_contexts = max_contexts
+        self.generation = None
+        self._contexts: "OrderedDict[Hashable, OrderedDict]" = OrderedDict()
+        self.narrowed = 0
+        self.reused = 0
+
+    def _results(self, context: Hashable, generation: int) -> "OrderedDict":
+        if generation != self.generation:
+            self._contexts.clear()
+            self.generation = generation
+        results = self._contexts.get(context)
+        if results is None:
+            results = self._contexts[context] = OrderedDict()
+            if len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+        else:
+            self._contexts.move_to_end(context)
+        return results
+
+    def ancestor(self, context: Hashable, generation: int, query: str,
+                 narrows: Callable[[str, str], bool]):
+        """(query, ordinals) of the best remembered superset, or None"""
+        results = self._results(context, generation)
+        if query in results:
+            results.move_to_end(query)
+            self.reused += 1
+            return query, results[query]
+        best = None
+        for old, ordinals in results.items():
+            if narrows(old, query) and (best is None or len(ordinals) < len(best[1])):
+                best = (old, ordinals)
+        if best is not None:
+            self.narrowed += 1
+        return best
+
+    def remember(self, context: Hashable, generation: int, query: str, ordinals) -> None:
+        results = self._results(context, generation)
+        results[query] = frozenset(ordinals)
+        results.move_to_end(query)
+        if len(results) > self.max_queries:
+            results.popitem(last=False)
@@ -0,0 +1,356 @@
+# services/query_parser.py
+"""Structured search syntax, compiled into an index-backed plan.
+
+    author:tolkien status:reading rating>=4 year:1930..1960 cat:Favorites -genre:romance
+
+Known fields are ``title``, ``author``, ``genre``, ``status``, ``cat``
+(``category``), ``isbn``, ``year``, ``rating`` and ``progress``.  Numeric
+fields take ``:N``, ``:A..B`` (either end optional) or ``>=``, ``>``,
+``<=``, ``<``, ``=``; the others match case- and accent-insensitively
+(``title``/``author``/``genre``/``isbn`` by substring).  A leading ``-``
+negates a term and values may be quoted (``author:"le guin"``).  Words
+that are not field terms are free text.  A query without any field term
+is returned as plain free text, so existing searches behave as before.
+"""
+import re
+from typing import Iterable, List, Optional, Set, Tuple
+
+from services.bitmap import Bitmap
+from services.search_index import SEARCH_FIELDS
+from utils.text import fold
+
+FIELD_ALIASES = {
+    "title": "title",
+    "author": "author",
+    "by": "author",
+    "genre": "genre",
+    "status": "status",
+    "cat": "category",
+    "category": "category",
+    "isbn": "isbn",
+    "year": "year",
+    "rating": "rating",
+    "progress": "progress",
+}
+NUMERIC_FIELDS = {"year": int, "rating": float, "progress": float}
+
+_TERM_RE = re.compile(r'(-?)([A-Za-z]+)(>=|<=|>|<|=|:)("[^"]*"?|\S*)')
+
+
+def _unquote(value: str) -> str:
+    if value.startswith('"'):
+        value = value[1:]
+        if value.endswith('"'):
+            value = value[:-1]
+    return value.strip()
+
+
+def _squash(text) -> str:
+    """Folded, without spaces or punctuation ("On Hold" matches "on-hold")"""
+    return re.sub(r"\W+", "", fold(text))
+
+
+class Predicate:
+    """One field term; ``negate`` inverts it.
+
+    ``estimate()`` is the number of books the term matches (or an upper
+    bound), ``ordinals()`` materializes them and ``matches(ordinal)``
+    checks a single book, so the plan can either intersect sets or verify
+    a small candidate set.  ``ordinals()`` may return a Bitmap, which the
+    plan then combines with bitwise operations.
+    """
+
+    negate = False
+    # ordinals() is a Bitmap
+    bitmap = False
+
+    def describe(self) -> str:
+        raise NotImplementedError
+
+    def estimate(self, indexes) -> int:
+        raise NotImplementedError
+
+    def ordinals(self, indexes) -> Set[int]:
+        raise NotImplementedError
+
+    def matches(self, indexes, ordinal: int) -> bool:
+        raise NotImplementedError
+
+
+class KeyPredicate(Predicate):
+    """Matches books filed under any attribute-index key accepted by ``accept``"""
+
+    bitmap = True
+
+    def __init__(self, field: str, index_name: str, value: str, accept, negate=False):
+        self.field = field
+        self.index_name = index_name
+        self.value = value
+        self.accept = accept
+        self.negate = negate
+        self._keys = None
+
+    def describe(self):
+        return f"{'-' if self.negate else ''}{self.field}:{self.value}"
+
+    def keys(self, indexes) -> List:
+        if self._keys is None:
+            self._keys = [key for key in indexes[self.index_name].keys() if self.accept(key)]
+        return self._keys
+
+    def estimate(self, indexes):
+        index = indexes[self.index_name]
+        return sum(index.count(key) for key in self.keys(indexes))
+
+    def ordinals(self, indexes):
+        return indexes[self.index_name].any_of(self.keys(indexes))
+
+    def matches(self, indexes, ordinal):
+        wanted = set(self.keys(indexes))
+        return any(key in wanted for key in indexes[self.index_name].keys_of(ordinal))
+
+
+class RangePredicate(Predicate):
+    """Numeric range (inclusive by default) answered from a sorted index"""
+
+    def __init__(self, field: str, low, high, negate=False, low_open=False, high_open=False):
+        self.field = field
+        self.low = low
+        self.high = high
+        self.low_open = low_open
+        self.high_open = high_open
+        self.negate = negate
+
+    def describe(self):
+        low = "" if self.low is None else f"{'(' if self.low_open else '['}{self.low}"
+        high = "" if self.high is None else f"{self.high}{')' if self.high_open else ']'}"
+        return f"{'-' if self.negate else ''}{self.field}:{low}..{high}"
+
+    def _accepts(self, key) -> bool:
+        if self.low is not None and (key < self.low or (self.low_open and key == self.low)):
+            return False
+        if self.high is not None and (key > self.high or (self.high_open and key == self.high)):
+            return False
+        return True
+
+    def _bounds(self, indexes):
+        return indexes.sorted[self.field].bounds(self.low, self.high, self.low_open, self.high_open)
+
+    def estimate(self, indexes):
+        i, j = self._bounds(indexes)
+        return j - i
+
+    def ordinals(self, indexes):
+        return set(indexes.sorted[self.field].ordinals_between(*self._bounds(indexes)))
+
+    def matches(self, indexes, ordinal):
+        return self._accepts(indexes.sorted[self.field].key_of(ordinal))
+
+
+class SubstringPredicate(Predicate):
+    """Substring of the title, author, genre or ISBN (``field=None``: any of them)"""
+
+    POSITIONS = {"title": 0, "author": 1, "genre": 2, "isbn": 3}
+
+    def __init__(self, field: Optional[str], value: str, negate=False):
+        self.field = field
+        self.value = value
+        self.needle = value if field == "isbn" else value.lower()
+        self.negate = negate
+        self._candidates = None
+
+    def describe(self):
+        prefix = f"{self.field}:" if self.field else ""
+        return f"{'-' if self.negate else ''}{prefix}{self.value}"
+
+    def _search(self, indexes):
+        if self._candidates is None:
+            self._candidates = indexes.substring.search(self.needle)
+        return self._candidates
+
+    def estimate(self, indexes):
+        return len(self._search(indexes))
+
+    def ordinals(self, indexes):
+        if self.field is None:
+            return set(self._search(indexes))
+        return {o for o in self._search(indexes) if self.matches(indexes, o)}
+
+    def matches(self, indexes, ordinal):
+        haystacks = indexes.substring.haystacks(ordinal)
+        if not haystacks:
+            return False
+        if self.field is None:
+            return any(self.needle in text for text in haystacks)
+        return self.needle in haystacks[self.POSITIONS[self.field]]
+
+
+class CandidateSet(Predicate):
+    """An already computed set (e.g. the search filters) taking part in the plan"""
+
+    def __init__(self, ordinals: Iterable[int], label: str = "filters"):
+        self.set = ordinals
+        self.label = label
+        self.bitmap = isinstance(ordinals, Bitmap)
+
+    def describe(self):
+        return self.label
+
+    def estimate(self, indexes):
+        return len(self.set)
+
+    def ordinals(self, indexes):
+        return self.set
+
+    def matches(self, indexes, ordinal):
+        return ordinal in self.set
+
+
+def _number(kind, text: str):
+    try:
+        return kind(text)
+    except (TypeError, ValueError):
+        raise ValueError(f"not a number: {text!r}")
+
+
+def _range_predicate(field: str, op: str, value: str, negate: bool) -> RangePredicate:
+    kind = NUMERIC_FIELDS[field]
+    if op == ":" and ".." in value:
+        low, _, high = value.partition("..")
+        return RangePredicate(field, _number(kind, low) if low else None,
+                              _number(kind, high) if high else None, negate)
+    number = _number(kind, value)
+    if op in (":", "="):
+        return RangePredicate(field, number, number, negate)
+    if op in (">", ">="):
+        return RangePredicate(field, number, None, negate, low_open=(op == ">"))
+    return RangePredicate(field, None, number, negate, high_open=(op == "<"))
+
+
+def _field_predicate(field: str, op: str, value: str, negate: bool) -> Predicate:
+    if field in NUMERIC_FIELDS:
+        return _range_predicate(field, op, value, negate)
+    if op != ":" and op != "=":
+        raise ValueError(f"{field} does not support {op}")
+    if field == "status":
+        wanted = _squash(value)
+        return KeyPredicate("status", "status", value, lambda key: _squash(key) == wanted, negate)
+    if field == "category":
+        wanted = fold(value).strip()
+        return KeyPredicate("cat", "category", value, lambda key: fold(key).strip() == wanted, negate)
+    if field in ("author", "genre"):
+        # index keys are already folded
+        wanted = fold(value).strip()
+        return KeyPredicate(field, field, value, lambda key: wanted in key, negate)
+    return SubstringPredicate(field, value, negate)
+
+
+class QueryPlan:
+    """Parsed query: field predicates plus leftover free text."""
+
+    def __init__(self, predicates: List[Predicate], free_text: List[Tuple[str, bool]]):
+        self.predicates = predicates
+        self.free_text = free_text
+
+    @property
+    def structured(self) -> bool:
+        return bool(self.predicates)
+
+    @property
+    def text(self) -> str:
+        """The positive free-text words, joined"""
+        return " ".join(word for word, negate in self.free_text if not negate)
+
+    def order(self, indexes, extra: Iterable[Predicate] = ()) -> List[Tuple[int, Predicate]]:
+        """(estimate, predicate) for the positive terms, most selective first"""
+        positives = [p for p in list(self.predicates) + list(extra) if not p.negate]
+        return sorted(((p.estimate(indexes), p) for p in positives), key=lambda item: item[0])
+
+    def explain(self, indexes, extra: Iterable[Predicate] = ()) -> List[str]:
+        """Human-readable evaluation order, e.g. for debugging slow queries"""
+        extra = list(extra)
+        lines = [f"{p.describe()} (~{n})" for n, p in self.order(indexes, extra)]
+        lines += [f"{p.describe()} (excluded)" for p in self.predicates + extra if p.negate]
+        return lines
+
+    def execute(self, indexes, universe: Iterable[int], extra: Iterable[Predicate] = ()):
+        """Ordinals satisfying every predicate (a set or a Bitmap).
+
+        The most selective term is materialized first; each further term is
+        intersected, or, once the running result is smaller than the term,
+        checked book by book.  Bitmap terms are always combined bitwise (AND,
+        and AND NOT for negated terms).  Other negated terms are checked
+        book by book last.
+        """
+        extra = list(extra)
+        result = None
+        for estimate, predicate in self.order(indexes, extra):
+            if result is None:
+                result = predicate.ordinals(indexes)
+                # bitmaps are never modified in place; sets are
+                result = result if isinstance(result, Bitmap) else set(result)
+            elif len(result) <= estimate and not (predicate.bitmap and isinstance(result, Bitmap)):
+                result = {o for o in result if predicate.matches(indexes, o)}
+            else:
+                result &= predicate.ordinals(indexes)
+            if not result:
+                return set()
+        if result is None:
+            result = universe.copy() if isinstance(universe, Bitmap) else set(universe)
+        for predicate in self.predicates + extra:
+            if predicate.negate and result:
+                if predicate.bitmap:
+                    result = Bitmap.of(result) - predicate.ordinals(indexes)
+                else:
+                    result = {o for o in result if not predicate.matches(indexes, o)}
+        return result
+
+
+def matched_fields(query: str) -> Set[str]:
+    """Book attributes whose values can decide whether a book matches ``query``"""
+    query = query or ""
+    fields: Set[str] = set()
+    for match in _TERM_RE.finditer(query):
+        name = FIELD_ALIASES.get(match.group(2).lower())
+        if name:
+            fields.add("categories" if name == "category" else name)
+    if query.strip():
+        # any word may be free text
+        fields.update(SEARCH_FIELDS)
+    return fields
+
+
+def parse_query(query: str) -> QueryPlan:
+    """Split ``query`` into field predicates and free text.
+
+    Raises ValueError for a malformed field term (e.g. ``year:abc``).
+    """
+    predicates: List[Predicate] = []
+    free_text: List[Tuple[str, bool]] = []
+    pos = 0
+    query = query or ""
+    while pos < len(query):
+        if query[pos].isspace():
+            pos += 1
+            continue
+        match = _TERM_RE.match(query, pos)
+        if match and match.group(2).lower() in FIELD_ALIASES and match.group(4):
+            negate, name, op, value = match.groups()
+            value = _unquote(value)
+            if value:
+                predicates.append(_field_predicate(FIELD_ALIASES[name.lower()], op, value, bool(negate)))
+            pos = match.end()
+            continue
+        end = pos
+        while end < len(query) and not query[end].isspace():
+            end += 1
+        word = query[pos:end]
+        if word.startswith("-") and len(word) > 1:
+            free_text.append((word[1:], True))
+        else:
+            free_text.append((word, False))
+        pos = end
+    if not predicates:
+        # plain search: keep the text exactly as typed
+        return QueryPlan([], [(query.strip(), False)] if query.strip() else [])
+    return QueryPlan(predicates, free_text)
@@ -0,0 +1,78 @@
+# services/ranking.py
+"""BM25F relevance ranking over the inverted full-text index."""
+import heapq
+import math
+from typing import Dict, Iterable, List, Tuple
+
+from services.search_index import InvertedIndex, tokenize
+
+# title > author > genre > description; the rest barely count
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "author": 2.0,
+    "genre": 1.5,
+    "description": 1.0,
+    "isbn": 1.0,
+    "publisher": 0.5,
+    "review": 0.5,
+    "notes": 0.5,
+}
+K1 = 1.2
+B = 0.75
+
+
+class BM25FRanker:
+    """Scores books for one query.
+
+    Per-field term counts are length-normalized and weighted into a single
+    pseudo term frequency, which is saturated once (BM25F).  A query word
+    matches indexed words it is a prefix of; a book scores with its best
+    such word, using that word's own document frequency.
+    """
+
+    def __init__(self, index: InvertedIndex, query: str, weights: Dict[str, float] = None,
+                 k1: float = K1, b: float = B):
+        self.index = index
+        self.terms = list(dict.fromkeys(tokenize(query)))
+        self.weights = weights or FIELD_WEIGHTS
+        self.k1 = k1
+        self.b = b
+        self._avg = {name: index.average_length(name) or 1.0 for name in self.weights}
+        self._idf: Dict[str, float] = {}
+        self._docs = max(len(index), 1)
+
+    def idf(self, token: str) -> float:
+        value = self._idf.get(token)
+        if value is None:
+            df = self.index.document_frequency(token)
+            value = self._idf[token] = math.log(1.0 + (self._docs - df + 0.5) / (df + 0.5))
+        return value
+
+    def score(self, ordinal: int) -> float:
+        fields = self.index.fields_of(ordinal)
+        total = 0.0
+        for term in self.terms:
+            pseudo_tf: Dict[str, float] = {}
+            for name, counts in fields.items():
+                weight = self.weights.get(name, 0.0)
+                if not weight:
+                    continue
+                length = sum(counts.values())
+                norm = 1.0 - self.b + self.b * length / self._avg[name]
+                for token, count in counts.items():
+                    if token.startswith(term):
+                        pseudo_tf[token] = pseudo_tf.get(token, 0.0) + weight * count / norm
+            best = 0.0
+            for token, tf in pseudo_tf.items():
+                best = max(best, self.idf(token) * tf * (self.k1 + 1.0) / (self.k1 + tf))
+            total += best
+        return total
+
+    def top(self, ordinals: Iterable[int], k: int) -> List[Tuple[float, int]]:
+        """The ``k`` best (score, ordinal) pairs, best first; ties keep insertion order.
+
+        A bounded heap keeps only ``k`` entries, so only the winners are
+        ever turned into result rows.
+        """
+        scored = ((self.score(o), -o) for o in ordinals)
+        return [(score, -neg) for score, neg in heapq.nlargest(k, scored)]
@@ -0,0 +1,182 @@
+# services/reading_sessions.py
+"""Append-only log of reading sessions, indexed by day, with streaks."""
+from datetime import date, datetime
+from typing import Dict, List, Tuple
+import atexit
+import json
+import os
+
+from services.rollups import TimeRollup
+from services.storage import _atomic_write_json
+
+
+def _day_number(when) -> int:
+    """date.toordinal() of a date, datetime, ISO string or None (today)"""
+    if when is None:
+        return date.today().toordinal()
+    if isinstance(when, datetime):
+        return when.date().toordinal()
+    if isinstance(when, date):
+        return when.toordinal()
+    return datetime.strptime(str(when)[:10], "%Y-%m-%d").toordinal()
+
+
+class ReadingSessionLog:
+    """Reading sessions in ``<path>`` (one compact JSON line each) plus a
+    day -> (sessions, pages) index built from it.
+
+    Streaks only look at days: the longest streak is updated when a new
+    day is first read (by measuring the run that day joins) and the
+    current streak walks back from today, so neither ever looks at the
+    individual sessions.  The index is saved to ``<path>.snapshot``
+    together with the log offset it covers; on startup only the sessions
+    appended after that offset are replayed.  ``close()`` (also run at
+    exit) saves the snapshot if sessions were added since the last one.
+
+    ``rollup`` totals ``sessions`` and ``pages`` per day, month and year.
+    """
+
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, path: str, snapshot_every: int = 200):
+        self.path = path
+        self.snapshot_path = f"{path}.snapshot"
+        self.snapshot_every = snapshot_every
+        # date.toordinal() -> [sessions, pages]
+        self.days: Dict[int, List[int]] = {}
+        self.rollup = TimeRollup()
+        self.sessions = 0
+        self.longest = 0
+        # bytes of the log reflected in ``days``
+        self._offset = 0
+        self._unsaved = 0
+        self.load()
+        atexit.register(self.close)
+
+    # --- persistence -----------------------------------------------------
+
+    def load(self) -> None:
+        self.days.clear()
+        self.rollup.clear()
+        self.sessions = self.longest = self._offset = 0
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") == self.SNAPSHOT_VERSION and 0 <= snapshot.get("offset", -1) <= size:
+                for day, (sessions, pages) in snapshot.get("days", {}).items():
+                    self.days[_day_number(day)] = [int(sessions), int(pages)]
+                    self.rollup.add(date.fromordinal(_day_number(day)), "sessions", int(sessions))
+                    self.rollup.add(date.fromordinal(_day_number(day)), "pages", int(pages))
+                self.sessions = sum(entry[0] for entry in self.days.values())
+                self.longest = int(snapshot.get("longest", 0))
+                self._offset = snapshot["offset"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: ignoring reading session snapshot: {e}")
+            self.days.clear()
+            self.rollup.clear()
+            self.sessions = self.longest = self._offset = 0
+        self._replay(size)
+
+    def _replay(self, size: int) -> None:
+        """Apply the sessions logged after the snapshot"""
+        if self._offset >= size:
+            return
+        replayed = 0
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                    day, pages = _day_number(record["d"]), int(record.get("p", 0))
+                except (ValueError, KeyError, TypeError):
+                    # torn trailing write from a crash; everything before it is intact
+                    break
+                self._add(day, pages)
+                self._offset += len(line)
+                replayed += 1
+        if self._offset < size:
+            # drop the torn tail so new sessions start on a clean line
+            with open(self.path, 'r+b') as f:
+                f.truncate(self._offset)
+        self._unsaved += replayed
+
+    def save_snapshot(self) -> None:
+        _atomic_write_json(self.snapshot_path, {
+            "version": self.SNAPSHOT_VERSION,
+            "offset": self._offset,
+            "longest": self.longest,
+            "days": {date.fromordinal(day).isoformat(): entry for day, entry in sorted(self.days.items())},
+        }, indent=None)
+        self._unsaved = 0
+
+    def close(self) -> None:
+        if self._unsaved:
+            try:
+                self.save_snapshot()
+            except Exception as e:
+                print(f"Warning: failed to save reading session snapshot: {e}")
+
+    # --- sessions -----------------------------------------------------------
+
+    def record(self, book_id: str, pages: int = 0, when=None) -> None:
+        """Log a session on ``when`` (a date, datetime or ``YYYY-MM-DD``; default today)"""
+        day = _day_number(when)
+        pages = max(0, int(pages or 0))
+        line = json.dumps({"d": date.fromordinal(day).isoformat(), "b": book_id, "p": pages},
+                          separators=(',', ':')) + "\n"
+        data = line.encode('utf-8')
+        folder = os.path.dirname(self.path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        with open(self.path, 'ab') as f:
+            f.write(data)
+        self._offset += len(data)
+        self._add(day, pages)
+        self._unsaved += 1
+        if self._unsaved >= self.snapshot_every:
+            self.save_snapshot()
+
+    def _add(self, day: int, pages: int) -> None:
+        entry = self.days.get(day)
+        self.sessions += 1
+        self.rollup.add(date.fromordinal(day), "sessions")
+        self.rollup.add(date.fromordinal(day), "pages", pages)
+        if entry is not None:
+            entry[0] += 1
+            entry[1] += pages
+            return
+        self.days[day] = [1, pages]
+        # the run this day joins: read days just before and after it
+        start = day
+        while start - 1 in self.days:
+            start -= 1
+        end = day
+        while end + 1 in self.days:
+            end += 1
+        self.longest = max(self.longest, end - start + 1)
+
+    # --- queries ----------------------------------------------------------
+
+    def current_streak(self, today=None) -> int:
+        """Consecutive reading days up to today (or yesterday, until today is read)"""
+        day = _day_number(today)
+        if day not in self.days:
+            day -= 1
+        streak = 0
+        while day in self.days:
+            streak += 1
+            day -= 1
+        return streak
+
+    def longest_streak(self) -> int:
+        return self.longest
+
+    def day(self, when) -> Tuple[int, int]:
+        """(sessions, pages) logged on a day"""
+        entry = self.days.get(_day_number(when))
+        return (entry[0], entry[1]) if entry else (0, 0)
@@ -0,0 +1,157 @@
+# services/rollups.py
+"""Reading activity totals bucketed by day, month and year."""
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+LEVELS = ("day", "month", "year")
+
+
+def parse_day(value) -> Optional[date]:
+    """The date of a ``YYYY-MM-DD`` string (or date/datetime), None if unset or malformed"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def bucket_key(level: str, day: date) -> tuple:
+    if level == "day":
+        return day.year, day.month, day.day
+    if level == "month":
+        return day.year, day.month
+    return (day.year,)
+
+
+def bucket_label(key: tuple) -> str:
+    """Label such as 2024, 2024-05 or 2024-05-17"""
+    return "-".join([str(key[0])] + [f"{part:02d}" for part in key[1:]])
+
+
+def last_periods(level: str, periods: int, end: Optional[date] = None) -> List[tuple]:
+    """Keys of the ``periods`` buckets ending with the one holding ``end`` (default today), oldest first"""
+    end = end or date.today()
+    if level == "day":
+        first = end.toordinal() - periods + 1
+        return [bucket_key("day", date.fromordinal(n)) for n in range(first, end.toordinal() + 1)]
+    if level == "month":
+        index = end.year * 12 + end.month - 1
+        return [(n // 12, n % 12 + 1) for n in range(index - periods + 1, index + 1)]
+    return [(year,) for year in range(end.year - periods + 1, end.year + 1)]
+
+
+class TimeRollup:
+    """metric -> total per day, month and year bucket.
+
+    ``add`` updates the three buckets a day falls into, so any view is a
+    lookup per bucket shown, however much history lies behind it.
+    Metrics are plain keys ("completed", "pages", ("genre", "Fantasy")).
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, Dict[tuple, Dict[Any, int]]] = {level: {} for level in LEVELS}
+
+    def clear(self) -> None:
+        for buckets in self._buckets.values():
+            buckets.clear()
+
+    def add(self, day: date, metric, amount: int = 1) -> None:
+        if not amount:
+            return
+        for level in LEVELS:
+            buckets = self._buckets[level]
+            key = bucket_key(level, day)
+            totals = buckets.setdefault(key, {})
+            total = totals.get(metric, 0) + amount
+            if total:
+                totals[metric] = total
+            else:
+                del totals[metric]
+                if not totals:
+                    del buckets[key]
+
+    def get(self, level: str, key: tuple, metric) -> int:
+        return self._buckets[level].get(key, {}).get(metric, 0)
+
+    def series(self, level: str, metric, periods: int, end: Optional[date] = None) -> "OrderedDict[str, int]":
+        """label -> total for the last ``periods`` buckets (empty ones included)"""
+        buckets = self._buckets[level]
+        return OrderedDict((bucket_label(key), buckets.get(key, {}).get(metric, 0))
+                           for key in last_periods(level, periods, end))
+
+    def keys(self, level: str) -> List[tuple]:
+        """Buckets with any activity, oldest first"""
+        return sorted(self._buckets[level])
+
+    def breakdown(self, level: str, key: tuple, kind: str) -> Dict[str, int]:
+        """name -> total of the ``(kind, name)`` metrics in one bucket"""
+        totals = self._buckets[level].get(key, {})
+        return {metric[1]: total for metric, total in totals.items()
+                if isinstance(metric, tuple) and metric[0] == kind}
+
+
+def _named_genres(genre) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(g.strip() for g in str(genre or "").split(",") if g.strip()))
+
+
+class CompletionRollups:
+    """Finished books per day/month/year, overall and per genre.
+
+    Kept up to date by BookIndexes like the other indexes: each book
+    contributes one ``completed`` and one ``("genre", name)`` per genre to
+    the buckets of its finish date.
+    """
+
+    def __init__(self):
+        self.rollup = TimeRollup()
+        self._contributions: Dict[int, Tuple[date, Tuple[str, ...]]] = {}
+
+    def add(self, ordinal: int, book) -> None:
+        day = parse_day(getattr(book, "finish_date", None))
+        if day is None:
+            return
+        contribution = (day, _named_genres(getattr(book, "genre", "")))
+        self._contributions[ordinal] = contribution
+        self._apply(contribution, 1)
+
+    def discard(self, ordinal: int) -> None:
+        contribution = self._contributions.pop(ordinal, None)
+        if contribution is not None:
+            self._apply(contribution, -1)
+
+    def clear(self) -> None:
+        self.rollup.clear()
+        self._contributions.clear()
+
+    def export(self, key_of: Callable[[int], Any]) -> Dict[Any, list]:
+        """What each book contributed, JSON-ready and keyed by ``key_of(ordinal)``"""
+        return {key_of(ordinal): [day.isoformat(), list(genres)]
+                for ordinal, (day, genres) in self._contributions.items()}
+
+    def restore(self, contributions: Iterable[Tuple[int, list]]) -> None:
+        """Rebuild from ``(ordinal, exported contribution)`` pairs without reading any book"""
+        self.clear()
+        for ordinal, (day, genres) in contributions:
+            contribution = (date.fromisoformat(day), tuple(genres))
+            self._contributions[ordinal] = contribution
+            self._apply(contribution, 1)
+
+    def _apply(self, contribution, sign: int) -> None:
+        day, genres = contribution
+        self.rollup.add(day, "completed", sign)
+        for genre in genres:
+            self.rollup.add(day, ("genre", genre), sign)
+
+    @classmethod
+    def of(cls, books: Iterable) -> "CompletionRollups":
+        """Rollups for an arbitrary list of books"""
+        rollups = cls()
+        for ordinal, book in enumerate(books):
+            rollups.add(ordinal, book)
+        return rollups
@@ -0,0 +1,283 @@
+# services/search_index.py
+"""Search indexes over the book fields: an inverted word index for
+full-text queries and a trigram index for "substring anywhere" queries."""
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+from utils.text import fold
+
+# fields a free-text query looks at
+SEARCH_FIELDS = ("title", "author", "genre", "isbn", "publisher", "description", "review", "notes")
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text) -> List[str]:
+    """Folded word tokens of ``text`` (punctuation separates words)"""
+    return _WORD_RE.findall(fold(text))
+
+
+def narrows_text(old: str, new: str) -> bool:
+    """True when every match of full-text query ``new`` also matches ``old``
+    (each old word is a prefix of some new word)"""
+    new_terms = tokenize(new)
+    return all(any(t.startswith(o) for t in new_terms) for o in tokenize(old))
+
+
+def field_terms(book) -> Dict[str, Counter]:
+    """Token counts per searchable field"""
+    terms = {}
+    for name in SEARCH_FIELDS:
+        counts = Counter(tokenize(getattr(book, name, "")))
+        if counts:
+            terms[name] = counts
+    isbn = re.sub(r"[^0-9Xx]", "", str(getattr(book, "isbn", "") or ""))
+    if isbn:
+        # "978-0-261" is also findable as "9780261..."
+        terms.setdefault("isbn", Counter())[isbn.lower()] += 1
+    return terms
+
+
+def book_tokens(book) -> Set[str]:
+    """Every token a book is findable by"""
+    tokens = set()
+    for counts in field_terms(book).values():
+        tokens.update(counts)
+    return tokens
+
+
+class InvertedIndex:
+    """token -> set of slot ordinals, with a sorted vocabulary for prefix lookups.
+
+    Query terms match any indexed token they are a prefix of, so results
+    update as the user types ("tolk" finds "Tolkien").  Several terms are
+    ANDed.  Per-field token counts and field lengths are kept for ranking
+    (see services/ranking.py).
+    """
+
+    # once the candidate set is this small, check the remaining terms
+    # against each candidate's tokens instead of expanding their prefixes
+    VERIFY_LIMIT = 64
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._tokens_of: Dict[int, FrozenSet[str]] = {}
+        self._vocabulary: List[str] = []
+        self._fields_of: Dict[int, Dict[str, Counter]] = {}
+        # field -> total token count over all books (for average lengths)
+        self._field_lengths: Counter = Counter()
+
+    def __len__(self):
+        return len(self._tokens_of)
+
+    def add(self, ordinal: int, book) -> None:
+        for token in self._file(ordinal, book):
+            insort(self._vocabulary, token)
+
+    def add_many(self, items: Iterable) -> None:
+        """add() for many ``(ordinal, book)`` pairs, sorting the vocabulary once"""
+        grown = False
+        for ordinal, book in items:
+            grown = bool(self._file(ordinal, book)) or grown
+        if grown:
+            self._vocabulary = sorted(self._postings)
+
+    def _file(self, ordinal: int, book) -> List[str]:
+        """Post a book's tokens; returns the tokens new to the vocabulary"""
+        fields = field_terms(book)
+        self._fields_of[ordinal] = fields
+        for name, counts in fields.items():
+            self._field_lengths[name] += sum(counts.values())
+        tokens = frozenset(token for counts in fields.values() for token in counts)
+        self._tokens_of[ordinal] = tokens
+        new = []
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                new.append(token)
+            postings.add(ordinal)
+        return new
+
+    def discard(self, ordinal: int) -> None:
+        for name, counts in self._fields_of.pop(ordinal, {}).items():
+            self._field_lengths[name] -= sum(counts.values())
+        for token in self._tokens_of.pop(ordinal, ()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(ordinal)
+            if not postings:
+                del self._postings[token]
+                i = bisect_left(self._vocabulary, token)
+                if i < len(self._vocabulary) and self._vocabulary[i] == token:
+                    del self._vocabulary[i]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._tokens_of.clear()
+        self._vocabulary = []
+        self._fields_of.clear()
+        self._field_lengths.clear()
+
+    def tokens_of(self, ordinal: int) -> FrozenSet[str]:
+        return self._tokens_of.get(ordinal, frozenset())
+
+    def fields_of(self, ordinal: int) -> Dict[str, Counter]:
+        """Token counts per field for one book"""
+        return self._fields_of.get(ordinal, {})
+
+    def document_frequency(self, token: str) -> int:
+        return len(self._postings.get(token, ()))
+
+    def average_length(self, name: str) -> float:
+        """Mean token count of a field across indexed books"""
+        return self._field_lengths[name] / len(self._fields_of) if self._fields_of else 0.0
+
+    def expand(self, prefix: str) -> Iterable[str]:
+        """Vocabulary tokens starting with ``prefix``, in sorted order"""
+        vocabulary = self._vocabulary
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            yield vocabulary[i]
+            i += 1
+
+    def prefix_postings(self, prefix: str) -> Set[int]:
+        """Ordinals holding a token that starts with ``prefix``"""
+        exact = self._postings.get(prefix)
+        result: Optional[Set[int]] = None
+        for token in self.expand(prefix):
+            postings = self._postings[token]
+            if result is None:
+                result = postings if token == prefix else set(postings)
+                continue
+            if result is exact:
+                result = set(exact)
+            result |= postings
+        return result if result is not None else set()
+
+    def _verify(self, ordinals: Iterable[int], term: str) -> Set[int]:
+        tokens_of = self._tokens_of
+        return {o for o in ordinals if any(t.startswith(term) for t in tokens_of.get(o, ()))}
+
+    def filter(self, ordinals: Iterable[int], query: str) -> Set[int]:
+        """The members of ``ordinals`` matching ``query``, checked one by one"""
+        result = set(ordinals)
+        for term in set(tokenize(query)):
+            result = self._verify(result, term)
+        return result
+
+    def search(self, query: str, candidates: Optional[Set[int]] = None) -> Set[int]:
+        """Ordinals matching every term of ``query`` (within ``candidates`` if given)"""
+        terms = sorted(set(tokenize(query)), key=len, reverse=True)
+        result = None if candidates is None else set(candidates)
+        for term in terms:
+            if result is not None and len(result) <= self.VERIFY_LIMIT:
+                result = self._verify(result, term)
+            elif result is None:
+                result = set(self.prefix_postings(term))
+            else:
+                result &= self.prefix_postings(term)
+            if not result:
+                return set()
+        if result is None:
+            return set(self._tokens_of)
+        return result
+
+
+# fields the substring search has always matched (ISBN is compared as stored)
+SUBSTRING_FIELDS = ("title", "author", "genre")
+
+
+def substring_haystacks(book) -> tuple:
+    """The strings a substring query is matched against"""
+    values = tuple(str(getattr(book, name, "") or "").lower() for name in SUBSTRING_FIELDS)
+    return values + (str(getattr(book, "isbn", "") or ""),)
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """trigram -> set of ordinals, for substring queries of any position.
+
+    A query's trigrams give a candidate set (every trigram must occur in
+    the book) which is then verified with a plain ``in`` check, so results
+    are exactly those of scanning every book.  Queries shorter than three
+    characters have no trigrams and are verified against all candidates.
+    """
+
+    # stop intersecting once this few candidates remain; verifying is cheaper
+    VERIFY_LIMIT = 32
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._haystacks: Dict[int, tuple] = {}
+
+    def __len__(self):
+        return len(self._haystacks)
+
+    def add(self, ordinal: int, book) -> None:
+        haystacks = substring_haystacks(book)
+        self._haystacks[ordinal] = haystacks
+        grams = set()
+        for text in haystacks:
+            grams |= trigrams(text)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(ordinal)
+
+    def discard(self, ordinal: int) -> None:
+        haystacks = self._haystacks.pop(ordinal, None)
+        if haystacks is None:
+            return
+        grams = set()
+        for text in haystacks:
+            grams |= trigrams(text)
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(ordinal)
+                if not postings:
+                    del self._postings[gram]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._haystacks.clear()
+
+    def haystacks(self, ordinal: int) -> tuple:
+        """(title, author, genre, isbn) as matched, or () for an unknown ordinal"""
+        return self._haystacks.get(ordinal, ())
+
+    def matches(self, ordinal: int, needle: str) -> bool:
+        return any(needle in text for text in self._haystacks.get(ordinal, ()))
+
+    def filter(self, ordinals: Iterable[int], query: str) -> Set[int]:
+        """The members of ``ordinals`` containing ``query``, checked one by one"""
+        return {o for o in ordinals if self.matches(o, query)}
+
+    def search(self, query: str, candidates: Optional[Set[int]] = None) -> Set[int]:
+        """Ordinals whose title, author, genre or ISBN contains ``query``.
+
+        ``query`` should already be lowercased and stripped, as the
+        substring search has always done.
+        """
+        postings = []
+        for gram in trigrams(query):
+            found = self._postings.get(gram)
+            if not found:
+                return set()
+            postings.append(found)
+        postings.sort(key=len)
+        result = candidates
+        for found in postings:
+            if result is not None and len(result) <= self.VERIFY_LIMIT:
+                break
+            result = set(found) if result is None else result & found
+            if not result:
+                return set()
+        if result is None:
+            result = self._haystacks.keys()
+        return {o for o in result if self.matches(o, query)}
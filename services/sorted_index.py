@@ -0,0 +1,108 @@
+# services/sorted_index.py
+"""Ordered indexes over BookService slots and the opaque cursors used to
+page through them."""
+import base64
+import json
+import math
+from bisect import bisect_left, insort
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class SortedIndex:
+    """(sort key, ordinal) pairs kept in order as books change.
+
+    Ties are broken by ordinal, i.e. by insertion order, so every position
+    in the index is unique and a page can resume right after the last row
+    it showed.
+    """
+
+    def __init__(self, name: str, key_fn: Callable[[Any], Any]):
+        self.name = name
+        self.key_fn = key_fn
+        self._entries: List[Tuple[Any, int]] = []
+        self._key_of: Dict[int, Any] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, ordinal: int, book) -> None:
+        key = self.key_fn(book)
+        self._key_of[ordinal] = key
+        insort(self._entries, (key, ordinal))
+
+    def add_many(self, items) -> None:
+        """add() for many ``(ordinal, book)`` pairs: append them all, then sort once"""
+        entries = self._entries
+        for ordinal, book in items:
+            key = self.key_fn(book)
+            self._key_of[ordinal] = key
+            entries.append((key, ordinal))
+        entries.sort()
+
+    def discard(self, ordinal: int) -> None:
+        if ordinal not in self._key_of:
+            return
+        key = self._key_of.pop(ordinal)
+        i = bisect_left(self._entries, (key, ordinal))
+        if i < len(self._entries) and self._entries[i] == (key, ordinal):
+            del self._entries[i]
+
+    def clear(self) -> None:
+        self._entries = []
+        self._key_of.clear()
+
+    def key_of(self, ordinal: int):
+        return self._key_of[ordinal]
+
+    def bounds(self, low=None, high=None, low_open: bool = False, high_open: bool = False) -> Tuple[int, int]:
+        """Entry positions ``[i, j)`` whose keys lie between ``low`` and ``high``
+        (inclusive unless the matching ``*_open`` flag is set; None = unbounded)"""
+        entries = self._entries
+        i = 0 if low is None else bisect_left(entries, (low, math.inf if low_open else -1))
+        j = len(entries) if high is None else bisect_left(entries, (high, -1 if high_open else math.inf))
+        return i, max(i, j)
+
+    def ordinals_between(self, i: int, j: int) -> List[int]:
+        return [ordinal for _, ordinal in self._entries[i:j]]
+
+    def walk(self, after: Optional[Tuple[Any, int]] = None, descending: bool = False) -> Iterator[int]:
+        """Ordinals in key order, starting just past position ``after``.
+
+        ``after`` is a ``(key, ordinal_bound)`` pair: ascending walks start
+        at the first entry >= it, descending walks at the last entry < it.
+        """
+        entries = self._entries
+        if descending:
+            i = len(entries) - 1 if after is None else bisect_left(entries, after) - 1
+            while i >= 0:
+                yield entries[i][1]
+                i -= 1
+        else:
+            i = 0 if after is None else bisect_left(entries, after)
+            while i < len(entries):
+                yield entries[i][1]
+                i += 1
+
+
+def _tuples(value):
+    """JSON turns tuples into lists; turn them back so keys compare as before"""
+    if isinstance(value, list):
+        return tuple(_tuples(v) for v in value)
+    return value
+
+
+def encode_cursor(sort: str, descending: bool, key, seq: int) -> str:
+    """Opaque token naming the last row of a page"""
+    raw = json.dumps([sort, bool(descending), key, seq], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, int]:
+    """(key, seq) of a cursor made for the same sort, else ValueError"""
+    try:
+        cursor_sort, cursor_descending, key, seq = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("invalid page cursor")
+    if cursor_sort != sort or bool(cursor_descending) != bool(descending):
+        raise ValueError("page cursor belongs to a different sort order")
+    return _tuples(key), int(seq)
@@ -0,0 +1,159 @@
+# services/stats_aggregator.py
+"""Running library statistics, kept up to date on every book change."""
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+def finish_month(finish_date) -> Optional[Tuple[int, int]]:
+    """(year, month) of a ``YYYY-MM-DD`` finish date, None if unset or malformed"""
+    if not finish_date:
+        return None
+    try:
+        parsed = datetime.strptime(finish_date, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+    return parsed.year, parsed.month
+
+
+def completion_days(start_date, finish_date) -> Optional[int]:
+    """Days from start to finish (0 = same day), None if either is unset or malformed"""
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+        finish = datetime.strptime(finish_date, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+    days = (finish - start).days
+    return days if days >= 0 else None
+
+
+def _number(value) -> float:
+    try:
+        return value + 0 if value else 0
+    except TypeError:
+        return 0
+
+
+def _bump(counts: Dict, key, delta: int) -> None:
+    count = counts.get(key, 0) + delta
+    if count:
+        counts[key] = count
+    else:
+        del counts[key]
+
+
+class StatsAggregator:
+    """Counts, sums, a genre histogram and monthly completion buckets.
+
+    BookIndexes calls ``add``/``discard`` for every book change, like any
+    other index.  What each book contributed is remembered per ordinal, so
+    a change subtracts the old contribution and adds the new one; reading
+    a figure never looks at the books.  Finish dates are parsed once, when
+    a book changes, not on every refresh.
+
+    ``genres`` counts every comma-separated genre as written (stripped,
+    empty names included, as BookService.get_statistics always has);
+    ``named_genres()`` leaves the empty name out.  ``completed_genres``
+    counts the genres of completed books only.
+    """
+
+    def __init__(self):
+        self._contributions: Dict[int, tuple] = {}
+        self.clear()
+
+    def clear(self) -> None:
+        self._contributions.clear()
+        self.total = 0
+        self.statuses: Dict[str, int] = {}
+        self.progress_sum = 0
+        self.pages_sum = 0
+        self.genres: Dict[str, int] = {}
+        self.completed_genres: Dict[str, int] = {}
+        # (year, month) -> books finished that month
+        self.completions: Dict[Tuple[int, int], int] = {}
+        # days from start to finish -> books that took that long
+        self.durations: Dict[int, int] = {}
+        self._favorite = None
+
+    def add(self, ordinal: int, book) -> None:
+        genres = tuple(genre.strip() for genre in str(getattr(book, "genre", "") or "").split(","))
+        contribution = (
+            getattr(book, "status", ""),
+            _number(getattr(book, "progress", 0)),
+            _number(getattr(book, "total_pages", 0)),
+            genres,
+            finish_month(getattr(book, "finish_date", None)),
+            completion_days(getattr(book, "start_date", None), getattr(book, "finish_date", None)),
+        )
+        self._contributions[ordinal] = contribution
+        self._apply(contribution, 1)
+
+    def discard(self, ordinal: int) -> None:
+        contribution = self._contributions.pop(ordinal, None)
+        if contribution is not None:
+            self._apply(contribution, -1)
+
+    def export(self, key_of: Callable[[int], Any]) -> Dict[Any, list]:
+        """What each book contributed, JSON-ready and keyed by ``key_of(ordinal)``"""
+        return {key_of(ordinal): [status, progress, pages, list(genres), list(month) if month else None, duration]
+                for ordinal, (status, progress, pages, genres, month, duration) in self._contributions.items()}
+
+    def restore(self, contributions: Iterable[Tuple[int, list]]) -> None:
+        """Rebuild from ``(ordinal, exported contribution)`` pairs without reading any book"""
+        self.clear()
+        for ordinal, (status, progress, pages, genres, month, duration) in contributions:
+            contribution = (status, progress, pages, tuple(genres), tuple(month) if month else None, duration)
+            self._contributions[ordinal] = contribution
+            self._apply(contribution, 1)
+
+    def _apply(self, contribution: tuple, sign: int) -> None:
+        status, progress, pages, genres, month, duration = contribution
+        self.total += sign
+        _bump(self.statuses, status, sign)
+        self.progress_sum += sign * progress
+        self.pages_sum += sign * pages
+        for genre in genres:
+            _bump(self.genres, genre, sign)
+            if status == "Completed":
+                _bump(self.completed_genres, genre, sign)
+        if month is not None:
+            _bump(self.completions, month, sign)
+        if duration is not None:
+            _bump(self.durations, duration, sign)
+        self._favorite = None
+
+    def count(self, status: str) -> int:
+        return self.statuses.get(status, 0)
+
+    @property
+    def average_progress(self) -> float:
+        return self.progress_sum / self.total if self.total else 0
+
+    def favorite_genre(self, named: bool = False) -> str:
+        """Most common genre (first seen wins a tie), "None" when there is none.
+
+        ``named`` skips the empty genre name.
+        """
+        if self._favorite is None:
+            self._favorite = {}
+        if named not in self._favorite:
+            genres = self.named_genres() if named else self.genres
+            self._favorite[named] = max(genres.items(), key=lambda x: x[1])[0] if genres else "None"
+        return self._favorite[named]
+
+    @property
+    def distinct_completed_genres(self) -> int:
+        """Number of different (non-empty) genres among completed books"""
+        return len(self.completed_genres) - ("" in self.completed_genres)
+
+    def fastest_completion(self) -> Optional[int]:
+        """Fewest days any book took from start to finish (None if none did)"""
+        return min(self.durations) if self.durations else None
+
+    def named_genres(self) -> Dict[str, int]:
+        return {genre: count for genre, count in self.genres.items() if genre}
+
+    def completed_in(self, month: int, year: Optional[int] = None) -> int:
+        """Books finished in ``month`` (of ``year``, or of any year)"""
+        if year is not None:
+            return self.completions.get((year, month), 0)
+        return sum(count for (_, m), count in self.completions.items() if m == month)
@@ -1,8 +1,14 @@
 # services/stats_service.py
-from typing import List, Dict, Any
-import random
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from services.achievement_rules import AchievementEngine, inputs_of, library_inputs
+from services.analytics import BookColumns
+from services.rollups import CompletionRollups, TimeRollup
+from services.storage import _atomic_write_json
+import json
+import os
+
 try:
     from utils.sample_data import generate_sample_achievements
 except Exception:
@@ -12,12 +18,77 @@ except Exception:
         ]
 
 
+def _project_path(path: Optional[str]) -> Optional[str]:
+    """``path`` relative to the project root unless absolute"""
+    if path and not os.path.isabs(path):
+        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+        path = os.path.join(base_dir, path)
+    return path
+
+
 class StatsService:
-    def __init__(self):
+    # bump when the layout of the stats snapshot changes
+    SNAPSHOT_VERSION = 4
+
+    def __init__(self, achievements_file: Optional[str] = None, stats_file: Optional[str] = None):
         # achievements are simple objects or dicts depending on sample_data
         self.achievements = generate_sample_achievements()
+        # unlocks are kept in achievements_file (relative to the project root)
+        self.engine = AchievementEngine(state_file=_project_path(achievements_file))
+        # last dashboard figures and the running statistics behind them,
+        # saved in stats_file so the stats tab can show them before anything
+        # is computed (see dashboard_snapshot and attach)
+        self.stats_file = _project_path(stats_file)
+        self.snapshot: Optional[Dict[str, Any]] = self._load_snapshot()
+        # set by attach(): running totals kept by the BookService indexes
+        self.book_service = None
+
+    def attach(self, book_service) -> None:
+        """Read figures from ``book_service``'s running statistics instead of
+        rescanning the books whenever the whole library is asked about.
+
+        The running statistics and rollups are resumed from the snapshot;
+        only books changed since it was saved are counted again.
+        """
+        self.book_service = book_service
+        aggregates = self.snapshot.pop("aggregates", None) if self.snapshot is not None else None
+        if aggregates is None:
+            return
+        try:
+            book_service.resume_aggregates(aggregates)
+        except Exception as e:
+            print(f"Warning: could not resume statistics from the snapshot: {e}")
+
+    def _sessions(self):
+        """The attached BookService's reading-session log, if it keeps one"""
+        return getattr(self.book_service, 'sessions', None)
+
+    def reading_streak(self) -> int:
+        """Consecutive days with a reading session up to today (0 without a log)"""
+        sessions = self._sessions()
+        return sessions.current_streak() if sessions is not None else 0
+
+    def longest_streak(self) -> int:
+        sessions = self._sessions()
+        return sessions.longest_streak() if sessions is not None else 0
 
-    def calculate_statistics(self, books: List) -> Any:
+    def _aggregate(self, books: Optional[List]):
+        """The StatsAggregator describing ``books``, or None if they must be scanned.
+
+        ``books`` describes the whole library when it is None or the list
+        the attached BookService hands out (which it keeps up to date).
+        """
+        service = self.book_service
+        if service is None:
+            return None
+        try:
+            if books is None or books is service.get_all_books():
+                return service.indexes.stats
+        except Exception as e:
+            print(f"Warning: running statistics unavailable: {e}")
+        return None
+
+    def calculate_statistics(self, books: Optional[List] = None) -> Any:
         """Return a simple object with expected attributes to avoid tight coupling with model classes."""
         class SimpleStats:
             def __init__(self):
@@ -31,6 +102,19 @@ class StatsService:
                 self.favorite_genre = "None"
 
         stats = SimpleStats()
+        aggregate = self._aggregate(books)
+        if aggregate is not None:
+            if not aggregate.total:
+                return stats
+            stats.total_books = aggregate.total
+            stats.completed_books = aggregate.count('Completed')
+            stats.reading_books = aggregate.count('Reading')
+            stats.average_progress = round(aggregate.average_progress, 1)
+            stats.total_pages = aggregate.pages_sum
+            stats.favorite_genre = aggregate.favorite_genre(named=True)
+            stats.monthly_completed = aggregate.completed_in(datetime.now().month)
+            stats.reading_streak = self.reading_streak()
+            return stats
         if not books:
             return stats
 
@@ -64,43 +148,22 @@ class StatsService:
                 except Exception:
                     pass
         stats.monthly_completed = monthly
-        stats.reading_streak = random.randint(0, 30)
+        stats.reading_streak = self.reading_streak()
 
         return stats
 
-    def check_achievements(self, books: List) -> List:
-        total_books = len(books)
-        completed_books = len([b for b in books if getattr(b, 'status', '') == 'Completed'])
-        reading_books = len([b for b in books if getattr(b, 'status', '') == 'Reading'])
-
-        unique_genres = set()
-        for book in books:
-            for genre in str(getattr(book, 'genre', '')).split(','):
-                g = genre.strip()
-                if g:
-                    unique_genres.add(g)
-
-        # Update achievements if they are dict-like or object-like
-        for a in self.achievements:
-            try:
-                aid = a.id
-            except Exception:
-                aid = a.get('id') if isinstance(a, dict) else None
-
-            if aid == 'first-book':
-                if isinstance(a, dict):
-                    a['unlocked'] = total_books >= 1
-                else:
-                    setattr(a, 'unlocked', total_books >= 1)
-            if aid == 'five-books':
-                if isinstance(a, dict):
-                    a['unlocked'] = total_books >= 5
-                else:
-                    setattr(a, 'unlocked', total_books >= 5)
-
+    def check_achievements(self, books: Optional[List] = None) -> List:
+        """Evaluate the achievement rules (services/achievement_rules.py) and
+        mark the unlocked ones; only rules whose inputs changed are re-checked"""
+        if self._aggregate(books) is not None:
+            values = library_inputs(self.book_service)
+        else:
+            values = inputs_of(books or [], self.longest_streak())
+        self.engine.evaluate(values)
+        self.engine.apply(self.achievements)
         return self.achievements
 
-    def get_kpi_data(self, books: List) -> List[Dict[str, Any]]:
+    def get_kpi_data(self, books: Optional[List] = None) -> List[Dict[str, Any]]:
         stats = self.calculate_statistics(books)
         kpis = [
             {"title": "Total Books", "value": stats.total_books, "icon": "📚", "color": "#4B0082"},
@@ -110,18 +173,141 @@ class StatsService:
         ]
         return kpis
 
-    def get_genre_distribution(self, books: List) -> Dict[str, int]:
+    def get_genre_distribution(self, books: Optional[List] = None) -> Dict[str, int]:
+        aggregate = self._aggregate(books)
+        if aggregate is not None:
+            return aggregate.named_genres()
         genre_count = {}
-        for book in books:
+        for book in books or []:
             for genre in str(getattr(book, 'genre', '')).split(','):
                 g = genre.strip()
                 if g:
                     genre_count[g] = genre_count.get(g, 0) + 1
         return genre_count
 
-    def get_reading_timeline(self, books: List) -> Dict[str, int]:
-        timeline = {}
-        current_year = datetime.now().year
-        for year in range(current_year - 2, current_year + 1):
-            timeline[str(year)] = random.randint(1, 10)
-        return timeline
\ No newline at end of file
+    def get_reading_timeline(self, books: Optional[List] = None, level: str = "year", periods: int = 3,
+                             metric: str = "completed") -> Dict[str, int]:
+        """Totals for the last ``periods`` days/months/years, oldest first.
+
+        ``metric`` is "completed" (books by finish date) or "pages" /
+        "sessions" (from the reading-session log; zeros without one).
+        Whole-library figures come from rollups kept up to date on every
+        change, so a view costs one lookup per bucket shown.
+        """
+        if metric == "completed":
+            aggregate = self._aggregate(books)
+            if aggregate is not None:
+                rollup = self.book_service.indexes.rollups.rollup
+            else:
+                rollup = CompletionRollups.of(books or []).rollup
+        else:
+            sessions = self._sessions()
+            rollup = sessions.rollup if sessions is not None else TimeRollup()
+        return dict(rollup.series(level, metric, periods))
+
+    def analytics(self, books: Optional[List] = None) -> BookColumns:
+        """Columnar view of ``books`` (default: the whole library) for vectorized figures.
+
+        The whole library's columns are the ones the attached BookService's
+        indexes keep up to date on every change; other lists are read into
+        fresh columns.
+        """
+        if self._aggregate(books) is not None:
+            return self.book_service.indexes.columns
+        return BookColumns(books or [])
+
+    def get_rating_histogram(self, books: Optional[List] = None) -> Dict[int, int]:
+        """whole stars (0-5) -> books with that rating"""
+        return self.analytics(books).rating_histogram()
+
+    def get_year_counts(self, books: Optional[List] = None) -> Dict[int, int]:
+        """publication year -> books"""
+        return self.analytics(books).per_year()
+
+    def get_decade_counts(self, books: Optional[List] = None) -> Dict[str, int]:
+        """publication decade ("1990s") -> books, oldest first"""
+        decades: Dict[str, int] = {}
+        for year, count in self.get_year_counts(books).items():
+            decade = f"{year - year % 10}s"
+            decades[decade] = decades.get(decade, 0) + count
+        return decades
+
+    # --- persisted snapshot ----------------------------------------------
+
+    def dashboard(self) -> Dict[str, Any]:
+        """Everything the stats tab shows about the whole library"""
+        stats = self.calculate_statistics()
+        return {
+            "stats": {name: value for name, value in vars(stats).items() if not name.startswith('_')},
+            "genres": self.get_genre_distribution(),
+            # string keys, so the dashboard compares equal after a JSON round trip
+            "ratings": {str(stars): count for stars, count in self.get_rating_histogram().items()},
+            "decades": self.get_decade_counts(),
+            "timeline": {
+                "month": self.get_reading_timeline(level="month", periods=12),
+                "year": self.get_reading_timeline(level="year", periods=10),
+            },
+        }
+
+    def _store_stamp(self):
+        try:
+            return self.book_service.store_stamp() if self.book_service is not None else None
+        except Exception:
+            return None
+
+    def _load_snapshot(self) -> Optional[Dict[str, Any]]:
+        if not self.stats_file or not os.path.exists(self.stats_file):
+            return None
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") != self.SNAPSHOT_VERSION or not isinstance(snapshot.get("dashboard"), dict):
+                raise ValueError("unknown snapshot layout")
+            return snapshot
+        except Exception as e:
+            # a corrupt snapshot is just rebuilt from the books
+            print(f"Warning: ignoring stats snapshot: {e}")
+            return None
+
+    def dashboard_snapshot(self) -> Optional[Dict[str, Any]]:
+        """The saved dashboard, or None.  ``"current"`` tells whether the book
+        store is still as it was when the snapshot was saved; either way the
+        figures can be shown at once while refresh() brings them up to date."""
+        if self.snapshot is None:
+            return None
+        result = dict(self.snapshot["dashboard"])
+        result["current"] = self.snapshot.get("store") == self._store_stamp()
+        return result
+
+    def save_snapshot(self) -> bool:
+        """Save the current dashboard and running statistics with the store
+        stamp they reflect.
+
+        Nothing is written when the figures and the stamp are unchanged.
+        Returns True if the file was written.
+        """
+        if not self.stats_file or self.book_service is None:
+            return False
+        try:
+            # the stamp must describe the data the figures were computed from
+            self.book_service.flush()
+        except Exception:
+            pass
+        snapshot = {
+            "version": self.SNAPSHOT_VERSION,
+            "store": self._store_stamp(),
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "dashboard": self.dashboard(),
+        }
+        if self.snapshot is not None and all(self.snapshot.get(k) == snapshot[k] for k in ("store", "dashboard")):
+            return False
+        # only needed by the next session's attach(), so not kept in memory
+        _atomic_write_json(self.stats_file, dict(snapshot, aggregates=self.book_service.aggregate_state()), indent=None)
+        self.snapshot = snapshot
+        return True
+
+    def close(self) -> None:
+        try:
+            self.save_snapshot()
+        except Exception as e:
+            print(f"Warning: failed to save stats snapshot: {e}")
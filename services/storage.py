@@ -0,0 +1,701 @@
+# services/storage.py
+"""Persistence back-ends used by BookService.
+
+Every store exposes the same small surface:
+
+    load()                -> list of Book, or None when nothing usable is stored
+    write(books, changes) -> persist; ``changes`` is a ChangeSet (or None for a full write)
+    needs_books(changes)  -> whether write() reads ``books`` or only ``changes``
+    stamp()               -> JSON-able token that changes whenever the stored data does
+    close()
+
+``JsonBookStore`` keeps the original whole-file format.  ``JournaledBookStore``
+appends compact change records to a log next to the snapshot and folds the
+log into a fresh snapshot in the background once it grows.
+``SqliteLibraryStore`` keeps books and categories in indexed tables and
+applies each change as a single-row statement.
+
+Category stores follow the same shape with Category objects.
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import json
+import os
+import sqlite3
+import threading
+
+from models import Book, Category
+
+
+def _atomic_write_json(path: str, data: Any, indent: Optional[int] = 2) -> None:
+    """Write JSON to a temp file and rename it over ``path``."""
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_book_list(path: str) -> List[Dict[str, Any]]:
+    """Read a JSON list of book dicts, ignoring anything that isn't a dict."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        return []
+    return [item for item in data if isinstance(item, dict)]
+
+
+def files_stamp(*paths: str) -> List[Optional[List[int]]]:
+    """[size, mtime_ns] per file (None if missing), used as a store's stamp()"""
+    stamp = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamp.append(None)
+        else:
+            stamp.append([st.st_size, st.st_mtime_ns])
+    return stamp
+
+
+def _books_from_dicts(items) -> List[Book]:
+    books = []
+    for item in items:
+        try:
+            books.append(Book(**item))
+        except Exception:
+            # fallback: if keys mismatch, skip item
+            continue
+    return books
+
+
+class ChangeSet:
+    """Ordered set of pending book mutations, coalesced per book id.
+
+    Records are plain dicts so they can be written to a journal as-is:
+    ``{"op": "put", "book": {...}}``, ``{"op": "patch", "id": ..., "fields": {...}}``
+    and ``{"op": "del", "id": ...}``.  Category changes use the same records
+    keyed by category name (``key="name"``).
+    """
+
+    def __init__(self, key: str = "id"):
+        self.key = key
+        self._records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def put(self, book_data: Dict[str, Any]) -> None:
+        book_id = book_data[self.key]
+        self._records.pop(book_id, None)
+        self._records[book_id] = {"op": "put", "book": dict(book_data)}
+
+    def patch(self, book_id: str, fields: Dict[str, Any]) -> None:
+        if not fields:
+            return
+        new_id = fields.get(self.key, book_id)
+        if new_id != book_id:
+            self._rename(book_id, new_id, fields)
+            return
+        existing = self._records.get(book_id)
+        if existing is None:
+            self._records[book_id] = {"op": "patch", "id": book_id, "fields": dict(fields)}
+        elif existing["op"] == "put":
+            existing["book"].update(fields)
+        elif existing["op"] == "patch":
+            existing["fields"].update(fields)
+        # a patch after a delete has nothing left to apply to
+
+    def _rename(self, old_id: str, new_id: str, fields: Dict[str, Any]) -> None:
+        """A patch changing the key itself (a category rename).
+
+        The old key is free again afterwards, so the record moves out of its
+        way: a later put() reusing the old key must not replace it.
+        """
+        existing = self._records.pop(old_id, None)
+        if existing is not None and existing["op"] == "put":
+            existing["book"].update(fields)
+            self.put(existing["book"])
+            return
+        record = {"op": "patch", "id": old_id, "fields": dict(fields)}
+        if existing is not None and existing["op"] == "patch":
+            existing["fields"].update(fields)
+            record = existing
+        # keyed by identity: nothing later coalesces into a rename
+        self._records[object()] = record
+
+    def delete(self, book_id: str) -> None:
+        self._records.pop(book_id, None)
+        self._records[book_id] = {"op": "del", "id": book_id}
+
+    def merge(self, other: "ChangeSet") -> None:
+        for record in other.records():
+            self.apply_record(record)
+
+    def apply_record(self, record: Dict[str, Any]) -> None:
+        op = record.get("op")
+        if op == "put":
+            self.put(record["book"])
+        elif op == "patch":
+            self.patch(record["id"], record["fields"])
+        elif op == "del":
+            self.delete(record["id"])
+
+    def records(self) -> List[Dict[str, Any]]:
+        return list(self._records.values())
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __bool__(self) -> bool:
+        return bool(self._records)
+
+
+def replay_records(books: "OrderedDict[str, Dict[str, Any]]", records) -> None:
+    """Apply journal records to an id -> book dict mapping in place.
+
+    Replay is idempotent, so re-applying records that were already folded
+    into a snapshot leaves the result unchanged.
+    """
+    for record in records:
+        op = record.get("op")
+        if op == "put":
+            data = record.get("book") or {}
+            if "id" in data:
+                books[data["id"]] = dict(data)
+        elif op == "patch":
+            current = books.get(record.get("id"))
+            if current is not None:
+                current.update(record.get("fields") or {})
+        elif op == "del":
+            books.pop(record.get("id"), None)
+
+
+class JsonBookStore:
+    """Whole-file JSON storage: every write serializes the full library."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def stamp(self):
+        return files_stamp(self.path)
+
+    def load(self) -> Optional[List[Book]]:
+        if not os.path.exists(self.path):
+            return None
+        return _books_from_dicts(_read_book_list(self.path)) or None
+
+    def needs_books(self, changes: Optional[ChangeSet]) -> bool:
+        return True
+
+    def write(self, books: List[Book], changes: Optional[ChangeSet] = None) -> None:
+        _atomic_write_json(self.path, [book.to_dict() for book in books])
+
+    def close(self) -> None:
+        pass
+
+
+class JournaledBookStore:
+    """Snapshot plus append-only journal.
+
+    Mutations append one compact JSON line per changed book to
+    ``<path>.journal``; the per-edit cost is proportional to the change, not
+    the library.  Once ``compact_threshold`` records have accumulated, a
+    background thread folds the journal into a new snapshot.  The snapshot
+    uses the same format as ``JsonBookStore`` so existing files load as-is.
+    """
+
+    def __init__(self, path: str, compact_threshold: int = 500):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        # journal segment being folded by a running (or interrupted) compaction
+        self.compacting_path = f"{path}.journal.old"
+        self.compact_threshold = compact_threshold
+        self.journal_records = 0
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+
+    def stamp(self):
+        return files_stamp(self.path, self.journal_path, self.compacting_path)
+
+    def load(self) -> Optional[List[Book]]:
+        books: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        if os.path.exists(self.path):
+            for item in _read_book_list(self.path):
+                if "id" in item:
+                    books[item["id"]] = item
+        replay_records(books, self._read_journal(self.compacting_path))
+        records = self._read_journal(self.journal_path)
+        replay_records(books, records)
+        self.journal_records = len(records)
+        return _books_from_dicts(books.values()) or None
+
+    def needs_books(self, changes: Optional[ChangeSet]) -> bool:
+        return changes is None or not os.path.exists(self.path)
+
+    def write(self, books: List[Book], changes: Optional[ChangeSet] = None) -> None:
+        if self.needs_books(changes):
+            # full write: the snapshot already contains every pending change
+            self._write_full(books)
+            return
+        if not changes:
+            return
+        lines = "".join(
+            json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n"
+            for record in changes.records()
+        )
+        with self._lock:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            self.journal_records += len(changes)
+            should_compact = self.journal_records >= self.compact_threshold
+        if should_compact:
+            self.compact_in_background()
+
+    def compact(self) -> None:
+        """Fold the journal into a new snapshot (synchronously)."""
+        with self._lock:
+            if not os.path.exists(self.compacting_path):
+                if not os.path.exists(self.journal_path):
+                    return
+                # new appends go to a fresh journal while we fold this one
+                os.replace(self.journal_path, self.compacting_path)
+                self.journal_records = 0
+
+        books: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        if os.path.exists(self.path):
+            for item in _read_book_list(self.path):
+                if "id" in item:
+                    books[item["id"]] = item
+        replay_records(books, self._read_journal(self.compacting_path))
+        _atomic_write_json(self.path, list(books.values()))
+        os.remove(self.compacting_path)
+
+    def compact_in_background(self) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_quietly, name="book-journal-compactor", daemon=True)
+        self._compactor.start()
+
+    def close(self) -> None:
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+
+    def _compact_quietly(self) -> None:
+        try:
+            self.compact()
+        except Exception as e:
+            print(f"Warning: journal compaction failed: {e}")
+
+    def _write_full(self, books: List[Book]) -> None:
+        self.close()
+        with self._lock:
+            _atomic_write_json(self.path, [book.to_dict() for book in books])
+            for path in (self.journal_path, self.compacting_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.journal_records = 0
+
+    @staticmethod
+    def _read_journal(path: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return []
+        records = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # torn trailing write from a crash; everything before it is intact
+                    break
+                if isinstance(record, dict):
+                    records.append(record)
+        return records
+
+
+class JsonCategoryStore:
+    """Whole-file JSON storage for categories (the list is small)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> Optional[List[Category]]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        categories = []
+        if isinstance(data, list):
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    categories.append(Category.from_dict(item))
+                except Exception:
+                    continue
+        return categories or None
+
+    def write(self, categories: List[Category], changes: Optional[ChangeSet] = None) -> None:
+        data = [c.to_dict() if hasattr(c, 'to_dict') else {'name': c.name, 'color': c.color, 'book_count': getattr(c, 'book_count', 0)} for c in categories]
+        _atomic_write_json(self.path, data)
+
+    def close(self) -> None:
+        pass
+
+
+# Book fields stored as plain columns; categories live in the join table.
+BOOK_COLUMNS = [name for name in Book.__dataclass_fields__ if name != "categories"]
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL DEFAULT '',
+    author TEXT NOT NULL DEFAULT '',
+    publisher TEXT NOT NULL DEFAULT '',
+    genre TEXT NOT NULL DEFAULT '',
+    isbn TEXT NOT NULL DEFAULT '',
+    year INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'Not Started',
+    progress INTEGER NOT NULL DEFAULT 0,
+    current_page INTEGER NOT NULL DEFAULT 0,
+    total_pages INTEGER NOT NULL DEFAULT 0,
+    rating REAL NOT NULL DEFAULT 0,
+    review TEXT NOT NULL DEFAULT '',
+    cover_image TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    start_date TEXT NOT NULL DEFAULT '',
+    finish_date TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS categories (
+    position INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    color TEXT NOT NULL DEFAULT '#cccccc',
+    book_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS book_categories (
+    book_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (book_id, category)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_books_status ON books(status);
+CREATE INDEX IF NOT EXISTS idx_books_author ON books(author COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books(title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_books_year ON books(year);
+CREATE INDEX IF NOT EXISTS idx_books_rating ON books(rating);
+CREATE INDEX IF NOT EXISTS idx_book_categories_category ON book_categories(category);
+"""
+
+
+class SqliteLibraryStore:
+    """SQLite database holding books, categories and the book<->category join table.
+
+    Use ``book_store()`` / ``category_store()`` to get the per-service views;
+    both share one connection, so passing the same SqliteLibraryStore to
+    BookService and CategoryService keeps them in one database.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        # writes may come from a background persister thread; access is serialized by _lock
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        self._tx_depth = 0
+        with self._lock:
+            self.conn.executescript(_SQLITE_SCHEMA)
+
+    def book_store(self) -> "SqliteBookStore":
+        return SqliteBookStore(self)
+
+    def category_store(self) -> "SqliteCategoryStore":
+        return SqliteCategoryStore(self)
+
+    @contextmanager
+    def transaction(self):
+        """Open a (possibly nested) transaction; only the outermost level commits."""
+        with self._lock:
+            outermost = self._tx_depth == 0
+            if outermost:
+                self.conn.execute("BEGIN")
+            self._tx_depth += 1
+            try:
+                yield self.conn
+            except BaseException:
+                self._tx_depth -= 1
+                if outermost:
+                    self.conn.execute("ROLLBACK")
+                raise
+            self._tx_depth -= 1
+            if outermost:
+                self.conn.execute("COMMIT")
+
+    def write_transaction(self, statements) -> None:
+        """Run ``statements(cursor)`` inside one transaction."""
+        with self.transaction() as conn:
+            statements(conn.cursor())
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def import_json(self, books_file: str, categories_file: str = None) -> bool:
+        """One-time migration of the legacy JSON files into this database.
+
+        Returns True if data was imported, False if a previous import already ran.
+        """
+        if self.get_meta("json_imported"):
+            return False
+        books = _books_from_dicts(_read_book_list(books_file)) if books_file and os.path.exists(books_file) else []
+        categories = []
+        if categories_file and os.path.exists(categories_file):
+            categories = JsonCategoryStore(categories_file).load() or []
+
+        def statements(cur):
+            for book in books:
+                SqliteBookStore.upsert(cur, book.to_dict())
+            for category in categories:
+                SqliteCategoryStore.upsert(cur, category.to_dict())
+            cur.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', '1')")
+
+        self.write_transaction(statements)
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+class SqliteBookStore:
+    """Book view of a SqliteLibraryStore; each change is a single-row statement."""
+
+    def __init__(self, library: SqliteLibraryStore):
+        self.library = library
+
+    def stamp(self):
+        return files_stamp(self.library.path, f"{self.library.path}-wal")
+
+    def load(self) -> Optional[List[Book]]:
+        with self.library._lock:
+            rows = self.library.conn.execute("SELECT * FROM books ORDER BY seq").fetchall()
+            links = self.library.conn.execute(
+                "SELECT book_id, category FROM book_categories ORDER BY book_id, position"
+            ).fetchall()
+        categories: Dict[str, List[str]] = {}
+        for link in links:
+            categories.setdefault(link["book_id"], []).append(link["category"])
+        return [self._row_to_book(row, categories.get(row["id"], [])) for row in rows] or None
+
+    def needs_books(self, changes: Optional[ChangeSet]) -> bool:
+        return changes is None
+
+    def write(self, books: List[Book], changes: Optional[ChangeSet] = None) -> None:
+        if changes is None:
+            def statements(cur):
+                cur.execute("DELETE FROM books")
+                cur.execute("DELETE FROM book_categories")
+                for book in books:
+                    self.upsert(cur, book.to_dict())
+        else:
+            if not changes:
+                return
+
+            def statements(cur):
+                for record in changes.records():
+                    op = record["op"]
+                    if op == "put":
+                        self.upsert(cur, record["book"])
+                    elif op == "patch":
+                        self.update(cur, record["id"], record["fields"])
+                    elif op == "del":
+                        cur.execute("DELETE FROM books WHERE id = ?", (record["id"],))
+                        cur.execute("DELETE FROM book_categories WHERE book_id = ?", (record["id"],))
+        self.library.write_transaction(statements)
+
+    def get_book(self, book_id: str) -> Optional[Book]:
+        """Indexed point read straight from the database."""
+        books = self._select_books("WHERE b.id = ?", [book_id])
+        return books[0] if books else None
+
+    def query_books(self, status: str = None, category: str = None, author: str = None,
+                    year: int = None, min_rating: float = None) -> List[Book]:
+        """Filtered read using the status/author/year/rating/category indexes."""
+        clauses, params = [], []
+        if status:
+            clauses.append("b.status = ?")
+            params.append(status)
+        if author:
+            clauses.append("b.author = ? COLLATE NOCASE")
+            params.append(author)
+        if year is not None:
+            clauses.append("b.year = ?")
+            params.append(year)
+        if min_rating:
+            clauses.append("b.rating >= ?")
+            params.append(min_rating)
+        if category:
+            clauses.append("b.id IN (SELECT book_id FROM book_categories WHERE category = ?)")
+            params.append(category)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._select_books(where, params)
+
+    def _select_books(self, where: str, params: List[Any]) -> List[Book]:
+        """Books matching ``where`` (over ``books b``) with their categories, in one query.
+
+        The category join repeats a book's row once per category; rows
+        arrive grouped by book, so they are folded back together in order.
+        """
+        with self.library._lock:
+            rows = self.library.conn.execute(
+                f"SELECT b.*, c.category AS linked_category FROM books b "
+                f"LEFT JOIN book_categories c ON c.book_id = b.id {where} ORDER BY b.seq, b.id, c.position",
+                params,
+            ).fetchall()
+        books: List[Book] = []
+        last_id = None
+        for row in rows:
+            if row["id"] != last_id:
+                last_id = row["id"]
+                books.append(self._row_to_book(row, []))
+            if row["linked_category"] is not None:
+                books[-1].categories.append(row["linked_category"])
+        return books
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def upsert(cur, data: Dict[str, Any]) -> None:
+        values = [data.get(col, Book.__dataclass_fields__[col].default) for col in BOOK_COLUMNS]
+        assignments = ", ".join(f"{col} = excluded.{col}" for col in BOOK_COLUMNS if col != "id")
+        cur.execute(
+            f"INSERT INTO books ({', '.join(BOOK_COLUMNS)}) VALUES ({', '.join('?' * len(BOOK_COLUMNS))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {assignments}",
+            values
+        )
+        SqliteBookStore._set_categories(cur, data["id"], data.get("categories") or [])
+
+    @staticmethod
+    def update(cur, book_id: str, fields: Dict[str, Any]) -> None:
+        columns = [col for col in fields if col in BOOK_COLUMNS and col != "id"]
+        if columns:
+            cur.execute(
+                f"UPDATE books SET {', '.join(f'{col} = ?' for col in columns)} WHERE id = ?",
+                [fields[col] for col in columns] + [book_id]
+            )
+        if "categories" in fields:
+            SqliteBookStore._set_categories(cur, book_id, fields["categories"] or [])
+
+    @staticmethod
+    def _set_categories(cur, book_id: str, categories: List[str]) -> None:
+        cur.execute("DELETE FROM book_categories WHERE book_id = ?", (book_id,))
+        cur.executemany(
+            "INSERT OR IGNORE INTO book_categories (book_id, category, position) VALUES (?, ?, ?)",
+            [(book_id, name, pos) for pos, name in enumerate(categories)]
+        )
+
+    @staticmethod
+    def _row_to_book(row, categories: List[str]) -> Book:
+        data = {col: row[col] for col in BOOK_COLUMNS}
+        data["categories"] = list(categories)
+        return Book(**data)
+
+
+class SqliteCategoryStore:
+    """Category view of a SqliteLibraryStore."""
+
+    def __init__(self, library: SqliteLibraryStore):
+        self.library = library
+
+    def load(self) -> Optional[List[Category]]:
+        with self.library._lock:
+            rows = self.library.conn.execute(
+                "SELECT name, color, book_count FROM categories ORDER BY position"
+            ).fetchall()
+        return [Category(name=row["name"], color=row["color"], book_count=row["book_count"]) for row in rows] or None
+
+    def write(self, categories: List[Category], changes: Optional[ChangeSet] = None) -> None:
+        if changes is None:
+            def statements(cur):
+                cur.execute("DELETE FROM categories")
+                for category in categories:
+                    self.upsert(cur, category.to_dict())
+        else:
+            if not changes:
+                return
+
+            def statements(cur):
+                for record in changes.records():
+                    op = record["op"]
+                    if op == "put":
+                        self.upsert(cur, record["book"])
+                    elif op == "patch":
+                        fields = {k: v for k, v in record["fields"].items() if k in ("name", "color", "book_count")}
+                        if fields:
+                            cur.execute(
+                                f"UPDATE categories SET {', '.join(f'{k} = ?' for k in fields)} WHERE name = ?",
+                                list(fields.values()) + [record["id"]]
+                            )
+                    elif op == "del":
+                        cur.execute("DELETE FROM categories WHERE name = ?", (record["id"],))
+        self.library.write_transaction(statements)
+
+    def close(self) -> None:
+        pass
+
+    @staticmethod
+    def upsert(cur, data: Dict[str, Any]) -> None:
+        cur.execute(
+            "INSERT INTO categories (name, color, book_count) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET color = excluded.color, book_count = excluded.book_count",
+            (data["name"], data.get("color", "#cccccc"), data.get("book_count", 0))
+        )
+
+
+def create_book_store(kind, path: str):
+    """Build a book store by name ("json", "journal" or "sqlite").
+
+    A ready-made store object (anything with load/write) is returned as-is,
+    and a SqliteLibraryStore is turned into its book view.
+    """
+    if isinstance(kind, SqliteLibraryStore):
+        return kind.book_store()
+    if hasattr(kind, "load") and hasattr(kind, "write"):
+        return kind
+    if kind == "journal":
+        return JournaledBookStore(path)
+    if kind == "json":
+        return JsonBookStore(path)
+    if kind == "sqlite":
+        return SqliteLibraryStore(path).book_store()
+    raise ValueError(f"Unknown book storage backend: {kind}")
+
+
+def create_category_store(kind, path: str):
+    """Build a category store by name ("json" or "sqlite") or pass one through."""
+    if isinstance(kind, SqliteLibraryStore):
+        return kind.category_store()
+    if hasattr(kind, "load") and hasattr(kind, "write"):
+        return kind
+    if kind == "json":
+        return JsonCategoryStore(path)
+    if kind == "sqlite":
+        return SqliteLibraryStore(path).category_store()
+    raise ValueError(f"Unknown category storage backend: {kind}")
@@ -0,0 +1,90 @@
+# services/transaction.py
+"""Batching of service mutations into a single persisted write.
+
+Services taking part implement ``begin()``, ``commit(release=True)``,
+``release()`` and ``rollback()`` (BookService and CategoryService do).
+While a batch is open their mutations update memory and queue changes; on
+exit everything is written once, or on error rolled back in memory and
+nothing is written.
+
+The protocol, for services and their callers:
+
+* ``commit(release=False)`` may only write storage.  It must leave the
+  undo state in place, because a later service can still fail and roll
+  this one back.
+* ``release()`` runs only once every service has committed.  Everything
+  visible outside the service (published events, reading-session log
+  entries, compaction) happens here.
+* ``rollback()`` restores memory and drops whatever was queued for
+  ``release()``, so a failed batch has no side effects.
+* ``flush()`` and ``write_lock`` are optional.  A service with a
+  write-behind queue is flushed before the batch opens, so changes made
+  before it are committed in their own transaction, and its
+  ``write_lock`` is held around ``commit()``.  Both are taken before any
+  store transaction, in the same order a background writer takes them.
+"""
+from contextlib import ExitStack, contextmanager
+
+
+def _transaction_owners(services):
+    """Shared stores (e.g. one SqliteLibraryStore) that can wrap several writes in one transaction."""
+    owners = []
+    for service in services:
+        owner = getattr(getattr(service, "store", None), "library", None)
+        if owner is not None and hasattr(owner, "transaction") and not any(owner is o for o in owners):
+            owners.append(owner)
+    return owners
+
+
+@contextmanager
+def batch(*services):
+    """Group mutations on all ``services`` into one all-or-nothing commit.
+
+    Example::
+
+        with batch(book_service, category_service):
+            category_service.delete_category("Old")
+            for book in book_service.get_books_by_category("Old"):
+                book_service.update_book(book.id, {"categories": ["General"]})
+
+    Services sharing a SQLite store commit in one database transaction.
+    File-based stores are written one after another; if a later write
+    fails, the earlier services are rolled back and rewritten so the files
+    match memory again.  No service is released, so no events or other
+    side effects escape a failed batch.
+    """
+    for service in services:
+        flush = getattr(service, "flush", None)
+        if flush is not None:
+            flush()
+    for service in services:
+        service.begin()
+    try:
+        yield
+    except BaseException:
+        for service in services:
+            service.rollback()
+        raise
+
+    written = []
+    try:
+        with ExitStack() as stack:
+            for service in services:
+                lock = getattr(service, "write_lock", None)
+                if lock is not None:
+                    stack.enter_context(lock)
+            for owner in _transaction_owners(services):
+                stack.enter_context(owner.transaction())
+            for service in services:
+                # keep the undo log until every service has been written
+                service.commit(release=False)
+                written.append(service)
+    except BaseException:
+        for service in services:
+            service.rollback()
+        for service in written:
+            if not hasattr(getattr(service, "store", None), "library"):
+                service.save_data()
+        raise
+    for service in services:
+        service.release()
@@ -4,7 +4,32 @@ from tkinter import ttk
 from config import COLORS
 from components.widgets.kpi_card import KPICard
 from components.widgets.achievement_card import AchievementCard
-import random
+from datetime import datetime
+from services.events import BookAdded, BookDeleted, BookUpdated, LibraryReloaded
+
+# book fields the KPIs, charts and achievements are computed from
+STATS_FIELDS = ("status", "progress", "total_pages", "current_page", "genre", "start_date", "finish_date",
+                "rating", "year")
+
+
+class StatsView:
+    """KPI figures with the attributes the UI uses, from a dict or an object"""
+
+    def __init__(self, d=None):
+        d = d or {}
+        # support dict-like or object-like inputs
+        def get(k, default=0):
+            if isinstance(d, dict):
+                return d.get(k, default)
+            return getattr(d, k, default)
+        self.total_books = get('total_books', 0)
+        self.completed_books = get('completed_books', 0)
+        self.reading_books = get('reading_books', 0)
+        self.average_progress = get('average_progress', 0)
+        self.monthly_completed = get('monthly_completed', 0)
+        self.reading_streak = get('reading_streak', 0)
+        self.total_pages = get('total_pages', 0)
+        self.favorite_genre = get('favorite_genre', 'None')
 
 
 class StatsTab:
@@ -18,7 +43,86 @@ class StatsTab:
         self.kpi_cards = []
         self.achievements = []
 
+        # chart canvases, redrawn on refresh; the timeline shows months or years
+        self.genre_canvas = None
+        self.timeline_canvas = None
+        self.rating_canvas = None
+        self.decade_canvas = None
+        self.timeline_level = "month"
+        self._refresh_job = None
+        self._unsubscribers = []
+
         self.create_widgets()
+        self.subscribe_events()
+
+        # show the figures saved last session right away, then bring them
+        # up to date once the tab is on screen
+        self.show_snapshot()
+        try:
+            self.frame.after_idle(self.refresh)
+        except Exception:
+            pass
+
+    def subscribe_events(self):
+        """Refresh once per batch of changes, skipping edits no figure depends on"""
+        events = getattr(self.app, 'events', None)
+        if events is None:
+            return
+        self._unsubscribers = [
+            events.subscribe(BookUpdated, self.on_book_updated),
+            events.subscribe(BookAdded, self.schedule_refresh),
+            events.subscribe(BookDeleted, self.schedule_refresh),
+            events.subscribe(LibraryReloaded, self.schedule_refresh),
+        ]
+        self.frame.bind("<Destroy>", self._on_destroy)
+
+    def _on_destroy(self, event=None):
+        if event is not None and event.widget is not self.frame:
+            return
+        for unsubscribe in self._unsubscribers:
+            unsubscribe()
+        self._unsubscribers = []
+
+    def on_book_updated(self, event):
+        if event.touches(*STATS_FIELDS):
+            self.schedule_refresh()
+
+    def schedule_refresh(self, event=None):
+        """Refresh once the current batch of changes is over"""
+        if self._refresh_job is not None:
+            return
+        try:
+            self._refresh_job = self.frame.after_idle(self._run_refresh)
+        except Exception:
+            self._run_refresh()
+
+    def _run_refresh(self):
+        self._refresh_job = None
+        self.refresh()
+
+    def show_snapshot(self):
+        """Fill KPIs and charts from the stats service's saved snapshot"""
+        service = self._stats_service()
+        snapshot = None
+        try:
+            if service is not None and hasattr(service, 'dashboard_snapshot'):
+                snapshot = service.dashboard_snapshot()
+        except Exception as e:
+            print(f"Warning: stats snapshot unavailable: {e}")
+        if not snapshot:
+            return False
+        self.stats_data = StatsView(snapshot.get('stats'))
+        self.update_kpi_cards()
+        timeline = (snapshot.get('timeline') or {}).get(self.timeline_level)
+        if self.genre_canvas is not None:
+            self.draw_genre_chart(self.genre_canvas, snapshot.get('genres'))
+        if self.timeline_canvas is not None:
+            self.draw_progress_chart(self.timeline_canvas, timeline)
+        if self.rating_canvas is not None:
+            self.draw_rating_chart(self.rating_canvas, snapshot.get('ratings'))
+        if self.decade_canvas is not None:
+            self.draw_decade_chart(self.decade_canvas, snapshot.get('decades'))
+        return True
 
     def create_widgets(self):
         """Create all widgets for stats tab"""
@@ -144,6 +248,49 @@ class StatsTab:
         # Reading progress chart
         self.create_progress_chart(right_chart_frame)
 
+        # Second row: ratings and publication decades
+        library_container = tk.Frame(self.scrollable_frame, bg=COLORS["background"])
+        library_container.pack(fill=tk.X, padx=20, pady=(0, 30))
+
+        left_chart_frame = tk.Frame(library_container, bg=COLORS["background"])
+        left_chart_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
+
+        right_chart_frame = tk.Frame(library_container, bg=COLORS["background"])
+        right_chart_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(10, 0))
+
+        self.rating_canvas = self.create_chart_frame(left_chart_frame, "Ratings")
+        self.draw_rating_chart(self.rating_canvas)
+
+        self.decade_canvas = self.create_chart_frame(right_chart_frame, "Books by Decade")
+        self.draw_decade_chart(self.decade_canvas)
+
+    def create_chart_frame(self, parent, title):
+        """A titled white chart frame; returns its canvas"""
+        chart_frame = tk.Frame(
+            parent,
+            bg="white",
+            relief="solid",
+            borderwidth=1
+        )
+        chart_frame.pack(fill=tk.BOTH, expand=True)
+
+        tk.Label(
+            chart_frame,
+            text=title,
+            font=("Segoe UI", 14, "bold"),
+            bg="white",
+            fg=COLORS["text"]
+        ).pack(pady=(15, 10))
+
+        chart_canvas = tk.Canvas(
+            chart_frame,
+            bg="white",
+            height=250,
+            highlightthickness=0
+        )
+        chart_canvas.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        return chart_canvas
+
     def create_genre_chart(self, parent):
         """Create genre distribution chart"""
         chart_frame = tk.Frame(
@@ -171,8 +318,8 @@ class StatsTab:
             highlightthickness=0
         )
         chart_canvas.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        self.genre_canvas = chart_canvas
 
-        # Draw chart (simulated)
         self.draw_genre_chart(chart_canvas)
 
     def create_progress_chart(self, parent):
@@ -188,11 +335,26 @@ class StatsTab:
         # Chart title
         tk.Label(
             chart_frame,
-            text="Reading Progress",
+            text="Books Finished",
             font=("Segoe UI", 14, "bold"),
             bg="white",
             fg=COLORS["text"]
-        ).pack(pady=(15, 10))
+        ).pack(pady=(15, 5))
+
+        # Months / years toggle
+        toggle_frame = tk.Frame(chart_frame, bg="white")
+        toggle_frame.pack()
+        self.timeline_level_var = tk.StringVar(value=self.timeline_level)
+        for text, level in (("Last 12 months", "month"), ("Last 10 years", "year")):
+            tk.Radiobutton(
+                toggle_frame,
+                text=text,
+                variable=self.timeline_level_var,
+                value=level,
+                bg="white",
+                font=("Segoe UI", 9),
+                command=self.change_timeline_level
+            ).pack(side=tk.LEFT, padx=5)
 
         # Create canvas for chart
         chart_canvas = tk.Canvas(
@@ -202,17 +364,62 @@ class StatsTab:
             highlightthickness=0
         )
         chart_canvas.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+        self.timeline_canvas = chart_canvas
 
-        # Draw chart (simulated)
         self.draw_progress_chart(chart_canvas)
 
-    def draw_genre_chart(self, canvas):
-        """Draw genre distribution chart (simulated)"""
-        # Sample genre data
-        genres = ["Fiction", "Non-Fiction", "Fantasy", "Sci-Fi", "Mystery", "Biography"]
-        values = [random.randint(5, 20) for _ in range(len(genres))]
+    def change_timeline_level(self):
+        """Switch the timeline between months and years"""
+        self.timeline_level = self.timeline_level_var.get()
+        if self.timeline_canvas is not None:
+            self.draw_progress_chart(self.timeline_canvas)
+
+    def redraw_charts(self):
+        """Redraw both charts from the current statistics"""
+        if self.genre_canvas is not None:
+            self.draw_genre_chart(self.genre_canvas)
+        if self.timeline_canvas is not None:
+            self.draw_progress_chart(self.timeline_canvas)
+        if self.rating_canvas is not None:
+            self.draw_rating_chart(self.rating_canvas)
+        if self.decade_canvas is not None:
+            self.draw_decade_chart(self.decade_canvas)
+
+    def _stats_service(self):
+        """The app's stats service, or the one exported on the services package"""
+        service = getattr(self.app, 'stats_service', None)
+        if service is None:
+            try:
+                import services as services_pkg
+                service = getattr(services_pkg, 'stats_service', None)
+            except Exception:
+                service = None
+        return service
+
+    def _draw_empty(self, canvas, message):
+        canvas.create_text(
+            200, 120,
+            text=message,
+            font=("Segoe UI", 10),
+            fill=COLORS["text_light"]
+        )
+
+    def draw_genre_chart(self, canvas, counts=None):
+        """Draw the six most common genres (``counts`` defaults to the live figures)"""
+        canvas.delete("all")
+        service = self._stats_service()
+        try:
+            if counts is None and service is not None and hasattr(service, 'get_genre_distribution'):
+                counts = service.get_genre_distribution(getattr(self, 'books', None))
+        except Exception as e:
+            print(f"Warning: genre distribution unavailable: {e}")
+        counts = counts or {}
+        top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:6]
+        genres = [genre for genre, _ in top]
+        values = [value for _, value in top]
 
         if not values:
+            self._draw_empty(canvas, "No genres yet")
             return
 
         max_val = max(values)
@@ -261,47 +468,129 @@ class StatsTab:
                 angle=45
             )
 
-    def draw_progress_chart(self, canvas):
-        """Draw reading progress chart (simulated)"""
-        # Sample progress data
-        books = ["Book 1", "Book 2", "Book 3", "Book 4", "Book 5"]
-        progress = [random.randint(20, 100) for _ in range(len(books))]
+    def draw_progress_chart(self, canvas, timeline=None):
+        """Draw books finished per month (last 12) or per year (last 10)"""
+        canvas.delete("all")
+        level = self.timeline_level
+        periods = 12 if level == "month" else 10
+        service = self._stats_service()
+        try:
+            if timeline is None and service is not None and hasattr(service, 'get_reading_timeline'):
+                timeline = service.get_reading_timeline(getattr(self, 'books', None), level=level, periods=periods)
+        except Exception as e:
+            print(f"Warning: reading timeline unavailable: {e}")
+        timeline = timeline or {}
+
+        if not timeline:
+            self._draw_empty(canvas, "No reading history yet")
+            return
 
-        bar_width = 40
-        spacing = 20
-        chart_width = len(books) * (bar_width + spacing) + 20
-        chart_height = 180
+        labels = list(timeline)
+        values = list(timeline.values())
+        max_val = max(values)
+        bar_width = 22
+        spacing = 10
         base_y = 200
 
-        for i, (book, prog) in enumerate(zip(books, progress)):
-            x = 50 + i * (bar_width + spacing)
-            height = (prog / 100) * 150
+        for i, (label, value) in enumerate(zip(labels, values)):
+            x = 30 + i * (bar_width + spacing)
+            height = (value / max_val) * 150 if max_val > 0 else 0
             y = base_y - height
 
-            # Draw progress bar
-            color = COLORS["primary"] if prog < 50 else COLORS["success"]
+            # Draw bar
+            color = COLORS["success"] if i == len(labels) - 1 else COLORS["primary"]
             canvas.create_rectangle(
                 x, y, x + bar_width, base_y,
                 fill=color,
                 outline=color
             )
 
-            # Draw progress percentage
+            # Draw value label
             canvas.create_text(
                 x + bar_width / 2, y - 10,
-                text=f"{prog}%",
+                text=str(value),
                 font=("Segoe UI", 9),
                 fill=COLORS["text"]
             )
 
-            # Draw book label
+            # Draw month / year label
+            if level == "month":
+                try:
+                    label = datetime.strptime(label, "%Y-%m").strftime("%b")
+                except ValueError:
+                    pass
+            canvas.create_text(
+                x + bar_width / 2, base_y + 15,
+                text=label,
+                font=("Segoe UI", 8),
+                fill=COLORS["text"]
+            )
+
+    def _draw_bars(self, canvas, labels, values, color):
+        """Plain bar chart with the value above each bar"""
+        max_val = max(values)
+        bar_width = 30
+        spacing = 12
+        base_y = 200
+
+        for i, (label, value) in enumerate(zip(labels, values)):
+            x = 40 + i * (bar_width + spacing)
+            height = (value / max_val) * 150 if max_val > 0 else 0
+            y = base_y - height
+
+            canvas.create_rectangle(
+                x, y, x + bar_width, base_y,
+                fill=color,
+                outline=color
+            )
+            canvas.create_text(
+                x + bar_width / 2, y - 10,
+                text=str(value),
+                font=("Segoe UI", 9),
+                fill=COLORS["text"]
+            )
             canvas.create_text(
                 x + bar_width / 2, base_y + 15,
-                text=book,
+                text=label,
                 font=("Segoe UI", 8),
                 fill=COLORS["text"]
             )
 
+    def draw_rating_chart(self, canvas, counts=None):
+        """Draw books per whole-star rating (``counts`` defaults to the live figures)"""
+        canvas.delete("all")
+        service = self._stats_service()
+        try:
+            if counts is None and service is not None and hasattr(service, 'get_rating_histogram'):
+                counts = service.get_rating_histogram(getattr(self, 'books', None))
+        except Exception as e:
+            print(f"Warning: rating histogram unavailable: {e}")
+        counts = counts or {}
+
+        if not any(counts.values()):
+            self._draw_empty(canvas, "No books yet")
+            return
+
+        labels = [f"{stars}★" for stars in counts]
+        self._draw_bars(canvas, labels, list(counts.values()), COLORS["warning"])
+
+    def draw_decade_chart(self, canvas, counts=None):
+        """Draw books per publication decade, the last eight decades with books"""
+        canvas.delete("all")
+        service = self._stats_service()
+        try:
+            if counts is None and service is not None and hasattr(service, 'get_decade_counts'):
+                counts = service.get_decade_counts(getattr(self, 'books', None))
+        except Exception as e:
+            print(f"Warning: decade counts unavailable: {e}")
+        recent = list((counts or {}).items())[-8:]
+
+        if not recent:
+            self._draw_empty(canvas, "No publication years yet")
+            return
+
+        self._draw_bars(canvas, [decade for decade, _ in recent], [count for _, count in recent], COLORS["info"])
+
     def refresh(self):
         """Refresh statistics display"""
         # Get updated statistics (defensive)
@@ -335,31 +624,14 @@ class StatsTab:
             stats_raw = None
 
         # Normalize stats to an object with attributes used by the UI
-        class SimpleStats:
-            def __init__(self, d=None):
-                d = d or {}
-                # support dict-like or object-like inputs
-                def get(k, default=0):
-                    if isinstance(d, dict):
-                        return d.get(k, default)
-                    return getattr(d, k, default)
-                self.total_books = get('total_books', 0)
-                self.completed_books = get('completed_books', 0)
-                self.reading_books = get('reading_books', 0)
-                self.average_progress = get('average_progress', 0)
-                self.monthly_completed = get('monthly_completed', 0)
-                self.reading_streak = get('reading_streak', 0)
-                self.total_pages = get('total_pages', 0)
-                self.favorite_genre = get('favorite_genre', 'None')
-
         if stats_raw is None:
-            self.stats_data = SimpleStats()
+            self.stats_data = StatsView()
         elif isinstance(stats_raw, dict):
-            self.stats_data = SimpleStats(stats_raw)
+            self.stats_data = StatsView(stats_raw)
         else:
             # assume object with attributes
             try:
-                self.stats_data = SimpleStats({
+                self.stats_data = StatsView({
                     'total_books': getattr(stats_raw, 'total_books', 0),
                     'completed_books': getattr(stats_raw, 'completed_books', 0),
                     'reading_books': getattr(stats_raw, 'reading_books', 0),
@@ -370,11 +642,14 @@ class StatsTab:
                     'favorite_genre': getattr(stats_raw, 'favorite_genre', 'None')
                 })
             except Exception:
-                self.stats_data = SimpleStats()
+                self.stats_data = StatsView()
 
         # Update KPI cards
         self.update_kpi_cards()
 
+        # Redraw charts with the new data
+        self.redraw_charts()
+
         # Update achievements
         self.update_achievements()
 
@@ -83,6 +83,1448 @@ def test_book_service():
     
     print("✅ BookService tests passed!")
 
+def test_journaled_storage():
+    """Test the append-only journal storage mode"""
+    print("\n=== Testing Journaled Storage ===")
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "journal_books.json")
+        book_service = BookService(data_file, storage="journal")
+        book_service.save_data()
+        snapshot_size = os.path.getsize(data_file)
+
+        book = book_service.add_book({
+            "title": "Journal Book", "author": "Log Author", "publisher": "P",
+            "genre": "Test", "isbn": "9780123456789", "year": 2024, "total_pages": 200
+        })
+        book_service.update_book(book.id, {"current_page": 50})
+        victim = book_service.get_all_books()[0]
+        book_service.delete_book(victim.id)
+
+        # edits only append to the journal; the snapshot is untouched
+        assert os.path.getsize(data_file) == snapshot_size, "Snapshot rewritten on edit"
+        with open(data_file + ".journal", encoding="utf-8") as f:
+            assert len(f.readlines()) == 3, "Expected one journal record per edit"
+        print("✓ Edits appended to journal")
+
+        replayed = BookService(data_file, storage="journal")
+        assert replayed.get_book_by_id(book.id).current_page == 50, "Journal replay failed"
+        assert replayed.get_book_by_id(victim.id) is None, "Deleted book came back"
+        assert [b.id for b in replayed.get_all_books()] == [b.id for b in book_service.get_all_books()]
+        print("✓ Snapshot + journal replayed on load")
+
+        replayed.store.compact()
+        assert not os.path.exists(data_file + ".journal"), "Journal not folded"
+        compacted = BookService(data_file, storage="journal")
+        assert [b.to_dict() for b in compacted.get_all_books()] == [b.to_dict() for b in book_service.get_all_books()]
+        print("✓ Compaction folded journal into snapshot")
+        book_service.close()
+
+    print("✅ Journaled storage tests passed!")
+
+def test_sqlite_storage():
+    """Test the SQLite storage engine and JSON migration"""
+    print("\n=== Testing SQLite Storage ===")
+    import tempfile
+    from services.storage import SqliteLibraryStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_books = BookService(os.path.join(tmp, "legacy_books.json"))
+        json_books.save_data()
+        json_categories = CategoryService(os.path.join(tmp, "legacy_categories.json"))
+        json_categories.save_data()
+
+        db_path = os.path.join(tmp, "library.db")
+        store = SqliteLibraryStore(db_path)
+        assert store.import_json(json_books.data_file, json_categories.data_file), "Import did not run"
+        assert not store.import_json(json_books.data_file, json_categories.data_file), "Import ran twice"
+        print("✓ Imported legacy JSON once")
+
+        book_service = BookService(db_path, storage=store)
+        category_service = CategoryService(db_path, storage=store)
+        assert [b.to_dict() for b in book_service.get_all_books()] == [b.to_dict() for b in json_books.get_all_books()]
+        assert [c.name for c in category_service.get_all_categories()] == [c.name for c in json_categories.get_all_categories()]
+        print("✓ Books and categories loaded from SQLite")
+
+        book = book_service.get_all_books()[0]
+        book_service.update_book(book.id, {"status": "Reading", "categories": ["General", "Sqlite"]})
+        books_store = book_service.store
+        assert books_store.get_book(book.id).status == "Reading", "Row update not persisted"
+        assert book.id in [b.id for b in books_store.query_books(category="Sqlite")], "Join table not updated"
+        assert all(b.status == "Reading" for b in books_store.query_books(status="Reading"))
+        statements = []
+        store.conn.set_trace_callback(statements.append)
+        queried = books_store.query_books()
+        store.conn.set_trace_callback(None)
+        assert len(statements) == 1, f"query_books ran {len(statements)} statements"
+        assert [b.to_dict() for b in queried] == [b.to_dict() for b in book_service.get_all_books()]
+        assert books_store.get_book(book.id).categories == ["General", "Sqlite"]
+        book_service.delete_book(book.id)
+        assert books_store.get_book(book.id) is None, "Row delete not persisted"
+        print("✓ Single-row updates and indexed queries")
+
+        category_service.create_category("SQL Shelf", "#123456")
+        category_service.update_category("SQL Shelf", "SQL Stack", "#654321")
+        reopened = CategoryService(db_path, storage=SqliteLibraryStore(db_path))
+        renamed = reopened.get_category_by_name("SQL Stack")
+        assert renamed is not None and renamed.color == "#654321", "Category rename not persisted"
+        print("✓ Category changes persisted")
+        store.close()
+        reopened.store.library.close()
+
+    print("✅ SQLite storage tests passed!")
+
+def test_batch_operations():
+    """Test batched, all-or-nothing mutations across services"""
+    print("\n=== Testing Batch Operations ===")
+    import tempfile
+    from services.events import Event, EventBus
+    from services.storage import SqliteLibraryStore
+    from services.transaction import batch
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "batch_books.json"))
+        book_service.save_data()
+        writes = []
+        original_write = book_service.store.write
+        book_service.store.write = lambda books, changes=None: writes.append(changes) or original_write(books, changes)
+
+        with book_service.batch():
+            added = [book_service.add_book({
+                "title": f"Batch {i}", "author": "Bulk", "publisher": "P",
+                "genre": "Test", "isbn": "", "year": 2024
+            }) for i in range(5)]
+            book_service.update_book(added[0].id, {"status": "Reading"})
+            book_service.delete_book(added[1].id)
+        assert len(writes) == 1, f"Expected one write, got {len(writes)}"
+        assert len(BookService(book_service.data_file).get_all_books()) == len(book_service.get_all_books())
+        print("✓ Batch persisted with a single write")
+
+        before = [b.to_dict() for b in book_service.get_all_books()]
+        try:
+            with book_service.batch():
+                book_service.add_book({"title": "Doomed", "author": "A", "publisher": "P", "genre": "G", "isbn": "", "year": 2000})
+                book_service.update_book(added[0].id, {"status": "Completed"})
+                book_service.delete_book(added[2].id)
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert [b.to_dict() for b in book_service.get_all_books()] == before, "Rollback did not restore books"
+        assert len(writes) == 1, "Rolled-back batch was written"
+        print("✓ Failed batch rolled back without writing")
+
+        db_path = os.path.join(tmp, "batch.db")
+        store = SqliteLibraryStore(db_path)
+        sql_books = BookService(db_path, storage=store)
+        sql_categories = CategoryService(db_path, storage=store)
+        sql_books.save_data()
+        sql_categories.save_data()
+        target = sql_books.get_all_books()[0]
+        with sql_books.batch(sql_categories):
+            sql_categories.create_category("Batch Shelf", "#000000")
+            sql_books.update_book(target.id, {"categories": ["Batch Shelf"]})
+        assert store.book_store().get_book(target.id).categories == ["Batch Shelf"]
+        assert CategoryService(db_path, storage=store).get_category_by_name("Batch Shelf") is not None
+        print("✓ Book and category changes committed together")
+
+        with batch(sql_categories):
+            sql_categories.update_category("Batch Shelf", "Renamed Shelf", "#111111")
+            sql_categories.create_category("Batch Shelf", "#222222")
+        stored = {c.name: c.color for c in CategoryService(db_path, storage=store).get_all_categories()}
+        assert stored.get("Renamed Shelf") == "#111111" and stored.get("Batch Shelf") == "#222222", stored
+        print("✓ A renamed category's old name can be reused in the same batch")
+        store.close()
+
+        bus = EventBus()
+        books = BookService(os.path.join(tmp, "pair_books.json"), sessions_file=os.path.join(tmp, "pair.jsonl"), events=bus)
+        categories = CategoryService(os.path.join(tmp, "pair_categories.json"), events=bus)
+        books.save_data()
+        categories.save_data()
+        published = []
+        bus.subscribe(Event, published.append)
+        target = books.get_all_books()[0]
+        page, sessions = target.current_page, books.sessions.sessions
+
+        def failing_write(items, changes=None):
+            raise OSError("disk full")
+        categories.store.write = failing_write
+        try:
+            with batch(books, categories):
+                books.update_book(target.id, {"current_page": page + 25})
+                categories.create_category("Never Saved", "#123456")
+            raise AssertionError("The category write error was swallowed")
+        except OSError:
+            pass
+        assert target.current_page == page, "Book edit was not rolled back"
+        assert BookService(books.data_file).get_book_by_id(target.id).current_page == page, "Book file not restored"
+        assert categories.get_category_by_name("Never Saved") is None, "Category was not rolled back"
+        assert not published, f"Failed batch published {[type(e).__name__ for e in published]}"
+        assert books.sessions.sessions == sessions, "Failed batch logged a reading session"
+        print("✓ A failing second service leaves no events, sessions or writes behind")
+
+    print("✅ Batch operation tests passed!")
+
+def test_write_behind_persistence():
+    """Test debounced background persistence"""
+    print("\n=== Testing Write-Behind Persistence ===")
+    import tempfile
+    import time
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "write_behind.json")
+        book_service = BookService(data_file, write_behind=0.3)
+        book_service.save_data()
+        book = book_service.get_all_books()[0]
+
+        for page in range(1, 11):
+            book_service.update_book(book.id, {"current_page": page})
+        assert BookService(data_file).get_book_by_id(book.id).current_page != 10, "Write was not deferred"
+        book_service.flush()
+        assert BookService(data_file).get_book_by_id(book.id).current_page == 10, "flush() did not persist"
+        stats = book_service.persistence_stats()
+        assert stats["flushes"] == 1 and stats["coalesced_writes"] == 9, f"Unexpected counters: {stats}"
+        print(f"✓ 10 edits coalesced into 1 flush ({stats['last_flush_ms']:.2f} ms)")
+
+        book_service.rate_book(book.id, 4.0, "Background")
+        deadline = time.time() + 5
+        while book_service.persistence_stats()["flushes"] < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert BookService(data_file).get_book_by_id(book.id).review == "Background", "Background flush missing"
+        print("✓ Background flush after quiet period")
+
+        import threading
+        copying, copied = threading.Event(), threading.Event()
+
+        def copy_books():
+            # what the persister thread does while it copies the books to write
+            with book_service._lock:
+                copying.set()
+                copied.wait(5)
+        persister = threading.Thread(target=copy_books)
+        persister.start()
+        copying.wait(5)
+        editor = threading.Thread(target=lambda: book_service.update_book(book.id, {"notes": "Later"}))
+        editor.start()
+        editor.join(0.2)
+        assert editor.is_alive() and book.notes != "Later", "An edit ran while the books were being copied"
+        copied.set()
+        editor.join()
+        persister.join()
+        assert book.notes == "Later"
+        print("✓ Edits wait while a flush copies the books")
+
+        book_service.rate_book(book.id, 5.0, "On exit")
+        book_service.close()
+        assert BookService(data_file).get_book_by_id(book.id).review == "On exit", "close() did not flush"
+        print("✓ Pending changes flushed on close")
+
+        from services.storage import SqliteLibraryStore
+        from services.transaction import batch
+        db_path = os.path.join(tmp, "write_behind.db")
+        store = SqliteLibraryStore(db_path)
+        sql_books = BookService(db_path, storage=store, write_behind=60)
+        sql_categories = CategoryService(db_path, storage=store)
+        sql_books.save_data()
+        sql_categories.save_data()
+        first, second = sql_books.get_all_books()[:2]
+        written = []
+        original_write = sql_books.store.write
+
+        def flaky_write(books, changes=None):
+            written.append(books)
+            if len(written) == 1:
+                raise OSError("database is locked")
+            original_write(books, changes)
+        sql_books.store.write = flaky_write
+
+        def failing_write(items, changes=None):
+            raise OSError("disk full")
+        sql_categories.store.write = failing_write
+        sql_books.update_book(first.id, {"notes": "Queued"})
+        for _ in range(2):
+            try:
+                with batch(sql_books, sql_categories):
+                    sql_books.update_book(second.id, {"notes": "Batched"})
+                    sql_categories.create_category("Never Saved", "#123456")
+            except OSError:
+                pass
+        assert written[0] is None, "The SQLite flush copied the books"
+        assert store.book_store().get_book(first.id).notes == "Queued", "Queued edit was lost with the failed batch"
+        assert store.book_store().get_book(second.id).notes != "Batched", "Failed batch was written"
+        sql_books.close()
+        store.close()
+        print("✓ Queued edits are committed on their own and survive a failed batch")
+
+    print("✅ Write-behind persistence tests passed!")
+
+def test_primary_key_index():
+    """Test O(1) id lookups, tombstone deletes and compaction"""
+    print("\n=== Testing Primary-Key Index ===")
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "index_books.json"))
+        with book_service.batch():
+            added = [book_service.add_book({
+                "title": f"Indexed {i}", "author": "Index", "publisher": "P",
+                "genre": "Test", "isbn": "", "year": 2000 + i % 20
+            }) for i in range(300)]
+        assert len({b.id for b in added}) == 300, "Duplicate ids generated"
+        assert all(book_service.get_book_by_id(b.id) is b for b in added), "Lookup by id failed"
+        print("✓ Lookups by id")
+
+        expected = [b.id for b in book_service.get_all_books() if b.id not in {x.id for x in added[::2]}]
+        for book in added[::2]:
+            assert book_service.delete_book(book.id), "Delete failed"
+        assert not book_service.delete_book(added[0].id), "Deleted a missing book"
+        assert [b.id for b in book_service.get_all_books()] == expected, "Order changed after deletes"
+        assert book_service._tombstones < len(book_service._ordinals), "Tombstones never compacted"
+        print("✓ Deletes keep insertion order and tombstones compact")
+
+        survivor = added[1]
+        try:
+            with book_service.batch():
+                book_service.delete_book(survivor.id)
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert [b.id for b in book_service.get_all_books()] == expected, "Rollback lost position"
+        assert book_service.get_book_by_id(survivor.id) is survivor
+        print("✓ Rolled-back delete restored in place")
+
+    print("✅ Primary-key index tests passed!")
+
+def test_secondary_indexes():
+    """Test incrementally maintained status/category/genre/author/year indexes"""
+    print("\n=== Testing Secondary Indexes ===")
+    import tempfile
+
+    def naive(books, status=None, category=None, genre=None, author=None, year=None):
+        return [b for b in books
+                if (status is None or b.status == status)
+                and (category is None or category in b.categories)
+                and (genre is None or genre.lower() in [g.strip().lower() for g in b.genre.split(",")])
+                and (author is None or b.author.lower() == author.lower())
+                and (year is None or b.year == year)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "secondary_books.json"))
+        book_service.books = []
+        statuses = ["To Read", "Reading", "Completed"]
+        with book_service.batch():
+            for i in range(60):
+                book_service.add_book({
+                    "title": f"Book {i}", "author": ["Émile Zola", "Ann Leckie", "Iain Banks"][i % 3],
+                    "publisher": "P", "genre": ["Fiction, Classic", "Science Fiction", "Fiction"][i % 3],
+                    "isbn": "", "year": 1990 + i % 4, "status": statuses[i % 3],
+                    "categories": ["Favorites"] if i % 5 == 0 else []
+                })
+
+        queries = [dict(status="Reading"), dict(category="Favorites"), dict(genre="Fiction"),
+                   dict(author="émile zola"), dict(year=1991), dict(status="Completed", genre="fiction", year=1992)]
+        books = book_service.get_all_books()
+        for q in queries:
+            assert book_service.find_books(**q) == naive(books, **q), f"Index mismatch for {q}"
+        assert book_service.find_books(author="emile zola") == naive(books, author="Émile Zola"), "Accent folding failed"
+        print("✓ Index lookups match a full scan")
+
+        target = book_service.find_books(status="To Read")[0]
+        book_service.update_book_status(target.id, "Reading")
+        book_service.update_book(target.id, {"categories": ["Shelf"], "genre": "Poetry"})
+        assert target in book_service.get_books_by_status("Reading")
+        assert target not in book_service.get_books_by_status("To Read")
+        assert book_service.get_books_by_category("Shelf") == [target]
+        assert book_service.find_books(genre="poetry") == [target]
+        book_service.delete_book(target.id)
+        assert book_service.find_books(genre="poetry") == [], "Deleted book still indexed"
+        print("✓ Indexes follow updates and deletes")
+
+        victim = book_service.find_books(status="Completed")[0]
+        try:
+            with book_service.batch():
+                book_service.update_book(victim.id, {"status": "Reading"})
+                book_service.delete_book(victim.id)
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        assert victim in book_service.get_books_by_status("Completed"), "Rollback not reindexed"
+        assert victim not in book_service.get_books_by_status("Reading")
+        assert book_service.search_books("", {"status": "Completed"}) == naive(book_service.get_all_books(), status="Completed")
+        print("✓ Rollback restores index entries")
+
+    print("✅ Secondary index tests passed!")
+
+def test_full_text_index():
+    """Test the inverted full-text index behind search_books"""
+    print("\n=== Testing Full-Text Index ===")
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "fulltext_books.json"))
+        book_service.books = []
+        hobbit = book_service.add_book({
+            "title": "The Hobbit", "author": "J.R.R. Tolkien", "publisher": "Allen & Unwin",
+            "genre": "Fantasy", "isbn": "978-0-261-10221-7", "year": 1937,
+            "description": "A hobbit goes on an unexpected journey"
+        })
+        germinal = book_service.add_book({
+            "title": "Germinal", "author": "Émile Zola", "publisher": "Charpentier",
+            "genre": "Classic, Fiction", "isbn": "", "year": 1885, "status": "Completed"
+        })
+
+        assert book_service.search_books("tolk", mode="text") == [hobbit], "Prefix search failed"
+        assert book_service.search_books("EMILE zola", mode="text") == [germinal], "Folded multi-term search failed"
+        assert book_service.search_books("hobbit journey", mode="text") == [hobbit], "Description not indexed"
+        assert book_service.search_books("9780261", mode="text") == [hobbit], "Compact ISBN not indexed"
+        assert book_service.search_books("hobbit zola", mode="text") == [], "Terms were not ANDed"
+        assert book_service.search_books("zola", {"status": "Reading"}, mode="text") == []
+        print("✓ Token, prefix and multi-term queries")
+
+        book_service.rate_book(germinal.id, 5, "Bleak and brilliant")
+        assert book_service.search_books("brilliant", mode="text") == [germinal], "Review update not indexed"
+        book_service.update_book(hobbit.id, {"title": "There and Back Again"})
+        assert book_service.search_books("there back", mode="text") == [hobbit]
+        assert book_service.search_books("the hobbit", mode="text") == [hobbit], "Description still matches"
+        book_service.delete_book(germinal.id)
+        assert book_service.search_books("brilliant", mode="text") == [], "Deleted book still searchable"
+        print("✓ Index follows updates and deletes")
+
+    print("✅ Full-text index tests passed!")
+
+def test_substring_search():
+    """Differential test: trigram-backed search_books vs. the original full scan"""
+    print("\n=== Testing Substring Search ===")
+    import random
+    import tempfile
+
+    def naive(books, query, filters):
+        query = query.lower().strip()
+        if query:
+            books = [b for b in books
+                     if query in b.title.lower() or query in b.author.lower()
+                     or query in b.genre.lower() or query in b.isbn]
+        if filters.get("status"):
+            books = [b for b in books if b.status == filters["status"]]
+        return books
+
+    rng = random.Random(8)
+    words = ["Tolkien", "Hobbit", "Ring", "Zola", "Dune", "Herbert", "Mars", "Austen", "Pride"]
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "substring_books.json"))
+        with book_service.batch():
+            for i in range(200):
+                book_service.add_book({
+                    "title": " ".join(rng.sample(words, 2)), "author": rng.choice(words) + " " + rng.choice(words),
+                    "publisher": "P", "genre": rng.choice(["Fantasy", "Sci-Fi", "Classic, Romance"]),
+                    "isbn": f"978-{rng.randint(0, 99999):05d}", "year": 2000,
+                    "status": rng.choice(["To Read", "Reading", "Completed"])
+                })
+        for book in rng.sample(book_service.get_all_books(), 20):
+            book_service.update_book(book.id, {"title": rng.choice(words) + " Returns"})
+        for book in rng.sample(book_service.get_all_books(), 20):
+            book_service.delete_book(book.id)
+
+        haystack = " ".join(f"{b.title} {b.author} {b.genre} {b.isbn}" for b in book_service.get_all_books())
+        queries = ["", "ikin", "  TOLK ", "a", "zz", "978-0", "ns", "ring zola", "xyz"]
+        queries += [haystack[i:i + rng.randint(1, 8)] for i in rng.sample(range(len(haystack) - 8), 150)]
+        for query in queries:
+            for filters in ({}, {"status": "Reading"}):
+                expected = naive(book_service.get_all_books(), query, filters)
+                assert book_service.search_books(query, filters) == expected, f"Mismatch for {query!r} {filters}"
+        print(f"✓ {len(queries) * 2} queries identical to the full scan")
+
+    print("✅ Substring search tests passed!")
+
+def test_fuzzy_search():
+    """Test typo-tolerant search and "did you mean" suggestions"""
+    print("\n=== Testing Fuzzy Search ===")
+    import tempfile
+    from services.fuzzy_index import BKTree, levenshtein
+
+    assert levenshtein("tolkein", "tolkien") == 2
+    assert levenshtein("orwel", "orwell") == 1
+    words = ["tolkien", "orwell", "hobbit", "habit", "rabbit", "zola", "dune", "tolstoy"]
+    tree = BKTree()
+    for word in words:
+        tree.add(word)
+    for query in ("hobit", "tolkein", "zolla", "xyz"):
+        expected = sorted((levenshtein(query, w), w) for w in words if levenshtein(query, w) <= 2)
+        assert sorted(tree.search(query, 2)) == expected, f"BK-tree radius search wrong for {query}"
+    print("✓ BK-tree radius queries match brute force")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "fuzzy_books.json"))
+        book_service.books = []
+        hobbit = book_service.add_book({"title": "The Hobbit", "author": "J.R.R. Tolkien", "publisher": "P",
+                                        "genre": "Fantasy", "isbn": "", "year": 1937})
+        farm = book_service.add_book({"title": "Animal Farm", "author": "George Orwell", "publisher": "P",
+                                      "genre": "Satire", "isbn": "", "year": 1945})
+        assert book_service.search_books("Tolkein") == [], "Substring search should not be fuzzy"
+        assert book_service.indexes.fuzzy._tree is None, "BK-tree should not be built while loading"
+        assert book_service.search_books("Tolkein", mode="fuzzy") == [hobbit]
+        assert book_service.search_books("Orwel farm", mode="fuzzy") == [farm]
+        assert book_service.suggest_queries("Tolkein")[0] == "tolkien"
+        assert book_service.suggest_queries("animl orwel") == ["animal orwell"]
+        assert book_service.suggest_queries("hobbit") == [], "Correct spelling needs no suggestion"
+        print("✓ Fuzzy matches and suggestions")
+
+        book_service.update_book(farm.id, {"author": "Eric Blair"})
+        assert book_service.search_books("Orwel", mode="fuzzy") == []
+        assert book_service.suggest_queries("blare")[0] == "blair"
+        book_service.delete_book(hobbit.id)
+        assert book_service.suggest_queries("Tolkein") == [], "Deleted words still suggested"
+        print("✓ Vocabulary follows updates and deletes")
+
+    print("✅ Fuzzy search tests passed!")
+
+def test_ranked_search():
+    """Test BM25F relevance ranking and paged results"""
+    print("\n=== Testing Ranked Search ===")
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "ranked_books.json"))
+        book_service.books = []
+        mention = book_service.add_book({"title": "Collected Essays", "author": "Various", "publisher": "P",
+                                         "genre": "Essays", "isbn": "", "year": 2001,
+                                         "description": "Includes a piece on dune ecology"})
+        genre = book_service.add_book({"title": "Sandworms", "author": "Someone", "publisher": "P",
+                                       "genre": "Dune Fiction", "isbn": "", "year": 2002})
+        title = book_service.add_book({"title": "Dune", "author": "Frank Herbert", "publisher": "P",
+                                       "genre": "Science Fiction", "isbn": "", "year": 1965})
+        books, total = book_service.search_ranked("dune", mode="text")
+        assert total == 3 and books == [title, genre, mention], "Field weights not applied"
+        print("✓ Title matches outrank genre and description matches")
+
+        with book_service.batch():
+            filler = [book_service.add_book({"title": f"Filler {i}", "author": "Anon", "publisher": "P",
+                                             "genre": "Misc", "isbn": "", "year": 2000})
+                      for i in range(45)]
+        pages = []
+        for page in range(5):
+            books, total = book_service.search_ranked("filler", page=page, page_size=10)
+            assert total == 45
+            pages.extend(books)
+        assert pages == filler, "Pages overlap or lose results"
+        assert book_service.search_ranked("", page=1, page_size=2) == (book_service.get_all_books()[2:4], 48)
+        ranked, total = book_service.search_ranked("", {"status": "Completed"})
+        assert ranked == [] and total == 0
+        print("✓ Paging covers every result exactly once")
+
+    print("✅ Ranked search tests passed!")
+
+def test_query_cache():
+    """Test generation-stamped caching of query results"""
+    print("\n=== Testing Query Cache ===")
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "cache_books.json"))
+        book = book_service.get_all_books()[0]
+        book_service.query_cache.clear()
+
+        first = book_service.search_books("a", {"status": "All"})
+        stats = book_service.get_statistics()
+        misses = book_service.cache_stats()["misses"]
+        assert book_service.search_books("a", {"status": "All"}) == first
+        assert book_service.get_statistics() == stats
+        assert book_service.cache_stats()["hits"] == 2, "Repeated queries were recomputed"
+        assert book_service.cache_stats()["misses"] == misses
+
+        first.clear()
+        stats["genres"].clear()
+        assert book_service.search_books("a", {"status": "All"}), "Cached list was shared with the caller"
+        assert book_service.get_statistics()["genres"], "Cached stats were shared with the caller"
+        print("✓ Unchanged data is served from the cache")
+
+        generation = book_service.generation
+        before = len(book_service.get_books_by_status("Completed"))
+        book_service.update_book_status(book.id, "Completed" if book.status != "Completed" else "Reading")
+        assert book_service.generation > generation, "Update did not bump the generation"
+        after = len(book_service.get_books_by_status("Completed"))
+        assert after == before + (1 if book.status == "Completed" else -1), "Stale result after update"
+        total = book_service.get_statistics()["total_books"]
+        book_service.delete_book(book.id)
+        assert book_service.get_statistics()["total_books"] == total - 1, "Stale stats after delete"
+        assert len(book_service.query_cache) == 1, "Entries of older generations were kept"
+        print("✓ Changes invalidate cached results")
+
+        for i in range(book_service.query_cache.maxsize + 10):
+            book_service.search_books(f"q{i}")
+        assert len(book_service.query_cache) == book_service.query_cache.maxsize
+        assert book_service.cache_stats()["evictions"] >= 10
+        print("✓ Cache stays bounded")
+
+    print("✅ Query cache tests passed!")
+
+def test_incremental_narrowing():
+    """Test as-you-type searches narrowing earlier results"""
+    print("\n=== Testing Incremental Narrowing ===")
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "narrow_books.json"))
+        book_service.books = []
+        with book_service.batch():
+            for i in range(100):
+                book_service.add_book({"title": ["The Hobbit", "The Silmarillion", "Dune"][i % 3],
+                                       "author": ["J.R.R. Tolkien", "Christopher Tolkien", "Frank Herbert"][i % 3],
+                                       "publisher": "P", "genre": "Fantasy", "isbn": "", "year": 2000,
+                                       "status": ["Reading", "Completed"][i % 2]})
+
+        def scan(query, status):
+            return [b for b in book_service.get_all_books()
+                    if b.status == status and (query in b.title.lower() or query in b.author.lower()
+                                               or query in b.genre.lower() or query in b.isbn)]
+
+        typed = ["t", "to", "tol", "tolk", "tolki", "tolkie", "tolkien", "tolkie", "tolk", "tolkien"]
+        for query in typed:
+            assert book_service.search_books(query, {"status": "Reading"}) == scan(query, "Reading"), query
+        stats = book_service.cache_stats()
+        assert stats["narrowed_searches"] >= 6, "Longer queries did not narrow earlier results"
+        print("✓ Typing and backspacing match a full scan")
+
+        assert book_service.search_books("hobbit tol", mode="text") == book_service.search_books("hob", mode="text")
+        assert book_service.search_books("hobbit tolkien", mode="text") == [
+            b for b in book_service.get_all_books() if b.title == "The Hobbit"]
+        print("✓ Full-text mode narrows by word prefixes")
+
+        hobbit = book_service.search_books("tolkien", {"status": "Reading"})[0]
+        book_service.update_book(hobbit.id, {"author": "Anonymous", "title": "Untitled"})
+        assert hobbit not in book_service.search_books("tolkien", {"status": "Reading"}), "Stale narrowed result"
+        print("✓ Changes reset the narrowing history")
+
+    print("✅ Incremental narrowing tests passed!")
+
+def test_autocomplete():
+    """Test prefix completions over titles, authors, genres and categories"""
+    print("\n=== Testing Autocomplete ===")
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "complete_books.json"))
+        book_service.books = []
+        rings = book_service.add_book({"title": "The Lord of the Rings", "author": "J.R.R. Tolkien",
+                                       "publisher": "P", "genre": "Fantasy, Classic", "isbn": "",
+                                       "year": 1954, "categories": ["Favorites"]})
+        for title in ("The Hobbit", "The Silmarillion"):
+            book_service.add_book({"title": title, "author": "J.R.R. Tolkien", "publisher": "P",
+                                   "genre": "Fantasy", "isbn": "", "year": 1937})
+        book_service.add_book({"title": "Tolstoy Letters", "author": "Leo Tolstoy", "publisher": "P",
+                               "genre": "Letters", "isbn": "", "year": 1900})
+
+        results = book_service.complete("tol")
+        assert results[0] == {"text": "J.R.R. Tolkien", "kind": "author", "count": 3}, "Most used phrase not first"
+        assert {r["text"] for r in results} == {"J.R.R. Tolkien", "Tolstoy Letters", "Leo Tolstoy"}
+        assert [r["text"] for r in book_service.complete("rings")] == ["The Lord of the Rings"], "Inner words not completed"
+        assert [r["text"] for r in book_service.complete("fav")] == ["Favorites"]
+        assert book_service.complete("fantasy")[0]["count"] == 3
+        assert len(book_service.complete("t", limit=2)) == 2
+        assert book_service.complete("") == []
+        print("✓ Ranked completions by prefix")
+
+        book_service.update_book(rings.id, {"title": "LOTR", "categories": []})
+        assert book_service.complete("rings") == [] and book_service.complete("fav") == []
+        assert book_service.complete("lotr")[0]["text"] == "LOTR"
+        book_service.delete_book(rings.id)
+        assert book_service.complete("tolk")[0]["count"] == 2, "Delete did not decrement counts"
+        print("✓ Completions follow updates and deletes")
+
+        from services.autocomplete import CompletionIndex
+        completions = book_service.indexes.completions
+        book_service.complete("l")
+        scans, top = [], completions._top
+        completions._top = lambda prefix, limit: scans.append(prefix) or top(prefix, limit)
+        for i in range(3):
+            book_service.add_book({"title": f"Letters {i}", "author": "Leo Tolstoy", "publisher": "P",
+                                   "genre": "Letters", "isbn": "", "year": 1900})
+        results = book_service.complete("l")
+        assert not scans, f"Rescanned {scans} after adds"
+        assert "tolk" in completions._memo, "An unrelated prefix was invalidated"
+        fresh = CompletionIndex()
+        fresh.add_many(enumerate(book_service.get_all_books()))
+        assert results == fresh.complete("l"), "Kept top list differs from a fresh index"
+        assert results[0]["count"] == 4
+        print("✓ Kept top lists are updated in place and only for touched prefixes")
+
+    print("✅ Autocomplete tests passed!")
+
+def test_cursor_pagination():
+    """Test query_page ordering, cursors and stability across edits"""
+    print("\n=== Testing Cursor Pagination ===")
+    import random
+    import tempfile
+
+    def read_all(book_service, **kwargs):
+        books, cursor = [], None
+        while True:
+            page, cursor, total = book_service.query_page(cursor=cursor, page_size=7, **kwargs)
+            books.extend(page)
+            if cursor is None:
+                return books, total
+
+    rng = random.Random(14)
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "paged_books.json"))
+        book_service.books = []
+        with book_service.batch():
+            for i in range(150):
+                book_service.add_book({"title": rng.choice(["alpha", "Beta", "gamma", "Delta"]) + f" {i % 10}",
+                                       "author": rng.choice(["Ann", "bob", "Cy"]), "publisher": "P",
+                                       "genre": "G", "isbn": "", "year": rng.randint(1950, 1960),
+                                       "status": rng.choice(["Reading", "Completed"])})
+        everything = book_service.get_all_books()
+
+        for sort, key in (("title", lambda b: b.title.lower()), ("author", lambda b: b.author.lower()),
+                          ("year", lambda b: b.year)):
+            for descending in (False, True):
+                expected = sorted(everything, key=key, reverse=descending)
+                books, total = read_all(book_service, sort=sort, descending=descending)
+                assert [key(b) for b in books] == [key(b) for b in expected], f"{sort} order wrong"
+                assert len({b.id for b in books}) == total == 150, f"{sort} pages overlap"
+        assert read_all(book_service)[0] == everything
+        assert read_all(book_service, descending=True)[0] == everything[::-1]
+        print("✓ Every sort order pages through all books exactly once")
+
+        reading = [b for b in everything if b.status == "Reading"]
+        books, total = read_all(book_service, sort="title", filters={"status": "Reading"})
+        assert total == len(reading) and sorted(b.id for b in books) == sorted(b.id for b in reading)
+        books, total = read_all(book_service, sort="year", query="alpha")
+        assert total == len([b for b in everything if "alpha" in b.title]) == len(books)
+        print("✓ Filters and queries page correctly")
+
+        first, cursor, _ = book_service.query_page(sort="title", page_size=20)
+        for book in rng.sample(everything, 100):
+            if book not in first:
+                book_service.delete_book(book.id)
+        assert book_service._tombstones < 100, "Expected a compaction"
+        rest = []
+        while cursor:
+            page, cursor, _ = book_service.query_page(sort="title", page_size=20, cursor=cursor)
+            rest.extend(page)
+        assert not set(b.id for b in first) & set(b.id for b in rest), "Cursor replayed rows after compaction"
+        assert len(first) + len(rest) == len(book_service.get_all_books())
+        try:
+            book_service.query_page(sort="author", cursor=book_service.query_page(sort="title", page_size=1)[1])
+            assert False, "Cursor accepted for another sort"
+        except ValueError:
+            pass
+        print("✓ Cursors survive deletes and compaction")
+
+    print("✅ Cursor pagination tests passed!")
+
+def test_sort_indexes():
+    """Test collation keys and the incrementally maintained sort orders"""
+    print("\n=== Testing Sort Indexes ===")
+    import tempfile
+    from utils.text import collation_key
+
+    assert collation_key("The Hobbit") == "hobbit"
+    assert collation_key("  A   Tale of Two Cities") == "tale of two cities"
+    assert collation_key("\"Émile\"") == "emile\""
+    assert collation_key("A") == "a"
+    print("✓ Collation keys ignore case, accents and leading articles")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "sorted_books.json"))
+        book_service.books = []
+        specs = [("The Hobbit", "Tolkien", 40, 4.5), ("Anathem", "stephenson", 100, 4.0),
+                 ("a Clockwork Orange", "Burgess", 0, 3.0), ("Émile", "Rousseau", 75, 5.0)]
+        books = {}
+        for title, author, progress, rating in specs:
+            books[title] = book_service.add_book({"title": title, "author": author, "publisher": "P",
+                                                  "genre": "G", "isbn": "", "year": 2000,
+                                                  "progress": progress, "rating": rating})
+
+        def order(sort, descending=False):
+            return [b.title for b in book_service.query_page(sort=sort, descending=descending)[0]]
+
+        assert order("title") == ["Anathem", "a Clockwork Orange", "Émile", "The Hobbit"]
+        assert [b.author for b in book_service.query_page(sort="author")[0]] == ["Burgess", "Rousseau", "stephenson", "Tolkien"]
+        assert order("progress", True) == ["Anathem", "Émile", "The Hobbit", "a Clockwork Orange"]
+        assert order("rating", True) == ["Émile", "The Hobbit", "Anathem", "a Clockwork Orange"]
+        assert order("added", True) == [t for t, _, _, _ in specs][::-1]
+        print("✓ Title, author, progress, rating and insertion orders")
+
+        book_service.update_book(books["a Clockwork Orange"].id, {"current_page": 90, "total_pages": 100})
+        book_service.rate_book(books["Anathem"].id, 1.0)
+        assert order("progress", True)[:2] == ["Anathem", "a Clockwork Orange"], "Progress index not updated"
+        assert order("rating", True)[-1] == "Anathem", "Rating index not updated"
+        book_service.delete_book(books["Émile"].id)
+        assert "Émile" not in order("title")
+        print("✓ Sort orders follow updates and deletes")
+
+    print("✅ Sort index tests passed!")
+
+def test_query_language():
+    """Test the structured search syntax against a plain filter"""
+    print("\n=== Testing Query Language ===")
+    import random
+    import tempfile
+    from services.query_parser import parse_query
+
+    plan = parse_query('author:"le guin" -genre:romance rating>=4 year:1930..1960 dune')
+    assert [p.describe() for p in plan.predicates] == ["author:le guin", "-genre:romance",
+                                                       "rating:[4.0..", "year:[1930..1960]"]
+    assert plan.free_text == [("dune", False)]
+    assert not parse_query("Dune: Messiah").structured, "Unknown prefixes must stay free text"
+    assert parse_query("Dune: Messiah").text == "Dune: Messiah"
+    print("✓ Parser splits field terms from free text")
+
+    rng = random.Random(16)
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "query_books.json"))
+        book_service.books = []
+        with book_service.batch():
+            for i in range(300):
+                book_service.add_book({
+                    "title": rng.choice(["The Hobbit", "Dune", "Emma", "Persuasion"]),
+                    "author": rng.choice(["J.R.R. Tolkien", "Frank Herbert", "Jane Austen"]),
+                    "publisher": "P", "genre": rng.choice(["Fantasy", "Romance, Classic", "Sci-Fi"]),
+                    "isbn": "", "year": rng.randint(1900, 2000), "rating": rng.choice([0, 2.5, 4, 4.5, 5]),
+                    "status": rng.choice(["Reading", "Completed", "On Hold"]),
+                    "categories": rng.choice([["Favorites"], ["General"], []])
+                })
+        books = book_service.get_all_books()
+        cases = [
+            ("author:tolkien status:reading", lambda b: "tolkien" in b.author.lower() and b.status == "Reading"),
+            ("rating>=4 year:1930..1960", lambda b: b.rating >= 4 and 1930 <= b.year <= 1960),
+            ("cat:favorites -genre:romance", lambda b: "Favorites" in b.categories and "romance" not in b.genre.lower()),
+            ("status:on-hold year<1950 emma", lambda b: b.status == "On Hold" and b.year < 1950 and "emma" in b.title.lower()),
+            ("title:hob rating>4 -by:herbert", lambda b: "hob" in b.title.lower() and b.rating > 4 and "herbert" not in b.author.lower()),
+            ("year:1999.. -hobbit", lambda b: b.year >= 1999 and "hobbit" not in b.title.lower()),
+        ]
+        for query, predicate in cases:
+            expected = [b for b in books if predicate(b)]
+            assert book_service.search_books(query) == expected, f"Wrong result for {query}"
+        assert book_service.search_books("author:tolkien", {"status": "Completed", "min_rating": 4}) == [
+            b for b in books if "tolkien" in b.author.lower() and b.status == "Completed" and b.rating >= 4]
+        print("✓ Structured queries match a plain filter")
+
+        plan = book_service.explain_query("status:reading year:1950 author:austen")
+        assert plan[0].startswith("year:"), f"Most selective term not first: {plan}"
+        print("✓ Plan starts with the most selective index")
+
+    print("✅ Query language tests passed!")
+
+def test_search_facets():
+    """Test facet counts against re-running the search per option"""
+    print("\n=== Testing Search Facets ===")
+    import random
+    import tempfile
+
+    rng = random.Random(17)
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "facet_books.json"))
+        book_service.books = []
+        with book_service.batch():
+            for i in range(200):
+                book_service.add_book({
+                    "title": rng.choice(["Dune", "Emma", "Ubik"]) + f" {i}", "author": "A", "publisher": "P",
+                    "genre": rng.choice(["Fantasy", "Romance, Classic", "Sci-Fi"]),
+                    "isbn": "", "year": rng.randint(1940, 1999), "rating": rng.choice([0, 1.5, 3, 4, 4.5, 5]),
+                    "status": rng.choice(["Reading", "Completed", "On Hold"]),
+                    "categories": rng.choice([["Favorites"], ["General"], ["Favorites", "Shelf"]])
+                })
+
+        for query, filters in (("", {}), ("dune", {"status": "Reading"}),
+                               ("e", {"category": "Favorites", "min_rating": 4}),
+                               ("year:1950..1979", {"status": "Completed", "category": "Shelf", "min_rating": 3})):
+            facets = book_service.search_facets(query, filters)
+            results = book_service.search_books(query, filters)
+            assert facets["total"] == len(results), f"Total wrong for {query!r}"
+            for status in ("Reading", "Completed", "On Hold"):
+                expected = len(book_service.search_books(query, dict(filters, status=status)))
+                assert facets["status"].get(status, 0) == expected, f"Status facet wrong for {query!r}"
+            for category in ("Favorites", "General", "Shelf"):
+                expected = len(book_service.search_books(query, dict(filters, category=category)))
+                assert facets["category"].get(category, 0) == expected, f"Category facet wrong for {query!r}"
+            for threshold in range(1, 6):
+                expected = len(book_service.search_books(query, dict(filters, min_rating=threshold)))
+                assert facets["rating"][threshold] == expected, f"Rating facet wrong for {query!r}"
+            genres = {}
+            decades = {}
+            for book in results:
+                for genre in {g.strip().lower() for g in book.genre.split(",")}:
+                    genres[genre] = genres.get(genre, 0) + 1
+                decades[book.year // 10 * 10] = decades.get(book.year // 10 * 10, 0) + 1
+            assert facets["genre"] == genres and facets["decade"] == decades
+        print("✓ Facets equal one search per option")
+
+        book = book_service.search_books("", {"status": "Reading"})[0]
+        before = book_service.search_facets("", {})["status"]["Reading"]
+        book_service.update_book_status(book.id, "Completed")
+        assert book_service.search_facets("", {})["status"]["Reading"] == before - 1, "Stale facets"
+        print("✓ Facets follow updates")
+
+        searches = []
+        search_ordinals = book_service._search_ordinals
+        book_service._search_ordinals = lambda *args: searches.append(args) or search_ordinals(*args)
+        filters = {"status": "Reading", "min_rating": 3}
+        ranked, total = book_service.search_ranked("ubik", filters, page_size=5)
+        facets = book_service.search_facets("ubik", filters)
+        assert len(searches) == 1, f"Expected one search per keystroke, ran {len(searches)}"
+        assert total == facets["total"] == len(book_service.search_books("ubik", filters))
+        assert all(book.status == "Reading" and book.rating >= 3 for book in ranked)
+        print("✓ Ranked page and facets share one search")
+
+    print("✅ Search facet tests passed!")
+
+def test_bitmap_filters():
+    """Test bitmap postings and bitwise filter evaluation"""
+    print("\n=== Testing Bitmap Filters ===")
+    import random
+    import tempfile
+    from services.bitmap import Bitmap
+
+    rng = random.Random(18)
+    for _ in range(20):
+        a = {rng.randrange(20000) for _ in range(rng.randrange(300))}
+        b = {rng.randrange(20000) for _ in range(rng.randrange(300))}
+        x, y = Bitmap(a), Bitmap(b)
+        assert list(x) == sorted(a) and len(x) == len(a)
+        assert set(x & y) == a & b and set(x | y) == a | b and set(x - y) == a - b
+        assert set(x & b) == a & b and set(a & y) == a & b, "Mixed set/bitmap AND failed"
+        assert all(o in x for o in a) and -1 not in x and "x" not in x
+    x = Bitmap([5, 70000])
+    x.discard(5)
+    x.discard(6)
+    assert list(x) == [70000] and len(x) == 1
+    print("✓ AND/OR/ANDNOT match set operations")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "bitmap_books.json"))
+        book_service.books = []
+        with book_service.batch():
+            for i in range(300):
+                book_service.add_book({
+                    "title": f"Book {i}", "author": rng.choice(["Le Guin", "Banks", "Zola"]), "publisher": "P",
+                    "genre": rng.choice(["Fantasy", "Science Fiction, Classic", "Classic"]), "isbn": "",
+                    "year": rng.randint(1950, 1999), "rating": rng.choice([0, 2.5, 3, 4, 4.5, 5]),
+                    "status": rng.choice(["To Read", "Reading", "Completed"]),
+                    "categories": rng.choice([[], ["Favorites"], ["Favorites", "Shelf"]])
+                })
+        for book in book_service.get_all_books()[::7]:
+            book_service.delete_book(book.id)
+        books = book_service.get_all_books()
+
+        def naive(status=None, category=None, genre=None, min_rating=0):
+            return [b for b in books
+                    if (status is None or b.status == status)
+                    and (category is None or category in b.categories)
+                    and (genre is None or genre.lower() in [g.strip().lower() for g in b.genre.split(",")])
+                    and b.rating >= min_rating]
+
+        for filters in (dict(status="Reading", min_rating=4), dict(category="Favorites", genre="classic"),
+                        dict(status="Completed", category="Shelf", genre="fantasy", min_rating=2.5),
+                        dict(min_rating=4.5)):
+            assert book_service.search_books("", filters) == naive(**filters), f"Filter mismatch for {filters}"
+            assert book_service.search_books("book 1", filters) == [b for b in naive(**filters)
+                                                                  if "book 1" in b.title.lower()]
+        print("✓ Combined filters match a full scan")
+
+        expected = [b for b in books if b.status != "Reading" and "Favorites" not in b.categories and b.rating >= 4]
+        assert book_service.search_books("-status:reading -cat:favorites rating>=4") == expected, "ANDNOT failed"
+        assert book_service.count_books(status="Reading") == len(naive(status="Reading"))
+        print("✓ Negated terms subtract bitmaps")
+
+    print("✅ Bitmap filter tests passed!")
+
+def test_stats_aggregator():
+    """Test running statistics against a rescan after every kind of change"""
+    print("\n=== Testing Stats Aggregator ===")
+    import random
+    import tempfile
+    from datetime import datetime
+
+    rng = random.Random(19)
+    month = datetime.now().month
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "aggregate_books.json"))
+        book_service.books = []
+        attached = StatsService()
+        attached.attach(book_service)
+        scanning = StatsService()
+
+        def check(label):
+            books = book_service.get_all_books()
+            fast, slow = attached.calculate_statistics(books), scanning.calculate_statistics(list(books))
+            for name in ("total_books", "completed_books", "reading_books", "average_progress",
+                         "total_pages", "favorite_genre", "monthly_completed"):
+                assert getattr(fast, name) == getattr(slow, name), f"{name} differs after {label}"
+            assert attached.get_genre_distribution(books) == scanning.get_genre_distribution(list(books))
+            assert attached.get_genre_distribution() == attached.get_genre_distribution(books)
+            genres = {}
+            for book in books:
+                for genre in book.genre.split(','):
+                    genres[genre.strip()] = genres.get(genre.strip(), 0) + 1
+            assert book_service.get_statistics()["genres"] == genres, f"Genres differ after {label}"
+
+        with book_service.batch():
+            for i in range(120):
+                book_service.add_book({
+                    "title": f"Book {i}", "author": "A", "publisher": "P",
+                    "genre": rng.choice(["Fantasy", "Classic, Fantasy", "Sci-Fi", "", "Poetry"]),
+                    "isbn": "", "year": 2000, "total_pages": rng.randint(50, 900),
+                    "status": rng.choice(["To Read", "Reading", "Completed"]),
+                    "finish_date": rng.choice(["", f"2023-{month:02d}-05", "2024-01-31", "bad date"])
+                })
+        check("load")
+
+        books = book_service.get_all_books()
+        for book in books[:30]:
+            book_service.update_book_status(book.id, "Completed")
+        book_service.update_book(books[31].id, {"genre": "Horror", "total_pages": 10, "progress": 40})
+        check("updates")
+
+        for book in list(book_service.get_all_books())[::2]:
+            book_service.delete_book(book.id)
+        check("deletes and compaction")
+
+        try:
+            with book_service.batch():
+                book_service.delete_book(book_service.get_all_books()[0].id)
+                book_service.update_book_status(book_service.get_all_books()[0].id, "Reading")
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        check("rollback")
+
+        subset = book_service.get_all_books()[:5]
+        assert attached.calculate_statistics(subset).total_books == 5, "A subset must still be scanned"
+        print("✓ Running totals equal a rescan")
+
+    print("✅ Stats aggregator tests passed!")
+
+def test_reading_sessions():
+    """Test the reading-session log, streaks and snapshot recovery"""
+    print("\n=== Testing Reading Sessions ===")
+    import tempfile
+    from datetime import date, timedelta
+    from services.reading_sessions import ReadingSessionLog
+
+    today = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.jsonl")
+        log = ReadingSessionLog(path, snapshot_every=5)
+        # 3-day run long ago, then 8 days ending yesterday, logged out of order
+        for offset in [40, 41, 42] + [8, 6, 7, 5, 4, 1, 3, 2]:
+            log.record("b1", 10, today - timedelta(days=offset))
+        log.record("b2", 5, today - timedelta(days=2))
+        assert log.longest_streak() == 8, f"Longest streak {log.longest_streak()}"
+        assert log.current_streak(today) == 8, "Streak should survive until today ends"
+        assert log.current_streak(today + timedelta(days=1)) == 0
+        assert log.day(today - timedelta(days=2)) == (2, 15)
+        log.record("b1", 3)
+        assert log.current_streak() == 9 and log.longest_streak() == 9
+        print("✓ Streaks from day buckets")
+
+        log.close()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"d":"%s","b":"b3","p":4}\n{"d":"2020-' % (today + timedelta(days=1)).isoformat())
+        reopened = ReadingSessionLog(path)
+        assert reopened.sessions == log.sessions + 1, "Sessions after the snapshot were not replayed"
+        assert reopened.longest_streak() == 10 and reopened.day(today) == (1, 3)
+        reopened.record("b1", 1, today + timedelta(days=2))
+        assert ReadingSessionLog(path).longest_streak() == 11, "Torn tail was not dropped"
+        print("✓ Snapshot plus log tail restores the index")
+
+        book_service = BookService(os.path.join(tmp, "session_books.json"), sessions_file=os.path.join(tmp, "s.jsonl"))
+        book_service.books = []
+        book = book_service.add_book({"title": "T", "author": "A", "publisher": "P", "genre": "G",
+                                      "isbn": "", "year": 2000, "total_pages": 300})
+        book_service.update_book_status(book.id, "Reading", current_page=40)
+        book_service.update_book(book.id, {"current_page": 30})
+        try:
+            with book_service.batch():
+                book_service.update_book(book.id, {"current_page": 90})
+                raise RuntimeError("abort")
+        except RuntimeError:
+            pass
+        book_service.update_book_status(book.id, "Completed")
+        assert book_service.sessions.sessions == 2, "Expected one page session and one finish"
+        assert book_service.sessions.day(today) == (2, 40 + 270), "Finishing should count the remaining pages"
+        stats_service = StatsService()
+        stats_service.attach(book_service)
+        assert stats_service.calculate_statistics().reading_streak == 1
+        book_service.close()
+        print("✓ BookService logs page progress and finishes")
+
+    print("✅ Reading session tests passed!")
+
+def test_reading_rollups():
+    """Test day/month/year rollups behind the timeline and charts"""
+    print("\n=== Testing Reading Rollups ===")
+    import random
+    import tempfile
+    from datetime import date, timedelta
+    from services.rollups import TimeRollup, last_periods
+
+    today = date.today()
+    assert last_periods("month", 3, date(2024, 2, 10)) == [(2023, 12), (2024, 1), (2024, 2)]
+    assert last_periods("year", 2, date(2024, 2, 10)) == [(2023,), (2024,)]
+    rollup = TimeRollup()
+    rollup.add(date(2024, 2, 10), "pages", 30)
+    rollup.add(date(2024, 2, 11), "pages", 12)
+    rollup.add(date(2023, 5, 1), ("genre", "Poetry"))
+    assert rollup.series("month", "pages", 3, date(2024, 2, 29)) == {"2023-12": 0, "2024-01": 0, "2024-02": 42}
+    assert rollup.get("day", (2024, 2, 11), "pages") == 12 and rollup.keys("year") == [(2023,), (2024,)]
+    assert rollup.breakdown("year", (2023,), "genre") == {"Poetry": 1}
+    print("✓ Buckets roll up to months and years")
+
+    rng = random.Random(21)
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "rollup_books.json"), sessions_file=os.path.join(tmp, "s.jsonl"))
+        book_service.books = []
+        with book_service.batch():
+            for i in range(150):
+                finished = today - timedelta(days=rng.randint(0, 3650))
+                book_service.add_book({
+                    "title": f"Book {i}", "author": "A", "publisher": "P",
+                    "genre": rng.choice(["Fantasy", "Classic, Fantasy", "Poetry"]), "isbn": "", "year": 2000,
+                    "status": "Completed", "finish_date": finished.isoformat() if i % 4 else ""
+                })
+        attached = StatsService()
+        attached.attach(book_service)
+        scanning = StatsService()
+
+        def check(label):
+            books = book_service.get_all_books()
+            for level, periods in (("year", 10), ("month", 12), ("day", 30)):
+                fast = attached.get_reading_timeline(books, level=level, periods=periods)
+                assert fast == scanning.get_reading_timeline(list(books), level=level, periods=periods), \
+                    f"{level} timeline differs after {label}"
+            yearly = attached.get_reading_timeline(level="year", periods=11)
+            assert sum(yearly.values()) == len([b for b in books if b.finish_date]), f"Lost completions after {label}"
+
+        check("load")
+        assert list(attached.get_reading_timeline()) == [str(today.year - 2), str(today.year - 1), str(today.year)]
+        books = book_service.get_all_books()
+        book_service.update_book(books[1].id, {"finish_date": today.isoformat(), "genre": "Horror"})
+        for book in list(books)[::3]:
+            book_service.delete_book(book.id)
+        check("edits and deletes")
+        this_year = book_service.indexes.rollups.rollup.breakdown("year", (today.year,), "genre")
+        assert this_year.get("Horror") == 1, "Genre rollup missed an update"
+        print("✓ Completion rollups follow book changes")
+
+        reader = book_service.add_book({"title": "R", "author": "A", "publisher": "P", "genre": "G",
+                                        "isbn": "", "year": 2000, "total_pages": 500})
+        book_service.update_book(reader.id, {"current_page": 120})
+        book_service.update_book(reader.id, {"current_page": 200})
+        pages = attached.get_reading_timeline(level="month", periods=2, metric="pages")
+        assert list(pages.values())[-1] == 200, "Pages read this month"
+        assert scanning.get_reading_timeline(metric="pages") == {str(today.year - 2): 0, str(today.year - 1): 0,
+                                                                  str(today.year): 0}
+        book_service.close()
+        print("✓ Pages read come from the session log")
+
+    print("✅ Reading rollup tests passed!")
+
+def test_achievement_rules():
+    """Test the declarative achievement rules and persisted unlocks"""
+    print("\n=== Testing Achievement Rules ===")
+    import tempfile
+    from datetime import date, timedelta
+    from services.achievement_rules import AchievementEngine, RULES, inputs_of, library_inputs
+    from services.achievement_service import AchievementService
+
+    def unlocked(achievements):
+        return {a.id for a in achievements if a.unlocked}
+
+    today = date.today()
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "rule_books.json"), sessions_file=os.path.join(tmp, "s.jsonl"))
+        book_service.books = []
+        state = os.path.join(tmp, "achievements.json")
+        stats_service = StatsService(achievements_file=state)
+        stats_service.attach(book_service)
+        assert unlocked(stats_service.check_achievements()) == set()
+
+        genres = ["Poetry", "Drama", "Horror", "History", "Travel"]
+        with book_service.batch():
+            for i in range(5):
+                book_service.add_book({"title": f"B{i}", "author": "A", "publisher": "P", "genre": genres[i],
+                                       "isbn": "", "year": 2000, "status": "Reading" if i < 3 else "To Read"})
+        assert library_inputs(book_service) == inputs_of(book_service.get_all_books()), "Inputs differ from a scan"
+        assert unlocked(stats_service.check_achievements()) == {"first-book", "five-books", "multitasker"}
+        mixed = [Book(id=str(i), title="M", author="A", publisher="P", genre=genre, isbn="", year=2000, status=status)
+                 for i, (genre, status) in enumerate([("Poetry, Drama, Horror", "Completed"),
+                                                      ("History, Travel", "Completed"), ("Satire", "Reading")])]
+        assert inputs_of(mixed)["completed_genres"] == 5, "Only completed books count towards genre-master"
+        assert AchievementEngine().evaluate(inputs_of(mixed)) == ["first-book", "genre-master"]
+        print("✓ Count, genre and concurrent-reading rules")
+
+        before = stats_service.engine.evaluations
+        stats_service.check_achievements()
+        assert stats_service.engine.evaluations == before, "Unchanged inputs re-ran rules"
+        book = book_service.get_all_books()[0]
+        book_service.update_book(book.id, {"start_date": (today - timedelta(days=2)).isoformat()})
+        book_service.update_book_status(book.id, "Completed")
+        stats_service.check_achievements()
+        assert library_inputs(book_service)["completed_genres"] == 1
+        # completed, completed genres, concurrent, fastest and the streak changed;
+        # only locked dependants re-ran
+        assert stats_service.engine.evaluations - before == 4, stats_service.engine.evaluations - before
+        assert "speed-reader" in stats_service.engine.unlocked
+        print("✓ Only rules with changed inputs are re-evaluated")
+
+        for offset in range(1, 7):
+            book_service.sessions.record(book.id, 5, today - timedelta(days=offset))
+        book_service.delete_book(book_service.get_all_books()[-1].id)
+        achievements = stats_service.check_achievements()
+        assert "week-streak" in unlocked(achievements) and "five-books" in unlocked(achievements), \
+            "Unlocks should be sticky"
+        reloaded = StatsService(achievements_file=state)
+        assert unlocked(reloaded.check_achievements([])) == unlocked(achievements), "Unlocks were not persisted"
+        # a fresh engine without saved state sees only what holds now
+        assert unlocked(AchievementService(book_service).get_achievements()) == \
+            {"first-book", "speed-reader", "week-streak"}, "AchievementService should evaluate the same rules"
+        shared = AchievementService(book_service, engine=stats_service.engine)
+        assert unlocked(shared.get_achievements()) == unlocked(achievements), "A shared engine keeps the unlocks"
+        assert len(RULES) == len(stats_service.achievements)
+        book_service.close()
+        print("✓ Unlocks persist and all eight rules are wired")
+
+    print("✅ Achievement rule tests passed!")
+
+def test_stats_snapshot():
+    """Test the persisted stats snapshot used for instant dashboard startup"""
+    print("\n=== Testing Stats Snapshot ===")
+    import json
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        books_file = os.path.join(tmp, "snapshot_books.json")
+        stats_file = os.path.join(tmp, "stats.json")
+        book_service = BookService(books_file, sessions_file=os.path.join(tmp, "s.jsonl"))
+        book_service.books = []
+        with book_service.batch():
+            for i in range(4):
+                book_service.add_book({"title": f"S{i}", "author": "A", "publisher": "P", "genre": "Poetry",
+                                       "isbn": "", "year": 2000, "status": "Completed" if i % 2 else "Reading"})
+        stats_service = StatsService(stats_file=stats_file)
+        stats_service.attach(book_service)
+        assert stats_service.dashboard_snapshot() is None
+        assert stats_service.save_snapshot() and os.path.exists(stats_file)
+        assert not stats_service.save_snapshot(), "Unchanged figures should not be rewritten"
+
+        reloaded = StatsService(stats_file=stats_file)
+        reloaded.attach(book_service)
+        snapshot = reloaded.dashboard_snapshot()
+        assert snapshot["current"] is True, "Snapshot of an unchanged store should be current"
+        assert snapshot["stats"]["total_books"] == 4 and snapshot["stats"]["completed_books"] == 2
+        live = json.loads(json.dumps(reloaded.dashboard()))
+        assert {k: snapshot[k] for k in ("stats", "genres", "ratings", "decades", "timeline")} == live, \
+            "Snapshot differs from live figures"
+        print("✓ Snapshot saved, reloaded and current")
+
+        resumed_books = BookService(books_file)
+        assert resumed_books.indexes._unaggregated is not None, "Statistics should wait for their first use"
+        resumed = StatsService(stats_file=stats_file)
+        resumed.attach(resumed_books)
+        assert resumed_books.indexes._unaggregated is None, "Statistics were not resumed from the snapshot"
+        assert resumed_books.aggregate_state() == book_service.aggregate_state()
+        assert resumed.calculate_statistics().total_books == 4 and resumed.get_genre_distribution() == {"Poetry": 4}
+        print("✓ Running statistics resumed from the snapshot")
+
+        first, second, third = book_service.get_all_books()[:3]
+        book_service.update_book(first.id, {"title": "Renamed after the snapshot"})
+        book_service.update_book(second.id, {"status": "Completed", "finish_date": "2024-03-02"})
+        book_service.delete_book(third.id)
+        book_service.add_book({"title": "New", "author": "A", "publisher": "P", "genre": "Drama",
+                               "isbn": "", "year": 2001})
+        book_service.flush()
+        stale_books = BookService(books_file)
+        from services.stats_aggregator import StatsAggregator
+        counted, original_add = [], StatsAggregator.add
+        StatsAggregator.add = lambda self, ordinal, book: counted.append(book.title) or original_add(self, ordinal, book)
+        try:
+            StatsService(stats_file=stats_file).attach(stale_books)
+        finally:
+            StatsAggregator.add = original_add
+        assert stale_books.indexes._unaggregated is None, "A stale snapshot should still seed the statistics"
+        assert sorted(counted) == sorted([second.title, "New"]), f"Recounted {counted}"
+        assert stale_books.aggregate_state() == book_service.aggregate_state(), "Changes were not applied"
+        print("✓ A stale snapshot is brought up to date by recounting only changed books")
+        assert reloaded.dashboard_snapshot()["current"] is False, "Store change should make the snapshot stale"
+        assert reloaded.save_snapshot() and reloaded.dashboard_snapshot()["current"] is True
+        print("✓ Store changes are detected")
+
+        with open(stats_file, "w", encoding="utf-8") as f:
+            f.write('{"version": 1, "dash')
+        corrupt = StatsService(stats_file=stats_file)
+        assert corrupt.dashboard_snapshot() is None, "Corrupt snapshot should be ignored"
+        corrupt.attach(book_service)
+        assert corrupt.save_snapshot() and StatsService(stats_file=stats_file).dashboard_snapshot() is not None
+        with open(stats_file, "w", encoding="utf-8") as f:
+            json.dump({"version": StatsService.SNAPSHOT_VERSION + 1, "dashboard": {}}, f)
+        assert StatsService(stats_file=stats_file).dashboard_snapshot() is None, "Unknown versions are ignored"
+        book_service.close()
+        print("✓ Corrupt and outdated snapshots are rebuilt")
+
+    print("✅ Stats snapshot tests passed!")
+
+def test_book_columns():
+    """Test the columnar analytics and its NumPy/pure-Python backends"""
+    print("\n=== Testing Book Columns ===")
+    import tempfile
+    from services.analytics import HAVE_NUMPY, BookColumns
+
+    with tempfile.TemporaryDirectory() as tmp:
+        book_service = BookService(os.path.join(tmp, "columns_books.json"), sessions_file=os.path.join(tmp, "s.jsonl"))
+        book_service.books = []
+        specs = [("Completed", "Poetry, Drama", 1999, 4.5, 300, 100), ("Reading", "Poetry", 2001, 3, 120, 40),
+                 ("Reading", "", 0, 0, 0, 10), ("To Read", "Drama, Travel", 1999, 5, 80, 0)]
+        with book_service.batch():
+            for i, (status, genre, year, rating, pages, progress) in enumerate(specs):
+                book_service.add_book({"title": f"C{i}", "author": "A", "publisher": "P", "genre": genre, "isbn": "",
+                                       "year": year, "status": status, "rating": rating, "total_pages": pages,
+                                       "progress": progress})
+        books = book_service.get_all_books()
+        columns = BookColumns(books, use_numpy=False)
+        assert columns.backend == "python" and columns.count() == 4
+        assert columns.total_pages() == 500 and columns.total_pages("Reading") == 120
+        assert columns.average_progress() == 37.5 and columns.average_progress("Missing") == 0
+        assert columns.rating_histogram() == {0: 1, 1: 0, 2: 0, 3: 1, 4: 1, 5: 1}
+        assert columns.per_year() == {1999: 2, 2001: 1}
+        assert columns.status_counts() == {"Completed": 1, "Reading": 2, "To Read": 1}
+        assert columns.genre_counts("Reading") == {"Poetry": 1}
+        print("✓ Pure-Python column aggregations")
+
+        stats_service = StatsService()
+        stats_service.attach(book_service)
+        assert columns.genre_counts() == stats_service.get_genre_distribution()
+        assert stats_service.get_year_counts() == {1999: 2, 2001: 1}
+        assert stats_service.analytics() is book_service.indexes.columns, "Library columns should be the indexed ones"
+        book_service.update_book(books[2].id, {"year": 2001, "genre": "Travel"})
+        book_service.delete_book(books[0].id)
+        book_service.add_book({"title": "C4", "author": "A", "publisher": "P", "genre": "Poetry, Horror", "isbn": "",
+                               "year": 2011, "status": "Completed", "rating": 2, "total_pages": 10})
+        live = book_service.indexes.columns
+        assert stats_service.get_year_counts() == {1999: 1, 2001: 2, 2011: 1}, "Columns missed a change"
+        assert stats_service.get_decade_counts() == {"1990s": 1, "2000s": 2, "2010s": 1}
+        assert live.summary() == BookColumns(book_service.get_all_books(), use_numpy=False).summary()
+        assert len(live._free_genres) <= 1, "Freed genre entries should be reused"
+        print("✓ Indexed columns follow adds, edits and deletes")
+
+        if HAVE_NUMPY:
+            vectorized = BookColumns(books, use_numpy=True)
+            assert vectorized.summary() == BookColumns(books, use_numpy=False).summary()
+            assert vectorized.genre_counts("Completed") == {"Poetry": 1, "Drama": 1}
+            print("✓ NumPy columns match the pure-Python fallback")
+        else:
+            print("✓ NumPy not installed; pure-Python fallback in use")
+        book_service.close()
+
+    print("✅ Book column tests passed!")
+
+def test_change_events():
+    """Test the typed change events published by the services"""
+    print("\n=== Testing Change Events ===")
+    import tempfile
+    from services.events import (BookAdded, BookDeleted, BookEvent, BookUpdated, CategoryDeleted,
+                                 CategoryRenamed, CategoryUpdated, Event, EventBus)
+    from services.query_parser import matched_fields
+
+    bus = EventBus()
+    seen = []
+    unsubscribe = bus.subscribe(BookEvent, seen.append)
+    bus.subscribe(Event, lambda event: 1 / 0)
+    bus.publish(BookAdded(Book("x", "T", "A", "P", "G", "", 2000)))
+    assert len(seen) == 1, "Base-class subscribers should receive subclasses despite a failing handler"
+    unsubscribe()
+    bus.publish(BookDeleted(Book("x", "T", "A", "P", "G", "", 2000)))
+    assert len(seen) == 1, "Unsubscribed handler was called"
+    print("✓ Bus dispatch, isolation and unsubscribe")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        events = EventBus()
+        book_service = BookService(os.path.join(tmp, "event_books.json"), events=events)
+        category_service = CategoryService(os.path.join(tmp, "event_categories.json"), events=events)
+        book_service.books = []
+        received = []
+        events.subscribe(Event, received.append)
+
+        book = book_service.add_book({"title": "E", "author": "A", "publisher": "P", "genre": "G",
+                                      "isbn": "", "year": 2000})
+        book_service.rate_book(book.id, 4)
+        book_service.update_book(book.id, {"title": "E"})
+        assert [type(e) for e in received] == [BookAdded, BookUpdated], received
+        assert received[1].changed == {"rating"} and received[1].previous == {"rating": 0.0}
+        assert received[1].touches("rating", "title") and not received[1].touches("title")
+        print("✓ Updates carry only the fields that changed")
+
+        received.clear()
+        with book_service.batch():
+            book_service.update_book_status(book.id, "Reading")
+            assert received == [], "Events inside a batch should wait for the commit"
+        assert len(received) == 1 and {"status", "start_date"} <= received[0].changed
+        received.clear()
+        book_service.begin()
+        book_service.delete_book(book.id)
+        book_service.rollback()
+        assert received == [], "A rolled-back batch published events"
+        book_service.delete_book(book.id)
+        assert [type(e) for e in received] == [BookDeleted] and received[0].book_id == book.id
+        print("✓ Batches publish on commit and nothing on rollback")
+
+        received.clear()
+        category = category_service.create_category("Shelf", "#111111")
+        category_service.update_category("Shelf", "Cupboard", "#222222")
+        category_service.delete_category("Cupboard")
+        kinds = [type(e).__name__ for e in received]
+        assert kinds == ["CategoryAdded", "CategoryRenamed", "CategoryUpdated", "CategoryDeleted"], kinds
+        assert isinstance(received[1], CategoryRenamed) and received[1].old_name == "Shelf"
+        assert received[1].name == "Cupboard" and received[1].category is category
+        assert isinstance(received[2], CategoryUpdated) and received[2].changed == {"color"}
+        assert isinstance(received[3], CategoryDeleted)
+        print("✓ Category add, rename, recolor and delete events")
+
+    assert matched_fields("") == set()
+    assert {"rating", "categories", "title"} <= matched_fields("tolkien rating>=4 cat:Fav")
+    print("✓ Views can tell which edits affect a query")
+
+    print("✅ Change event tests passed!")
+
+def test_bulk_index_load():
+    """Test that loading a library in bulk builds the same indexes as adding books one by one"""
+    print("\n=== Testing Bulk Index Load ===")
+    from services.book_indexes import BookIndexes
+
+    words = ["Dune", "Hobbit", "Emma", "Ulysses", "Beloved", "Rebecca", "Dracula", "Middlemarch"]
+    books = [Book(f"b{i}", f"{words[i % 8]} {words[(i * 3) % 8]} {i % 5}", f"Author {i % 7}", "P",
+                  "Fantasy, Drama" if i % 2 else "History", "", 1900 + i, progress=i % 100, rating=i % 6)
+             for i in range(60)]
+    one_by_one, bulk = BookIndexes(), BookIndexes()
+    for ordinal, book in enumerate(books):
+        one_by_one.add(ordinal, book)
+    bulk.add_many(enumerate(books))
+    assert bulk.text._vocabulary == one_by_one.text._vocabulary
+    assert bulk.text.search("dune hob") == one_by_one.text.search("dune hob")
+    print("✓ Word index vocabulary sorted once")
+
+    for name, index in bulk.sorted.items():
+        assert index._entries == one_by_one.sorted[name]._entries, name
+    print("✓ Sort orders sorted once")
+
+    assert bulk.completions._keys == one_by_one.completions._keys
+    assert bulk.completions.complete("dr") == one_by_one.completions.complete("dr")
+    print("✓ Completion keys sorted once")
+
+    # later single adds and removes keep working on a bulk-built index
+    extra = Book("x", "Zebra Dune", "Author 1", "P", "History", "", 2001)
+    for indexes in (one_by_one, bulk):
+        indexes.add(60, extra)
+        indexes.discard(3)
+    assert bulk.text._vocabulary == one_by_one.text._vocabulary
+    assert all(index._entries == one_by_one.sorted[name]._entries for name, index in bulk.sorted.items())
+    assert bulk.completions._keys == one_by_one.completions._keys
+    print("✓ Bulk-built indexes take single changes")
+
+    print("✅ Bulk index load tests passed!")
+
 def test_category_service():
     """Test CategoryService functionality"""
     print("\n=== Testing CategoryService ===")
@@ -238,6 +1680,32 @@ def run_all_tests():
         test_helpers()
         test_validators()
         test_book_service()
+        test_journaled_storage()
+        test_sqlite_storage()
+        test_batch_operations()
+        test_write_behind_persistence()
+        test_primary_key_index()
+        test_secondary_indexes()
+        test_full_text_index()
+        test_substring_search()
+        test_fuzzy_search()
+        test_ranked_search()
+        test_query_cache()
+        test_incremental_narrowing()
+        test_autocomplete()
+        test_cursor_pagination()
+        test_sort_indexes()
+        test_query_language()
+        test_search_facets()
+        test_bitmap_filters()
+        test_stats_aggregator()
+        test_reading_sessions()
+        test_reading_rollups()
+        test_achievement_rules()
+        test_stats_snapshot()
+        test_book_columns()
+        test_change_events()
+        test_bulk_index_load()
         test_category_service()
         test_stats_service()
         
@@ -1,6 +1,7 @@
 """Utilities package for Libris Core"""
 from .helpers import generate_id, truncate_text, calculate_progress, get_star_rating
 from .validators import validate_isbn, validate_year, validate_pages, validate_rating
+from .text import fold, split_genres, collation_key
 
 __all__ = [
     'generate_id',
@@ -10,5 +11,8 @@ __all__ = [
     'validate_isbn',
     'validate_year',
     'validate_pages',
-    'validate_rating'
+    'validate_rating',
+    'fold',
+    'split_genres',
+    'collation_key'
 ]
@@ -0,0 +1,37 @@
+# utils/text.py
+"""Text normalization shared by the book indexes and search."""
+import unicodedata
+from typing import List
+
+
+def fold(text) -> str:
+    """Case-fold and strip accents so "Émile" and "emile" compare equal"""
+    if not isinstance(text, str):
+        text = "" if text is None else str(text)
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def split_genres(genre) -> List[str]:
+    """Split a comma-separated genre string into folded, de-duplicated tokens"""
+    tokens = []
+    for part in str(genre or "").split(","):
+        token = fold(part.strip())
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+_ARTICLES = ("the ", "a ", "an ")
+
+
+def collation_key(text) -> str:
+    """Sort key for titles: folded, leading article and punctuation dropped,
+    so "The Hobbit" sorts under H"""
+    key = " ".join(fold(text).split())
+    key = key.lstrip("\"'“‘([¡¿ ")
+    for article in _ARTICLES:
+        if key.startswith(article) and len(key) > len(article):
+            key = key[len(article):]
+            break
+    return key
@@ -39,28 +39,28 @@ class BookCard:
         ).pack(expand=True)
 
         # Title
-        title = book.title[:25] + "..." if len(book.title) > 25 else book.title
-        tk.Label(
+        self.title_label = tk.Label(
             self.frame,
-            text=title,
+            text=self._title(book),
             font=("Segoe UI", 11, "bold"),
             bg="white",
             fg=COLORS["text"],
             wraplength=220
-        ).place(x=15, y=240)
+        )
+        self.title_label.place(x=15, y=240)
 
         # Author
-        author = f"by {book.author[:20]}..." if len(book.author) > 20 else f"by {book.author}"
-        tk.Label(
+        self.author_label = tk.Label(
             self.frame,
-            text=author,
+            text=self._author(book),
             font=("Segoe UI", 9),
             bg="white",
             fg="#666666"
-        ).place(x=15, y=265)
+        )
+        self.author_label.place(x=15, y=265)
 
         # Status
-        tk.Label(
+        self.status_label = tk.Label(
             self.frame,
             text=book.status,
             font=("Segoe UI", 9, "bold"),
@@ -68,7 +68,18 @@ class BookCard:
             fg="white",
             padx=10,
             pady=2
-        ).place(x=15, y=290)
+        )
+        self.status_label.place(x=15, y=290)
+
+        # Rating
+        self.rating_label = tk.Label(
+            self.frame,
+            text=self._rating(book),
+            font=("Segoe UI", 9),
+            bg="white",
+            fg=COLORS["text"]
+        )
+        self.rating_label.place(x=150, y=292)
 
         # View button
         tk.Button(
@@ -80,5 +91,34 @@ class BookCard:
             relief="flat",
             padx=15,
             pady=2,
-            command=lambda: print(f"Viewing {book.title}")
-        ).place(x=80, y=320)
\ No newline at end of file
+            command=lambda: print(f"Viewing {self.book.title}")
+        ).place(x=80, y=320)
+
+    @staticmethod
+    def _title(book):
+        return book.title[:25] + "..." if len(book.title) > 25 else book.title
+
+    @staticmethod
+    def _author(book):
+        return f"by {book.author[:20]}..." if len(book.author) > 20 else f"by {book.author}"
+
+    @staticmethod
+    def _rating(book):
+        try:
+            rating = float(book.rating or 0)
+        except (TypeError, ValueError):
+            rating = 0
+        return f"★ {rating:g}" if rating > 0 else ""
+
+    def update(self, book, changed=None):
+        """Reconfigure the labels showing ``changed`` fields (all when None)"""
+        self.book = book
+        fields = set(changed) if changed is not None else {"title", "author", "status", "rating"}
+        if "title" in fields:
+            self.title_label.config(text=self._title(book))
+        if "author" in fields:
+            self.author_label.config(text=self._author(book))
+        if "status" in fields:
+            self.status_label.config(text=book.status, bg=STATUS_COLORS.get(book.status, COLORS["light"]))
+        if "rating" in fields:
+            self.rating_label.config(text=self._rating(book))
\ No newline at end of file